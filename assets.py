@@ -0,0 +1,249 @@
+"""Static CSS/JS bundles named by content hash, vendored CDN files, and template precompilation.
+
+Sources live in static/css and static/js (one file per page plus the shared
+base ones); build_assets() concatenates and minifies each bundle into
+static/dist/<bundle>.<hash>.<ext> and records the names in
+static/dist/manifest.json. A bundle's name changes whenever its bytes do, so
+the files are served as immutable and browsers keep them for
+ASSETS_MAX_AGE.
+"""
+import hashlib
+import json
+import os
+import posixpath
+import re
+import urllib.parse
+import urllib.request
+
+from flask import request, url_for
+from jinja2 import FileSystemBytecodeCache
+
+from instrumentation import log
+
+DIST = 'dist'
+
+# Bundle -> source files under static/, concatenated in this order
+BUNDLES = {
+    'vendor.css': ['vendor/bootstrap/bootstrap.min.css', 'vendor/fontawesome/css/all.min.css'],
+    'vendor.js': ['vendor/bootstrap/bootstrap.bundle.min.js'],
+    'base.css': ['css/style.css', 'css/base.css'],
+    'base.js': ['js/base.js'],
+    'register.css': ['css/register.css'],
+    'register.js': ['js/register.js'],
+    'index.css': ['css/index.css', 'css/facets.css'],
+    'index.js': ['js/index.js', 'js/facets.js'],
+    'search_results.css': ['css/search_results.css', 'css/facets.css'],
+    'search_results.js': ['js/search_results.js', 'js/facets.js'],
+}
+for _page in ('add_property', 'edit_property', 'forgot_password', 'login', 'owner_dashboard', 'property_detail',
+              'reset_password'):
+    BUNDLES[f'{_page}.css'] = [f'css/{_page}.css']
+    BUNDLES[f'{_page}.js'] = [f'js/{_page}.js']
+for _page in ('inbox', 'profile'):
+    BUNDLES[f'{_page}.css'] = [f'css/{_page}.css']
+
+# Where `flask vendor-assets` downloads the vendor bundles' sources from.
+# Until it has run, pages link these CDN URLs instead.
+VENDOR_FILES = {
+    'vendor/bootstrap/bootstrap.min.css': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'vendor/bootstrap/bootstrap.bundle.min.js':
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    'vendor/fontawesome/css/all.min.css': 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css',
+}
+
+CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+SOURCE_MAP_RE = re.compile(r'/[*/]# sourceMappingURL=\S+(?: \*/)?')
+
+
+def minify_css(css):
+    """Strip comments and the whitespace around punctuation; leaves strings and values alone otherwise."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+def minify_js(js):
+    """Drop indentation, blank lines and whole-line // comments.
+
+    Deliberately conservative: line breaks are kept so automatic semicolon
+    insertion still sees the same code, and lines inside multi-line template
+    literals are copied as they are.
+    """
+    lines = []
+    in_template = False
+    for line in js.splitlines():
+        if in_template:
+            lines.append(line)
+        else:
+            stripped = line.strip()
+            if stripped and not stripped.startswith('//'):
+                lines.append(stripped)
+        # An odd number of backticks opens or closes a template literal
+        if line.count('`') % 2:
+            in_template = not in_template
+    return '\n'.join(lines)
+
+
+def _fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _write(path, data):
+    # Several processes may build at once; never let one read a half-written file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def _rebase_css_urls(css, source, static_folder, written):
+    """Point relative url()s of a CSS source at fingerprinted copies of their files in dist/."""
+    def rebase(match):
+        url = match.group(2).strip()
+        if url.startswith(('data:', '#', '/')) or urllib.parse.urlsplit(url).scheme:
+            return match.group(0)
+        path, _, fragment = url.partition('#')
+        path = path.split('?', 1)[0]
+        asset = posixpath.normpath(posixpath.join(posixpath.dirname(source), path))
+        full_path = os.path.join(static_folder, *asset.split('/'))
+        if not os.path.isfile(full_path):
+            log.warning("Asset %s referenced from %s is missing", asset, source)
+            return match.group(0)
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        stem, ext = posixpath.splitext(posixpath.basename(asset))
+        name = f"{stem}.{_fingerprint(data)}{ext}"
+        _write(os.path.join(static_folder, DIST, name), data)
+        written.add(name)
+        return f"url({name}{'#' + fragment if fragment else ''})"
+    return CSS_URL_RE.sub(rebase, css)
+
+
+def build_assets(static_folder):
+    """Build every bundle whose sources exist into static/dist; returns the manifest {bundle: 'dist/<file>'}.
+
+    Bundles with a missing source (the vendor ones before `flask
+    vendor-assets`) are left out. Files from earlier builds are removed.
+    """
+    dist = os.path.join(static_folder, DIST)
+    os.makedirs(dist, exist_ok=True)
+    manifest, written = {}, set()
+    for bundle, sources in BUNDLES.items():
+        paths = [os.path.join(static_folder, *source.split('/')) for source in sources]
+        if not all(os.path.isfile(path) for path in paths):
+            continue
+        parts = []
+        for source, path in zip(sources, paths):
+            with open(path, encoding='utf-8') as f:
+                text = SOURCE_MAP_RE.sub('', f.read())
+            if bundle.endswith('.css'):
+                text = _rebase_css_urls(text, source, static_folder, written)
+                parts.append(text.strip() if '.min.' in source else minify_css(text))
+            else:
+                # Separate files with ';' so one without a trailing semicolon can't run into the next
+                parts.append((text.strip() if '.min.' in source else minify_js(text)) + ';')
+        data = '\n'.join(parts).encode('utf-8')
+        stem, ext = os.path.splitext(bundle)
+        name = f"{stem}.{_fingerprint(data)}{ext}"
+        _write(os.path.join(dist, name), data)
+        written.add(name)
+        manifest[bundle] = f"{DIST}/{name}"
+    _write(os.path.join(dist, 'manifest.json'), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    for name in os.listdir(dist):
+        if name not in written and name != 'manifest.json' and not name.endswith('.tmp'):
+            os.remove(os.path.join(dist, name))
+    return manifest
+
+
+def load_manifest(static_folder):
+    """The manifest of the last build, or None if a source changed since (or a bundle is missing from it)."""
+    manifest_path = os.path.join(static_folder, DIST, 'manifest.json')
+    if not os.path.isfile(manifest_path):
+        return None
+    built = os.path.getmtime(manifest_path)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    for bundle, sources in BUNDLES.items():
+        paths = [os.path.join(static_folder, *source.split('/')) for source in sources]
+        if all(os.path.isfile(path) for path in paths) and (
+                bundle not in manifest or any(os.path.getmtime(path) > built for path in paths)):
+            return None
+    return manifest
+
+
+def vendor_assets(static_folder):
+    """Download VENDOR_FILES, and the fonts and images their CSS refers to, under static/; returns the paths."""
+    fetched = []
+
+    def fetch(url, target):
+        with urllib.request.urlopen(url, timeout=30) as response:
+            data = response.read()
+        path = os.path.join(static_folder, *target.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write(path, data)
+        fetched.append(target)
+        return data
+
+    for target, url in VENDOR_FILES.items():
+        data = fetch(url, target)
+        if target.endswith('.css'):
+            for match in CSS_URL_RE.finditer(data.decode('utf-8')):
+                ref = match.group(2).strip().split('#', 1)[0].split('?', 1)[0]
+                if ref.startswith(('data:', '/')) or urllib.parse.urlsplit(ref).scheme:
+                    continue
+                asset = posixpath.normpath(posixpath.join(posixpath.dirname(target), ref))
+                if asset not in fetched:
+                    fetch(urllib.parse.urljoin(url, ref), asset)
+    return fetched
+
+
+def init_assets(app):
+    """Load (building it first if sources changed) the bundle manifest and expose it to templates.
+
+    Templates call asset_url('index.css') for a bundle's fingerprinted URL, and
+    asset_urls('vendor.css') for a vendor bundle, which falls back to its CDN
+    URLs when the files haven't been vendored.
+    """
+    manifest = load_manifest(app.static_folder)
+    if manifest is None:
+        manifest = build_assets(app.static_folder)
+        log.info("Built %d static bundles into %s", len(manifest), os.path.join(app.static_folder, DIST))
+
+    def asset_url(bundle):
+        return url_for('static', filename=manifest[bundle])
+
+    def asset_urls(bundle):
+        if bundle in manifest:
+            return [asset_url(bundle)]
+        return [VENDOR_FILES[source] for source in BUNDLES[bundle]]
+
+    app.jinja_env.globals.update(asset_url=asset_url, asset_urls=asset_urls)
+
+    max_age = app.config['ASSETS_MAX_AGE']
+
+    @app.after_request
+    def cache_bundles(response):
+        if request.endpoint == 'static' and request.view_args['filename'].startswith(f'{DIST}/'):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+            response.cache_control.immutable = True
+        return response
+
+
+def init_template_cache(app):
+    """Keep compiled templates in TEMPLATE_CACHE_DIR, so a restarted worker loads bytecode instead of parsing."""
+    directory = app.config['TEMPLATE_CACHE_DIR']
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+def precompile_templates(app):
+    """Compile every template now; under gunicorn's preload_app the workers inherit them compiled."""
+    names = app.jinja_env.list_templates(extensions=['html'])
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
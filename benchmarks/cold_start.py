@@ -0,0 +1,77 @@
+"""Measure how long a fresh process takes to import, build and serve the app.
+
+    python -m benchmarks.cold_start --runs 5
+
+Every run is a new interpreter that times `import app`, create_app() as
+wsgi.py calls it (and as the flask CLI does, with commands and Flask-Migrate)
+and the first GET /login, then reports the median of each step. --top N
+also lists the N packages slowest to import, from `python -X importtime`.
+Under gunicorn's preload_app a worker skips all of this: it is forked from
+a master that already did it.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app(commands=sys.argv[1] == 'cli')
+built = time.perf_counter()
+flask_app.test_client().get('/login')
+served = time.perf_counter()
+print(json.dumps({'import': imported - started, 'create_app': built - imported, 'first request': served - built}))
+"""
+
+
+def run_probe(mode):
+    output = subprocess.run([sys.executable, '-c', PROBE, mode], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(n):
+    """[(ms, package)] of the n packages whose modules took longest to import under wsgi.py's create_app().
+
+    Each module's own import time (without its imports) is added to its top-level package.
+    """
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app; app.create_app(commands=False)'],
+                            cwd=ROOT, check=True, capture_output=True, text=True).stderr
+    packages = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(own) / 1000
+    return [(ms, name) for name, ms in packages.most_common(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=0, help="also list the N packages slowest to import")
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'import ms':>10} {'create_app ms':>14} {'first request ms':>17} {'total ms':>9}")
+    for mode in ('wsgi', 'cli'):
+        runs = [run_probe(mode) for _ in range(args.runs)]
+        medians = {step: statistics.median(run[step] for run in runs) * 1000 for step in runs[0]}
+        print(f"{mode:<6} {medians['import']:>10.0f} {medians['create_app']:>14.0f} "
+              f"{medians['first request']:>17.0f} {sum(medians.values()):>9.0f}")
+
+    if args.top:
+        print("\nSlowest packages to import (ms)")
+        for ms, name in slowest_imports(args.top):
+            print(f"{ms:>8.1f}  {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Stress the database with concurrent writers and readers under each engine profile.
+
+    python -m benchmarks.db_contention --writers 4 --readers 4 --seconds 10
+
+Writer processes toggle favorites and flush batches of view counts, each a
+committed transaction; reader processes load listing pages. Every profile
+runs against a fresh copy of the database in DATABASE_URL (SQLite only),
+and the report shows read latency and 'database is locked' failures. With
+the default profile readers stall behind each commit; with 'tuned' (WAL and
+busy_timeout) they should not.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy.engine import make_url
+
+
+def _setup(database_url, profile):
+    # Configure through the environment before the app (and its config) is imported
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['DATABASE_PROFILE'] = profile
+    os.environ['LISTING_CACHE'] = 'none'
+    os.environ['VIEW_TRACKING'] = 'off'
+    from app import create_app
+    return create_app(commands=False)
+
+
+def _writer(database_url, profile, seconds, seed, results):
+    app = _setup(database_url, profile)
+    from sqlalchemy.exc import OperationalError
+    from favorites import apply_favorite_changes
+    from models import db, Property, User
+    from view_tracking import write_views
+
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    with app.app_context():
+        max_id = db.session.query(db.func.max(Property.id)).scalar()
+        user_ids = [user_id for (user_id,) in db.session.query(User.id)]
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if rng.random() < 0.5:
+                    action = rng.choice(['add', 'remove'])
+                    apply_favorite_changes(rng.choice(user_ids), [(rng.randint(1, max_id), action)])
+                else:
+                    today = datetime.utcnow().date()
+                    write_views(Counter({(rng.randint(1, max_id), today): 1 for _ in range(200)}))
+                latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                db.session.rollback()
+                errors += 1
+    results.put(('write', latencies, errors))
+
+
+def _reader(database_url, profile, seconds, seed, results):
+    app = _setup(database_url, profile)
+    from sqlalchemy.exc import OperationalError
+    from listings import filtered_listings
+    from models import db
+    from pagination import paginate, sort_keys
+
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    with app.app_context():
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            sort = rng.choice(['newest', 'rent_low', 'popular'])
+            try:
+                props, _ = filtered_listings(ptype=rng.choice([None, '2BHK', 'Villa']))
+                paginate(props, sort, sort_keys(sort), None, 24)
+                latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                errors += 1
+            db.session.rollback()
+    results.put(('read', latencies, errors))
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_profile(source, profile, writers, readers, seconds):
+    """Run the workload on a copy of source; returns {'read'|'write': (latencies, errors)}."""
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, 'contention.db')
+        shutil.copyfile(source, path)
+        # journal_mode is stored in the file, so start every profile from the default
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA journal_mode=DELETE")
+        connection.close()
+
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        processes = [context.Process(target=_writer, args=(f"sqlite:///{path}", profile, seconds, i, results))
+                     for i in range(writers)]
+        processes += [context.Process(target=_reader, args=(f"sqlite:///{path}", profile, seconds, i, results))
+                      for i in range(readers)]
+        for process in processes:
+            process.start()
+        totals = {'read': ([], 0), 'write': ([], 0)}
+        for _ in processes:
+            kind, latencies, errors = results.get()
+            totals[kind] = (totals[kind][0] + latencies, totals[kind][1] + errors)
+        for process in processes:
+            process.join()
+        return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--profiles', nargs='+', default=['default', 'tuned'])
+    args = parser.parse_args()
+
+    url = make_url(os.environ.get('DATABASE_URL') or 'sqlite:///house_rental.db')
+    if url.get_backend_name() != 'sqlite' or not url.database:
+        parser.error("DATABASE_URL must point at an SQLite database file")
+    source = url.database if os.path.isabs(url.database) else os.path.join('instance', url.database)
+
+    print(f"{'profile':<8} {'kind':<6} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'locked':>7}")
+    for profile in args.profiles:
+        totals = run_profile(source, profile, args.writers, args.readers, args.seconds)
+        for kind in ('read', 'write'):
+            latencies, errors = totals[kind]
+            print(f"{profile:<8} {kind:<6} {len(latencies) / args.seconds:>8.1f} "
+                  f"{statistics.median(latencies or [0]) * 1000:>8.1f} {_percentile(latencies, 95) * 1000:>8.1f} "
+                  f"{max(latencies or [0]) * 1000:>8.1f} {errors:>7}")
+
+
+if __name__ == '__main__':
+    main()
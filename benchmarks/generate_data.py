@@ -0,0 +1,203 @@
+"""Fill the database with a synthetic dataset for benchmarking.
+
+Scales seed_data.py up from 2 listings to anything between 10k and 1M:
+owners, tenants, properties with processed photos, favorites and messages.
+Every account's password is BENCH_PASSWORD so recorded traffic can log in.
+
+    python -m benchmarks.generate_data --properties 100000
+
+This DROPS every table first, like seed_data.py. Point DATABASE_URL at a
+scratch database.
+"""
+import argparse
+import io
+import itertools
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import insert
+
+from app import create_app
+from geo_index import get_geo_index
+from geocoding import encode_geohash, get_gazetteer
+from image_pipeline import process_image, staging_path
+from models import db, User, Property, PropertyImage, Message, Favorite
+from popularity import reconcile_popularity
+from recommendations import rebuild_similar
+from search_index import get_search_index
+from upload_storage import stream_to_staging
+from werkzeug.datastructures import FileStorage
+from werkzeug.security import generate_password_hash
+
+BENCH_PASSWORD = 'benchpass'
+
+PROPERTY_TYPES = ['1BHK', '2BHK', '3BHK', 'Flat', 'Villa', 'Apartment', 'Studio', 'Penthouse']
+RENT_RANGES = {'1BHK': (5000, 20000), '2BHK': (10000, 40000), '3BHK': (18000, 70000), 'Flat': (8000, 45000),
+               'Villa': (40000, 250000), 'Apartment': (9000, 60000), 'Studio': (4000, 15000),
+               'Penthouse': (60000, 400000)}
+ADJECTIVES = ['Cozy', 'Spacious', 'Bright', 'Modern', 'Luxury', 'Affordable', 'Quiet', 'Furnished', 'Renovated',
+              'Sunny', 'Elegant', 'Compact']
+FEATURES = ['balcony', 'parking', 'garden', 'pool', 'gym', 'lift', 'terrace', 'power backup', 'security',
+            'mall nearby', 'metro access', 'lake view', 'modular kitchen', 'pet friendly', 'clubhouse']
+AREAS = ['Kondhwa', 'Viman Nagar', 'Baner', 'Hinjewadi', 'Kothrud', 'Wakad', 'Whitefield', 'Koramangala',
+         'Indiranagar', 'HSR Layout', 'Andheri', 'Powai', 'Bandra', 'Thane', 'Gachibowli', 'Madhapur']
+CITIES = ['Pune', 'Bangalore', 'Mumbai', 'Hyderabad']
+MESSAGES = ['Is this still available?', 'Can I visit this weekend?', 'Is the rent negotiable?',
+            'Are pets allowed?', 'What is the deposit?', 'Is parking included?']
+
+
+def user_email(kind, i):
+    return f"{kind}{i}@bench.example"
+
+
+def bulk_insert(model, rows, batch_size):
+    """Insert an iterable of row dicts in executemany batches; returns the row count."""
+    rows = iter(rows)
+    count = 0
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        db.session.execute(insert(model), batch)
+        count += len(batch)
+    db.session.commit()
+    return count
+
+
+def make_image_pool(n, rng):
+    """Process n synthetic photos through the upload pipeline; returns [(filename, variants)].
+
+    Uploads are content-addressed, so every listing shares files from this
+    small pool instead of storing its own copy.
+    """
+    from PIL import Image, ImageDraw
+
+    pool = []
+    for _ in range(n):
+        image = Image.new('RGB', (1600, 1067), tuple(rng.randrange(256) for _ in range(3)))
+        draw = ImageDraw.Draw(image)
+        for _ in range(12):
+            x, y = rng.randrange(1600), rng.randrange(1067)
+            draw.rectangle([x, y, x + rng.randrange(100, 600), y + rng.randrange(100, 400)],
+                           fill=tuple(rng.randrange(256) for _ in range(3)))
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG')
+        buffer.seek(0)
+        digest, temp_path = stream_to_staging(FileStorage(buffer, 'bench.png'))
+        filename = f"{digest}.jpg"
+        os.replace(temp_path, staging_path(filename))
+        variants = process_image(staging_path(filename), current_app.config['UPLOAD_FOLDER'], filename,
+                                 current_app.config['IMAGE_FORMATS'])
+        os.remove(staging_path(filename))
+        pool.append((filename, variants))
+    return pool
+
+
+def generate(n_properties, n_owners, n_tenants, favorites_per_tenant, n_messages, images_per_property,
+             image_pool_size, batch_size, seed):
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    db.drop_all()
+    db.create_all()
+
+    # Hashing is deliberately slow, so every account shares one hash
+    password = generate_password_hash(BENCH_PASSWORD, current_app.config['PASSWORD_HASH_METHOD'])
+    now = datetime.utcnow()
+    users = [{'id': i + 1, 'name': f"Owner {i + 1}", 'email': user_email('owner', i + 1), 'password': password,
+              'is_owner': True, 'created_at': now} for i in range(n_owners)]
+    users += [{'id': n_owners + i + 1, 'name': f"Tenant {i + 1}", 'email': user_email('tenant', i + 1),
+               'password': password, 'is_owner': False, 'created_at': now} for i in range(n_tenants)]
+    print(f"{bulk_insert(User, users, batch_size)} users")
+
+    # Only what later tables need is kept per listing, so 1M rows fit in memory
+    owners, created = [], []
+    gazetteer = get_gazetteer()
+
+    def property_rows():
+        for prop_id in range(1, n_properties + 1):
+            ptype = rng.choice(PROPERTY_TYPES)
+            features = rng.sample(FEATURES, 3)
+            area, city = rng.choice(AREAS), rng.choice(CITIES)
+            low, high = RENT_RANGES[ptype]
+            owners.append(rng.randint(1, n_owners))
+            created.append(now - timedelta(seconds=rng.randrange(2 * 365 * 24 * 3600)))
+            # Jitter listings around their locality's point (about +-1.5 km) so radius search has spread
+            lat, lng = gazetteer.geocode(f"{area}, {city}")
+            lat, lng = lat + rng.uniform(-0.015, 0.015), lng + rng.uniform(-0.015, 0.015)
+            yield {
+                'id': prop_id,
+                'title': f"{rng.choice(ADJECTIVES)} {ptype} with {features[0]}",
+                'description': f"{ptype} in {area} with {', '.join(features)}. Close to schools and markets.",
+                'location': f"{area}, {city}",
+                'latitude': lat,
+                'longitude': lng,
+                'geohash': encode_geohash(lat, lng),
+                'rent': float(rng.randrange(low, high, 500)),
+                'property_type': ptype,
+                'owner_id': owners[-1],
+                'created_at': created[-1],
+            }
+
+    print(f"{bulk_insert(Property, property_rows(), batch_size)} properties")
+
+    if images_per_property:
+        pool = make_image_pool(image_pool_size, rng)
+        images = (
+            {'filename': filename, 'property_id': prop_id, 'created_at': created[prop_id - 1],
+             'status': PropertyImage.STATUS_READY, 'variants': variants}
+            for prop_id in range(1, n_properties + 1)
+            for filename, variants in rng.sample(pool, min(images_per_property, len(pool)))
+        )
+        print(f"{bulk_insert(PropertyImage, images, batch_size)} images sharing {len(pool)} files")
+
+    favorites = (
+        {'user_id': tenant_id, 'property_id': prop_id, 'created_at': now}
+        for tenant_id in range(n_owners + 1, n_owners + n_tenants + 1)
+        for prop_id in rng.sample(range(1, n_properties + 1),
+                                  min(n_properties, rng.randint(0, 2 * favorites_per_tenant)))
+    )
+    print(f"{bulk_insert(Favorite, favorites, batch_size)} favorites")
+
+    def message_rows():
+        for _ in range(n_messages):
+            prop_id = rng.randint(1, n_properties)
+            yield {'message_text': rng.choice(MESSAGES), 'property_id': prop_id, 'owner_id': owners[prop_id - 1],
+                   'tenant_id': rng.randint(n_owners + 1, n_owners + n_tenants),
+                   'timestamp': now - timedelta(seconds=rng.randrange(365 * 24 * 3600))}
+
+    print(f"{bulk_insert(Message, message_rows(), batch_size)} messages")
+
+    print(f"Popularity counters set on {reconcile_popularity(batch_size)} properties")
+    print(f"Similar listings computed for {rebuild_similar(batch_size)} properties")
+    get_search_index().rebuild()
+    get_geo_index().rebuild()
+    db.session.commit()
+    print(f"Search and spatial indexes rebuilt; done in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--properties', type=int, default=10000)
+    parser.add_argument('--owners', type=int, help="default: one per 20 properties")
+    parser.add_argument('--tenants', type=int, help="default: one per 10 properties")
+    parser.add_argument('--favorites-per-tenant', type=int, default=5, help="average")
+    parser.add_argument('--messages', type=int, help="default: two per property")
+    parser.add_argument('--images-per-property', type=int, default=3)
+    parser.add_argument('--image-pool', type=int, default=24, help="distinct photo files to share")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with create_app(views=False, commands=False).app_context():
+        generate(args.properties, args.owners or max(1, args.properties // 20),
+                 args.tenants or max(1, args.properties // 10), args.favorites_per_tenant,
+                 2 * args.properties if args.messages is None else args.messages, args.images_per_property,
+                 args.image_pool, args.batch_size, args.seed)
+    print(f"Log in as {user_email('owner', 1)} or {user_email('tenant', 1)} / {BENCH_PASSWORD}")
+
+
+if __name__ == '__main__':
+    main()
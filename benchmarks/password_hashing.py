@@ -0,0 +1,63 @@
+"""Measure what one password hash costs under each hashing method.
+
+    python -m benchmarks.password_hashing
+    python -m benchmarks.password_hashing --methods pbkdf2:sha256:600000 scrypt:32768:8:1 --rounds 10
+
+Reports milliseconds per hash on one core and how many logins per second
+PASSWORD_WORKERS pool processes can verify. Pick the strongest method whose
+cost your login traffic can afford, set PASSWORD_HASH_METHOD, and existing
+hashes are upgraded as users log in.
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from config import Config
+
+DEFAULT_METHODS = ['pbkdf2:sha256:260000', 'pbkdf2:sha256:600000', 'scrypt:16384:8:1', 'scrypt:32768:8:1']
+PASSWORD = 'correct horse battery staple'
+
+
+def time_hash(stored, rounds):
+    """Seconds per check_password_hash() of stored, one sample per round."""
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        check_password_hash(stored, PASSWORD)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def pool_throughput(stored, workers, n):
+    """Verifications per second with n checks spread over a pool of workers."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(check_password_hash, [stored] * workers, [PASSWORD] * workers))  # start the processes
+        started = time.perf_counter()
+        list(pool.map(check_password_hash, [stored] * n, [PASSWORD] * n))
+        return n / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--methods', nargs='+', default=DEFAULT_METHODS)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=Config.PASSWORD_WORKERS)
+    args = parser.parse_args()
+
+    print(f"{'method':<26} {'hash prefix':<26} {'median ms':>9} {'max ms':>8} "
+          f"{'/s/core':>8} {f'/s x{args.workers}':>8}")
+    for method in args.methods:
+        stored = generate_password_hash(PASSWORD, method)
+        samples = time_hash(stored, args.rounds)
+        median = statistics.median(samples)
+        pooled = pool_throughput(stored, args.workers, max(args.rounds, 2 * args.workers))
+        current = '  <- PASSWORD_HASH_METHOD' if method == Config.PASSWORD_HASH_METHOD else ''
+        print(f"{method:<26} {stored.split('$', 1)[0]:<26} {median * 1000:>9.1f} {max(samples) * 1000:>8.1f} "
+              f"{1 / median:>8.1f} {pooled:>8.1f}{current}")
+
+
+if __name__ == '__main__':
+    main()
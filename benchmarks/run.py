@@ -0,0 +1,245 @@
+"""Benchmark the app: generate or replay traffic and report latency percentiles and RPS.
+
+    # 5000 requests of the default mix, against the data in DATABASE_URL
+    python -m benchmarks.run synthesize --requests 5000 --out benchmarks/traffic.jsonl
+
+    # Replay in-process (no network), or against a running server
+    python -m benchmarks.run replay benchmarks/traffic.jsonl --concurrency 8
+    python -m benchmarks.run replay benchmarks/traffic.jsonl --target http://127.0.0.1:8000
+
+    # Keep a baseline and compare later runs on the same machine with it
+    python -m benchmarks.run replay benchmarks/traffic.jsonl --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run replay benchmarks/traffic.jsonl --compare benchmarks/baseline.json
+
+--compare exits 1 if any scenario's p95 latency or throughput is more than
+--threshold worse than the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+
+from benchmarks.generate_data import BENCH_PASSWORD
+from benchmarks.traffic import read_traffic, write_traffic
+
+CSRF_RE = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+PERCENTILES = (50, 90, 95, 99)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpClient:
+    """One logged-in browser session against a running server."""
+
+    def __init__(self, target, user):
+        self.target = target.rstrip('/')
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()), _NoRedirect())
+        if user:
+            _, body = self.request('GET', '/login')
+            token = CSRF_RE.search(body.decode())
+            self.request('POST', '/login', form={'email': user, 'password': BENCH_PASSWORD,
+                                                 'csrf_token': token.group(1) if token else ''})
+
+    def request(self, method, path, query=None, form=None):
+        url = self.target + path + ('?' + urllib.parse.urlencode(query) if query else '')
+        data = urllib.parse.urlencode(form).encode() if form is not None else None
+        try:
+            with self.opener.open(urllib.request.Request(url, data=data, method=method)) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+class InProcessClient:
+    """The same session through Flask's test client, without a server or network."""
+
+    def __init__(self, app, user):
+        self.client = app.test_client()
+        if user:
+            _, body = self.request('GET', '/login')
+            token = CSRF_RE.search(body.decode())
+            self.request('POST', '/login', form={'email': user, 'password': BENCH_PASSWORD,
+                                                 'csrf_token': token.group(1) if token else ''})
+
+    def request(self, method, path, query=None, form=None):
+        response = self.client.open(path, method=method, query_string=query, data=form)
+        return response.status_code, response.get_data()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies, errors, elapsed):
+    values = sorted(latencies)
+    stats = {
+        'requests': len(values),
+        'errors': errors,
+        'rps': round(len(values) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        'max_ms': round(values[-1] * 1000, 2) if values else 0.0,
+    }
+    for pct in PERCENTILES:
+        stats[f'p{pct}_ms'] = round(percentile(values, pct) * 1000, 2)
+    return stats
+
+
+def replay(records, make_client, concurrency=4, realtime=False, warmup=0):
+    """Replay records with concurrency worker threads; returns (results, elapsed seconds).
+
+    Every user is logged in once before the clock starts, and a user's
+    requests never overlap, as in a single browser. results maps
+    scenario -> [(latency, ok)].
+    """
+    users = list(dict.fromkeys(record.get('user') for record in records))
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        clients = dict(zip(users, pool.map(make_client, users)))
+    locks = {user: threading.Lock() for user in users}
+    results = defaultdict(list)
+    results_lock = threading.Lock()
+
+    def run(record, started, measure):
+        user = record.get('user')
+        if realtime:
+            delay = started + record.get('t', 0) - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        with locks[user]:
+            begin = time.perf_counter()
+            status, _ = clients[user].request(record['method'], record['path'], record.get('query'),
+                                              record.get('form'))
+            latency = time.perf_counter() - begin
+        if measure:
+            with results_lock:
+                results[record.get('scenario') or record['path']].append((latency, status < 400))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda record: run(record, 0, False), records[:warmup]))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(run, record, started, True) for record in records[warmup:]]
+        for future in futures:
+            future.result()
+    return results, time.perf_counter() - started
+
+
+def report(results, elapsed):
+    """Print a table of per-scenario stats and return them, with 'total', as a dict."""
+    stats = {name: summarize([lat for lat, _ in rows], sum(not ok for _, ok in rows), elapsed)
+             for name, rows in sorted(results.items())}
+    all_rows = [row for rows in results.values() for row in rows]
+    stats['total'] = summarize([lat for lat, _ in all_rows], sum(not ok for _, ok in all_rows), elapsed)
+
+    columns = ['requests', 'errors', 'rps', 'mean_ms'] + [f'p{pct}_ms' for pct in PERCENTILES] + ['max_ms']
+    print(f"{'scenario':<18}" + ''.join(f"{column:>10}" for column in columns))
+    for name, row in stats.items():
+        print(f"{name:<18}" + ''.join(f"{row[column]:>10}" for column in columns))
+    return stats
+
+
+def machine_info():
+    return {'platform': platform.platform(), 'python': platform.python_version(), 'cpus': os.cpu_count()}
+
+
+def compare(stats, baseline, threshold):
+    """Print the change against baseline; returns True if anything regressed past threshold."""
+    if baseline.get('machine') != machine_info():
+        print("Warning: baseline was recorded on a different machine; numbers aren't comparable")
+    regressed = False
+    print(f"\n{'scenario':<18}{'p50 ms':>18}{'p95 ms':>18}{'rps':>18}")
+    for name, row in stats.items():
+        base = baseline['scenarios'].get(name)
+        if not base:
+            continue
+        cells = []
+        for key, higher_is_worse in (('p50_ms', True), ('p95_ms', True), ('rps', False)):
+            change = (row[key] - base[key]) / base[key] if base[key] else 0.0
+            worse = change > threshold if higher_is_worse else change < -threshold
+            regressed = regressed or (worse and key != 'p50_ms')
+            cells.append(f"{base[key]:>7}->{row[key]:<7}{change:+.0%}{'!' if worse else ' '}")
+        print(f"{name:<18}" + ''.join(f"{cell:>18}" for cell in cells))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    synth = commands.add_parser('synthesize', help="generate a traffic file from the scenarios")
+    synth.add_argument('--requests', type=int, default=2000)
+    synth.add_argument('--mix', help="scenario weights, e.g. index=3,search=5,property_detail=2")
+    synth.add_argument('--rate', type=float, help="requests/second for realtime replay timestamps")
+    synth.add_argument('--seed', type=int, default=42)
+    synth.add_argument('--out', default='benchmarks/traffic.jsonl')
+
+    play = commands.add_parser('replay', help="replay a traffic file and report latencies")
+    play.add_argument('traffic')
+    play.add_argument('--target', help="base URL of a running server; default: in-process test client")
+    play.add_argument('--concurrency', type=int, default=4)
+    play.add_argument('--realtime', action='store_true', help="honour the recorded request timestamps")
+    play.add_argument('--warmup', type=int, default=100, help="leading requests to run unmeasured")
+    play.add_argument('--save-baseline', metavar='PATH')
+    play.add_argument('--compare', metavar='PATH')
+    play.add_argument('--threshold', type=float, default=0.10, help="allowed regression, default 10%%")
+    args = parser.parse_args()
+
+    if args.command == 'synthesize':
+        from app import create_app
+        from benchmarks.scenarios import Dataset, synthesize
+
+        mix = None
+        if args.mix:
+            mix = {name: float(weight) for name, weight in (item.split('=') for item in args.mix.split(','))}
+        with create_app(views=False, commands=False).app_context():
+            dataset = Dataset.from_db()
+        write_traffic(args.out, synthesize(dataset, args.requests, mix, args.rate, args.seed))
+        print(f"Wrote {args.requests} requests over {dataset.n_properties} properties to {args.out}")
+        return
+
+    records = read_traffic(args.traffic)
+    if args.target:
+        def make_client(user):
+            return HttpClient(args.target, user)
+    else:
+        from app import create_app
+        app = create_app(commands=False)
+
+        def make_client(user):
+            return InProcessClient(app, user)
+
+    results, elapsed = replay(records, make_client, args.concurrency, args.realtime, args.warmup)
+    stats = report(results, elapsed)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'machine': machine_info(), 'traffic': os.path.basename(args.traffic),
+                       'target': args.target or 'in-process', 'concurrency': args.concurrency,
+                       'scenarios': stats}, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(stats, baseline, args.threshold):
+            print(f"Regression of more than {args.threshold:.0%} against {args.compare}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
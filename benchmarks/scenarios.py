@@ -0,0 +1,102 @@
+"""Synthetic traffic scenarios for the benchmark harness.
+
+Each scenario turns a random generator and the dataset shape into one
+request record in the traffic.py format. `search` walks every combination
+of text query, property type, rent range and sort before repeating one.
+"""
+import itertools
+import random
+
+from benchmarks.generate_data import PROPERTY_TYPES, user_email
+
+SEARCH_TERMS = [None, 'balcony', 'pool', 'parking garden', 'Pune', 'Whitefield', 'luxury villa', 'metro']
+RENT_FILTERS = [(None, None), (None, '15000'), ('15000', '40000'), ('40000', None)]
+HOME_SORTS = ['newest', 'oldest', 'rent_low', 'rent_high', 'popular']
+SEARCH_SORTS = ['relevance', 'newest', 'rent_low', 'rent_high', 'popular']
+
+# Default traffic mix: scenario -> weight. Scenarios are named after the
+# endpoint they hit, like the records written by traffic.record_traffic().
+DEFAULT_MIX = {'index': 30, 'search': 35, 'property_detail': 25, 'toggle_favorite': 10}
+
+
+class Dataset:
+    """What the scenarios need to know about the data being benchmarked."""
+
+    def __init__(self, n_properties, n_owners, n_tenants):
+        self.n_properties = n_properties
+        self.n_owners = n_owners
+        self.n_tenants = n_tenants
+
+    @classmethod
+    def from_db(cls):
+        from models import db, User, Property
+        from sqlalchemy import func
+
+        n_properties = db.session.query(func.max(Property.id)).scalar() or 0
+        n_owners = User.query.filter_by(is_owner=True).count()
+        return cls(n_properties, n_owners, User.query.count() - n_owners)
+
+    def random_tenant(self, rng):
+        return user_email('tenant', rng.randint(1, self.n_tenants)) if self.n_tenants else None
+
+    def random_property(self, rng):
+        return rng.randint(1, max(1, self.n_properties))
+
+
+def _record(scenario, path, query=None, form=None, user=None, method='GET'):
+    return {'scenario': scenario, 'method': method, 'path': path,
+            'query': {k: v for k, v in (query or {}).items() if v is not None}, 'form': form, 'user': user}
+
+
+def home(rng, dataset, state):
+    query = {'sort': rng.choice(HOME_SORTS)}
+    if rng.random() < 0.3:
+        query['type'] = rng.choice(PROPERTY_TYPES)
+    return _record('index', '/home', query, user=dataset.random_tenant(rng))
+
+
+def search(rng, dataset, state):
+    if not state.get('search_combos'):
+        combos = list(itertools.product(SEARCH_TERMS, [None] + PROPERTY_TYPES, RENT_FILTERS, SEARCH_SORTS))
+        rng.shuffle(combos)
+        state['search_combos'] = combos
+    q, ptype, (min_rent, max_rent), sort = state['search_combos'].pop()
+    query = {'q': q, 'type': ptype, 'min_rent': min_rent, 'max_rent': max_rent, 'sort': sort}
+    return _record('search', '/search', query, user=dataset.random_tenant(rng) if rng.random() < 0.5 else None)
+
+
+def property_detail(rng, dataset, state):
+    return _record('property_detail', f"/property/{dataset.random_property(rng)}", user=dataset.random_tenant(rng))
+
+
+def favorite_toggle(rng, dataset, state):
+    form = {'property_id': str(dataset.random_property(rng)), 'action': rng.choice(['add', 'remove'])}
+    return _record('toggle_favorite', '/favorites/toggle', form=form, user=dataset.random_tenant(rng),
+                   method='POST')
+
+
+SCENARIOS = {
+    'index': home,
+    'search': search,
+    'property_detail': property_detail,
+    'toggle_favorite': favorite_toggle,
+}
+
+
+def synthesize(dataset, n_requests, mix=None, rate=None, seed=42):
+    """Generate n_requests records drawn from mix ({scenario: weight}).
+
+    With rate (requests/second) the records are spaced at Poisson arrival
+    times so they can be replayed in real time; otherwise t is 0.
+    """
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    state, t = {}, 0.0
+    records = []
+    for _ in range(n_requests):
+        record = SCENARIOS[rng.choices(names, weights)[0]](rng, dataset, state)
+        if rate:
+            t += rng.expovariate(rate)
+        records.append({'t': round(t, 4), **record})
+    return records
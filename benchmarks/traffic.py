@@ -0,0 +1,63 @@
+"""Recorded-traffic format shared by the recorder, the scenario generator and the replayer.
+
+A traffic file is JSONL, one request per line:
+
+    {"t": 0.125, "scenario": "search", "method": "GET", "path": "/search",
+     "query": {"q": "balcony", "type": "2BHK", "sort": "rent_low"},
+     "form": null, "user": "tenant12@bench.example"}
+
+t is the offset in seconds from the start of the recording, user is the
+email of the logged-in account (null for anonymous requests) and form holds
+the fields of a POST. Secrets such as passwords and CSRF tokens are never
+recorded; replay logs in as `user` with the benchmark password.
+"""
+import json
+import threading
+import time
+
+from flask import request
+from flask_login import current_user
+
+SECRET_FIELDS = {'password', 'confirm_password', 'csrf_token'}
+
+# Static assets and uploads aren't part of the app's own latency
+SKIPPED_PREFIXES = ('/static/', '/uploads/')
+
+
+def read_traffic(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_traffic(path, records):
+    with open(path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+def record_traffic(app, path):
+    """Append every request the app serves to the JSONL traffic file at path.
+
+    Enabled with TRAFFIC_RECORD_FILE; meant for capturing a realistic mix on a
+    staging box, not for production.
+    """
+    lock = threading.Lock()
+    started = time.monotonic()
+
+    @app.after_request
+    def record_request(response):
+        if not request.path.startswith(SKIPPED_PREFIXES):
+            form = {k: v for k, v in request.form.items() if k not in SECRET_FIELDS}
+            record = {
+                't': round(time.monotonic() - started, 4),
+                # Scenarios are named by view, without the blueprint
+                'scenario': request.endpoint.rpartition('.')[2] if request.endpoint else None,
+                'method': request.method,
+                'path': request.path,
+                'query': request.args.to_dict(),
+                'form': form or None,
+                'user': current_user.email if current_user.is_authenticated else None,
+            }
+            with lock, open(path, 'a') as f:
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+        return response
@@ -0,0 +1,207 @@
+"""Bulk import of listings from a CSV or JSONL file, for `flask import-properties` and POST /owner/import.
+
+Each row has title, description, location, rent and property_type (checked
+with PropertyForm's rules), optional images (a list in JSONL, '|'-separated
+in CSV) naming files in an image directory or zip archive, and an optional
+external_id. Rows are read one at a time and inserted IMPORT_BATCH_SIZE per
+transaction; their images are staged like uploads and resized in the image
+worker pool. Every listing stores its row's import key (the external_id, or
+a hash of the row), so importing a file again after a failure skips the
+rows already committed and carries on with the rest.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import zipfile
+
+from flask import current_app
+from werkzeug.datastructures import FileStorage, MultiDict
+from werkzeug.security import safe_join
+
+from forms import PropertyForm
+from geo_index import index_location
+from geocoding import set_coordinates
+from image_pipeline import allowed_file, stage_image, submit_images
+from listing_cache import invalidate_listings
+from models import db, Property
+from recommendations import refresh_similar
+from search_index import index_property
+
+FIELDS = ('title', 'description', 'location', 'rent', 'property_type')
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+# Longest external_id accepted (the width of Property.import_key)
+MAX_EXTERNAL_ID = 100
+# Imports up to this size refresh each new listing's similar properties;
+# bigger ones leave them to a full rebuild-similar, which is cheaper by then
+SIMILAR_REFRESH_LIMIT = 100
+
+
+def import_format(filename):
+    """'csv' or 'jsonl' from a file's extension, or None."""
+    return FORMATS.get(os.path.splitext(filename)[1].lower())
+
+
+class ImageDirectory:
+    """Image paths in import rows, relative to a directory."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _path(self, name):
+        path = safe_join(self.path, name)
+        return path if path is not None and os.path.isfile(path) else None
+
+    def exists(self, name):
+        return self._path(name) is not None
+
+    def open(self, name):
+        return open(self._path(name), 'rb')
+
+
+class ImageArchive:
+    """Image paths in import rows, as members of a zip archive (a path or a seekable binary file)."""
+
+    def __init__(self, file):
+        self.zip = zipfile.ZipFile(file)
+        self.names = set(self.zip.namelist())
+
+    def exists(self, name):
+        return name in self.names
+
+    def open(self, name):
+        return self.zip.open(name)
+
+
+def open_images(path):
+    """ImageArchive for a .zip file, ImageDirectory otherwise."""
+    return ImageArchive(path) if zipfile.is_zipfile(path) else ImageDirectory(path)
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, row, error) for each record of a binary CSV or JSONL stream, without reading ahead."""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+    for number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line), None
+        except ValueError as e:
+            yield number, None, f"not valid JSON ({e})"
+
+
+def validate_row(row, images):
+    """Check a row as the add property form would; returns (Property fields plus images, None) or (None, error)."""
+    if not isinstance(row, dict):
+        return None, "expected an object of listing fields"
+    formdata = MultiDict({name: '' if row.get(name) is None else str(row[name]) for name in FIELDS})
+    form = PropertyForm(formdata=formdata, meta={'csrf': False})
+    if not form.validate():
+        return None, '; '.join(f"{name}: {messages[0]}" for name, messages in form.errors.items())
+
+    names = row.get('images') or []
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split('|') if name.strip()]
+    if not (isinstance(names, list) and all(isinstance(name, str) for name in names)):
+        return None, "images: expected a list of paths"
+    for name in names:
+        if not allowed_file(name):
+            return None, f"images: {name} is not an allowed image type"
+        if images is None or not images.exists(name):
+            return None, f"images: {name} not found"
+
+    fields = {name: getattr(form, name).data for name in FIELDS}
+    external_id = str(row.get('external_id') or '').strip()
+    if len(external_id) > MAX_EXTERNAL_ID:
+        return None, f"external_id: must be at most {MAX_EXTERNAL_ID} characters"
+    # Without an external_id the row's content identifies it
+    content = json.dumps([fields[name] for name in FIELDS] + names)
+    fields['import_key'] = external_id or 'sha256:' + hashlib.sha256(content.encode()).hexdigest()
+    fields['images'] = names
+    return fields, None
+
+
+def _import_batch(batch, owner_id, images, totals, imported_ids):
+    """Insert one batch of rows in a single transaction and queue their images; returns the batch's errors."""
+    errors, valid = [], []
+    for line, row, error in batch:
+        fields = None
+        if error is None:
+            fields, error = validate_row(row, images)
+        if error:
+            errors.append({'line': line, 'error': error})
+        else:
+            valid.append(fields)
+
+    keys = [fields['import_key'] for fields in valid]
+    existing = {key for (key,) in db.session.query(Property.import_key).filter(
+        Property.owner_id == owner_id, Property.import_key.in_(keys))}
+    added = []
+    for fields in valid:
+        if fields['import_key'] in existing:
+            totals['skipped'] += 1
+            continue
+        existing.add(fields['import_key'])  # a row repeated later in the file
+        names = fields.pop('images')
+        prop = Property(owner_id=owner_id, **fields)
+        set_coordinates(prop)
+        db.session.add(prop)
+        added.append((prop, names))
+    db.session.flush()
+
+    staged = []
+    for prop, names in added:
+        for name in names:
+            with images.open(name) as f:
+                image = stage_image(FileStorage(f, filename=name), prop.id)
+            if image:
+                staged.append(image)
+        index_property(prop)
+        index_location(prop)
+    ids = [prop.id for prop, _ in added]
+    db.session.commit()
+    invalidate_listings()
+    submit_images(staged)
+
+    imported_ids.extend(ids)
+    totals['line'] = batch[-1][0]
+    totals['imported'] += len(ids)
+    totals['invalid'] += len(errors)
+    return errors
+
+
+def import_listings(stream, fmt, owner_id, images=None, batch_size=None):
+    """Import the listings of a CSV or JSONL stream for owner_id.
+
+    images is an ImageDirectory or ImageArchive for the rows' image paths.
+    Yields a progress dict after every batch: the last line read, running
+    'imported', 'skipped' (already imported) and 'invalid' counts, the
+    batch's row 'errors' and 'done', which is True on the final one. Up to
+    SIMILAR_REFRESH_LIMIT new listings get their similar properties
+    refreshed before the final dict; for bigger imports it has
+    'similar_stale' set, and the lists wait for rebuild_similar() (the
+    CLI runs it straight away, POST /owner/import leaves it to the nightly
+    rebuild-similar). Nothing is written until the generator is iterated.
+    """
+    batch_size = batch_size or current_app.config['IMPORT_BATCH_SIZE']
+    totals = {'line': 0, 'imported': 0, 'skipped': 0, 'invalid': 0}
+    imported_ids, batch = [], []
+    for record in read_rows(stream, fmt):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            errors = _import_batch(batch, owner_id, images, totals, imported_ids)
+            batch = []
+            yield dict(totals, errors=errors, done=False)
+    errors = _import_batch(batch, owner_id, images, totals, imported_ids) if batch else []
+
+    similar_stale = len(imported_ids) > SIMILAR_REFRESH_LIMIT
+    if not similar_stale:
+        for prop_id in imported_ids:
+            refresh_similar(prop_id)
+    yield dict(totals, errors=errors, done=True, similar_stale=similar_stale)
@@ -0,0 +1,280 @@
+"""`flask --app app <command>` maintenance commands, and Flask-Migrate's `flask db`."""
+import sys
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from assets import build_assets, vendor_assets
+from bulk_import import FORMATS, import_format, import_listings, open_images
+from geo_index import RTREE_TABLE, GeoArea, get_geo_index
+from geocoding import geocode_properties
+from image_pipeline import requeue_pending_images, shutdown_pool, backfill_image_variants
+from listing_cache import get_listing_cache
+from listings import filtered_listings, owner_listings, favorite_listings, count_queries
+from messaging import conversation_query, THREAD_SORT, THREAD_KEYS
+from models import db, User, Property, PropertyImage, Message as MessageModel
+from pagination import page_query, sort_keys, encode_cursor
+from popularity import reconcile_popularity
+from facets import facet_query
+from recommendations import similar_query, rebuild_similar
+from search_index import get_search_index
+from upload_storage import dedupe_uploads
+
+
+def register_commands(app):
+    from flask_migrate import Migrate
+
+    Migrate(app, db, render_as_batch=True)
+    for command in (init_db, build_assets_command, vendor_assets_command, rebuild_search_index, check_query_budget,
+                    process_pending_images, reconcile_popularity_command, rebuild_similar_command, geocode_properties_command,
+                    backfill_image_variants_command, dedupe_uploads_command, import_properties_command, check_indexes):
+        app.cli.add_command(command)
+
+# -------------------------------------------------------
+# CLI COMMANDS
+# -------------------------------------------------------
+
+@click.command('init-db')
+@with_appcontext
+def init_db():
+    """Create any missing tables (for a fresh development database; use `flask db upgrade` otherwise)."""
+    db.create_all()
+    print('Database tables created')
+
+@click.command('build-assets')
+@with_appcontext
+def build_assets_command():
+    """Rebuild the fingerprinted CSS/JS bundles in static/dist (the app also does this when a source changes)."""
+    manifest = build_assets(current_app.static_folder)
+    print(f"Built {len(manifest)} bundles: {', '.join(sorted(manifest))}")
+
+@click.command('vendor-assets')
+@with_appcontext
+def vendor_assets_command():
+    """Download Bootstrap and Font Awesome into static/vendor so pages stop loading them from CDNs."""
+    for path in vendor_assets(current_app.static_folder):
+        print(f"Downloaded {path}")
+    manifest = build_assets(current_app.static_folder)
+    print(f"Built {len(manifest)} bundles; commit static/vendor to serve them from this app")
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index():
+    """Rebuild the full-text search index from the properties table."""
+    index = get_search_index()
+    index.rebuild()
+    db.session.commit()
+    print(f"Search index rebuilt ({index.name} backend)")
+
+@click.command('check-query-budget')
+@with_appcontext
+def check_query_budget():
+    """Fail if a listing page's SQL query count grows with its cards or exceeds LISTING_QUERY_BUDGET.
+
+    Listing pages eager-load images and owners, so their query count must not
+    grow with the number of cards: /home and /search are fetched with
+    ?limit=N and ?limit=2N (N = the budget) and must issue the same number of
+    queries. Every page must also answer 200 within the budget. Run this in
+    CI against a database with at least 2N listings.
+    """
+    budget = current_app.config['LISTING_QUERY_BUDGET']
+    owner = User.query.filter_by(is_owner=True).first()
+    if owner is None:
+        print("No owner account found; seed the database first (python -m benchmarks.generate_data)")
+        sys.exit(1)
+    if Property.query.count() < 2 * budget:
+        print(f"Needs at least {2 * budget} listings to tell a constant query count from an N+1; "
+              "seed more (python -m benchmarks.generate_data)")
+        sys.exit(1)
+
+    scaled_pages = ['/home', '/home?sort=rent_low', '/search', '/search?q=flat']
+    pages = ['/favorites', '/profile', '/owner/dashboard']
+    get_search_index()  # build the index up front so its one-off setup isn't counted
+    failed = False
+    with current_app.test_client() as client:
+        with client.session_transaction() as session:
+            session['_user_id'] = str(owner.id)
+            session['_fresh'] = True
+
+        def measure(url):
+            get_listing_cache().clear()  # measure uncached pages; a cache hit would hide an N+1
+            with count_queries() as statements:
+                response = client.get(url)
+            return response.status_code, len(statements)
+
+        for page in scaled_pages + pages:
+            sizes = [budget, 2 * budget] if page in scaled_pages else [None]
+            results = [measure(page if size is None else f"{page}{'&' if '?' in page else '?'}limit={size}")
+                       for size in sizes]
+            counts = [count for _, count in results]
+            if any(status != 200 for status, _ in results):
+                verdict = 'BAD STATUS'
+            elif max(counts) > budget:
+                verdict = 'OVER BUDGET'
+            elif len(set(counts)) > 1:
+                verdict = 'GROWS WITH CARDS'
+            else:
+                verdict = 'OK'
+            failed = failed or verdict != 'OK'
+            statuses = '/'.join(str(status) for status, _ in results)
+            print(f"{page:<24} {statuses:<7} {' / '.join(map(str, counts)):>7} queries  {verdict}")
+
+    if failed:
+        print(f"Query budget check failed (budget {budget} per page, pages of {budget} and {2 * budget} cards)")
+        sys.exit(1)
+
+@click.command('process-pending-images')
+@with_appcontext
+def process_pending_images():
+    """Re-run processing for images left pending by a crash or restart."""
+    requeued, lost = requeue_pending_images()
+    shutdown_pool(wait=True)
+    print(f"Processed {requeued} pending image(s); {lost} had no staged upload and were marked failed")
+
+@click.command('reconcile-popularity')
+@with_appcontext
+def reconcile_popularity_command():
+    """Recount favorite and message counters behind the 'popular' sort; run it periodically (e.g. from cron)."""
+    fixed = reconcile_popularity()
+    print(f"Corrected popularity counters on {fixed} propert{'y' if fixed == 1 else 'ies'}")
+
+@click.command('rebuild-similar')
+@with_appcontext
+def rebuild_similar_command():
+    """Recompute every property's similar listings (TF-IDF text and rent); run it nightly."""
+    print(f"Computed similar listings for {rebuild_similar()} properties")
+
+@click.command('geocode-properties')
+@with_appcontext
+def geocode_properties_command():
+    """Geocode every listing's location from the gazetteer again and rebuild the spatial index."""
+    located, unknown = geocode_properties()
+    index = get_geo_index()
+    index.rebuild()
+    db.session.commit()
+    print(f"Located {located} properties, {unknown} not in the gazetteer ({index.name} index rebuilt)")
+
+@click.command('backfill-image-variants')
+@with_appcontext
+def backfill_image_variants_command():
+    """Generate thumb/card/full WebP/AVIF variants for images uploaded before variants existed."""
+    done = failed = 0
+    for image, error in backfill_image_variants():
+        if error:
+            failed += 1
+            print(f"Error generating variants for {image.filename}: {error}")
+        else:
+            done += 1
+            print(f"Generated variants for {image.filename}")
+    shutdown_pool(wait=True)
+    print(f"Backfilled {done} image(s), {failed} failed")
+
+@click.command('dedupe-uploads')
+@click.option('--dry-run', is_flag=True, help="Report what would change without touching files or rows.")
+@with_appcontext
+def dedupe_uploads_command(dry_run):
+    """Collapse byte-identical uploads onto one content-addressed file each."""
+    stats = dedupe_uploads(dry_run=dry_run)
+    prefix = "Would collapse" if dry_run else "Collapsed"
+    print(f"{prefix} {stats['files']} legacy file(s) into {stats['renamed']}: "
+          f"{stats['removed']} duplicate(s) removed, {stats['rows_updated']} image row(s) repointed, "
+          f"{stats['unreferenced']} unreferenced file(s)")
+
+@click.command('import-properties')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--owner', 'owner_email', required=True, help="Email of the owner account the listings are added to.")
+@click.option('--images', 'images_path', type=click.Path(exists=True),
+              help="Directory or .zip archive that the rows' image paths refer to.")
+@click.option('--format', 'fmt', type=click.Choice(sorted(set(FORMATS.values()))),
+              help="File format (default: from the file's extension).")
+@click.option('--batch-size', type=int, help="Rows per transaction (default: IMPORT_BATCH_SIZE).")
+@with_appcontext
+def import_properties_command(path, owner_email, images_path, fmt, batch_size):
+    """Add listings in bulk from a CSV or JSONL file; after a failure, run it again to carry on where it stopped."""
+    owner = User.query.filter_by(email=owner_email, is_owner=True).first()
+    if owner is None:
+        print(f"No owner account with email {owner_email}")
+        sys.exit(1)
+    fmt = fmt or import_format(path)
+    if fmt is None:
+        print("Can't tell the file format from its extension; pass --format")
+        sys.exit(1)
+
+    images = open_images(images_path) if images_path else None
+    with open(path, 'rb') as f:
+        for progress in import_listings(f, fmt, owner.id, images, batch_size):
+            for error in progress['errors']:
+                print(f"Line {error['line']}: {error['error']}")
+            print(f"{'Done' if progress['done'] else 'Line ' + str(progress['line'])}: "
+                  f"{progress['imported']} imported, {progress['skipped']} already imported, "
+                  f"{progress['invalid']} invalid")
+            if progress.get('similar_stale'):
+                print(f"Computed similar listings for {rebuild_similar()} properties")
+    print("Waiting for images to be processed...")
+    shutdown_pool(wait=True)
+
+def explain_query_plan(query):
+    """Return SQLite's EXPLAIN QUERY PLAN lines for an ORM query."""
+    compiled = query.statement.compile(db.engine, compile_kwargs={'render_postcompile': True})
+    params = tuple(str(value) if isinstance(value, datetime) else value
+                   for value in (compiled.params[name] for name in compiled.positiontup))
+    rows = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + compiled.string, params).fetchall()
+    return [row[-1] for row in rows]
+
+@click.command('check-indexes')
+@with_appcontext
+def check_indexes():
+    """Fail if a hot query's EXPLAIN QUERY PLAN doesn't use the index built for it."""
+    if db.engine.dialect.name != 'sqlite':
+        print("check-indexes only understands SQLite query plans")
+        sys.exit(1)
+
+    per_page = current_app.config['LISTINGS_PER_PAGE']
+
+    def listing_page(sort, ptype=None, cursor_values=None, area=None):
+        query, _ = filtered_listings(ptype=ptype, area=area)
+        cursor = encode_cursor(sort, cursor_values) if cursor_values else None
+        return page_query(query, sort, sort_keys(sort), cursor, per_page)
+
+    later = datetime(2000, 1, 1)
+    hot_queries = [
+        ('home newest', listing_page('newest'), 'ix_properties_created_at_id'),
+        ('home newest, page N', listing_page('newest', cursor_values=[later, 1]), 'ix_properties_created_at_id'),
+        ('home rent_low', listing_page('rent_low'), 'ix_properties_rent_id'),
+        ('search rent_high, page N', listing_page('rent_high', cursor_values=[5000.0, 1]), 'ix_properties_rent_id'),
+        ('search type + oldest', listing_page('oldest', ptype='2BHK'), 'ix_properties_type_created_at_id'),
+        ('home popular', listing_page('popular'), 'ix_properties_popularity_id'),
+        ('search type + popular, page N', listing_page('popular', ptype='2BHK', cursor_values=[10, 1]),
+         'ix_properties_type_popularity_id'),
+        ('search type + rent_low, page N', listing_page('rent_low', ptype='2BHK', cursor_values=[5000.0, 1]),
+         'ix_properties_type_rent_id'),
+        ('owner dashboard', owner_listings(1), 'ix_properties_owner_id_created_at'),
+        ('card images', PropertyImage.query.filter(PropertyImage.property_id.in_([1, 2, 3])),
+         'ix_property_images_property_id_id'),
+        ('message thread', page_query(MessageModel.query.filter_by(tenant_id=2, property_id=1),
+                                      THREAD_SORT, THREAD_KEYS, per_page=current_app.config['MESSAGES_PER_PAGE']),
+         'ix_messages_property_id_tenant_id_timestamp'),
+        ('owner threads on a listing', MessageModel.query.filter_by(owner_id=1, property_id=1)
+         .with_entities(MessageModel.tenant_id).group_by(MessageModel.tenant_id),
+         'ix_messages_owner_id_property_id_tenant_id_read_at'),
+        ('owner inbox', conversation_query(1), 'ix_messages_owner_id_property_id_tenant_id_read_at'),
+        ('similar properties', similar_query(1).limit(2), 'ix_similar_properties_property_id_rank'),
+        ('user favorites', favorite_listings(1), 'ix_favorites_user_id_created_at'),
+        ('search facets', facet_query('', 5000, 20000), 'ix_properties_type_rent_id'),
+        ('search near a place', listing_page('newest', area=GeoArea.around(18.52, 73.86, 5)),
+         RTREE_TABLE if get_geo_index().name == 'rtree' else 'ix_properties_geohash'),
+    ]
+
+    failed = False
+    for name, query, index_name in hot_queries:
+        plan = explain_query_plan(query)
+        uses_index = any(index_name in line for line in plan)
+        failed = failed or not uses_index
+        print(f"{'OK  ' if uses_index else 'FAIL'} {name:<32} expects {index_name}")
+        for line in plan:
+            print(f"       {line}")
+
+    if failed:
+        sys.exit(1)
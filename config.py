@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -7,8 +8,126 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-here'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///house_rental.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+    # 'tuned' applies the settings below (database.py); 'default' leaves SQLAlchemy's own
+    DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE') or 'tuned'
+    # SQLite, set on every connection: WAL journal, synchronous=NORMAL, and
+    # writers wait up to SQLITE_BUSY_TIMEOUT ms for the lock instead of failing
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT') or 5000)
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE') or 256 * 1024 * 1024)
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE') or -64000)  # negative: KiB
+    # Server databases (per worker process)
+    DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE') or 10)
+    DATABASE_MAX_OVERFLOW = int(os.environ.get('DATABASE_MAX_OVERFLOW') or 20)
+    DATABASE_POOL_TIMEOUT = int(os.environ.get('DATABASE_POOL_TIMEOUT') or 10)
+    DATABASE_POOL_RECYCLE = int(os.environ.get('DATABASE_POOL_RECYCLE') or 1800)
+    # Read-only pages (listings, search, property detail) read from this
+    # replica when set; it may lag the primary by the replication delay
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+    # Raw uploads wait here until a worker process has resized them into UPLOAD_FOLDER
+    UPLOAD_STAGING_FOLDER = os.environ.get('UPLOAD_STAGING_FOLDER') or os.path.join(UPLOAD_FOLDER, 'staging')
+    # 'async' resizes in a process pool of IMAGE_WORKERS; 'sync' resizes inside the request
+    IMAGE_PROCESSING = os.environ.get('IMAGE_PROCESSING') or 'async'
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS') or max(1, (os.cpu_count() or 2) // 2))
+    # Responsive variant formats, best first; ones this Pillow build can't encode are skipped
+    IMAGE_FORMATS = ['avif', 'webp', 'jpeg']
+    # Stored uploads never change once written, so browsers may cache them for a year
+    UPLOADS_MAX_AGE = int(os.environ.get('UPLOADS_MAX_AGE') or 365 * 24 * 3600)
+    # Let a front proxy stream /uploads: None, 'x-sendfile' (Apache, lighttpd) or
+    # 'x-accel-redirect' (nginx, with an internal location at UPLOADS_ACCEL_PREFIX)
+    UPLOADS_SENDFILE = os.environ.get('UPLOADS_SENDFILE') or None
+    UPLOADS_ACCEL_PREFIX = os.environ.get('UPLOADS_ACCEL_PREFIX') or '/_uploads/'
+    # Bulk imports (bulk_import.py) insert listings in transactions of this many rows
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE') or 500)
+
+    # CSS/JS bundles in static/dist are named by content hash (assets.py), so
+    # they can be cached as immutable for this long
+    ASSETS_MAX_AGE = int(os.environ.get('ASSETS_MAX_AGE') or 365 * 24 * 3600)
+    # Compiled templates are kept here across restarts ('' to turn it off)
+    TEMPLATE_CACHE_DIR = os.environ.get('TEMPLATE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'house-rental-jinja'))
+
+    # Full-text search backend: 'auto' (FTS5 on SQLite, in-memory otherwise), 'fts5' or 'memory'
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND') or 'auto'
+    # The in-memory backend returns at most this many best-ranked hits per search
+    SEARCH_MAX_HITS = int(os.environ.get('SEARCH_MAX_HITS') or 1000)
+
+    # Radius/bbox search: locations are geocoded offline against GAZETTEER_FILE
+    # (CSV of name, city, latitude, longitude, aliases) and indexed by GEO_BACKEND:
+    # 'auto' (an R*Tree on SQLite, the geohash column otherwise), 'rtree' or 'geohash'
+    GAZETTEER_FILE = os.environ.get('GAZETTEER_FILE') or os.path.join(BASE_DIR, 'data', 'gazetteer.csv')
+    GEO_BACKEND = os.environ.get('GEO_BACKEND') or 'auto'
+
+    # Cache of listing pages and rendered cards: 'memory' (one worker process
+    # only; gunicorn.conf.py won't start more), 'redis' (shared, at
+    # LISTING_CACHE_URL) or 'none'
+    LISTING_CACHE = os.environ.get('LISTING_CACHE') or 'memory'
+    LISTING_CACHE_URL = os.environ.get('LISTING_CACHE_URL') or 'redis://localhost:6379/0'
+    LISTING_CACHE_SIZE = int(os.environ.get('LISTING_CACHE_SIZE') or 2048)
+    LISTING_CACHE_TTL = int(os.environ.get('LISTING_CACHE_TTL') or 300)
+    # Each user's favorite ids are cached this many seconds; keep it short, as
+    # the memory cache of one worker doesn't see favorites changed in another
+    FAVORITES_CACHE_TTL = int(os.environ.get('FAVORITES_CACHE_TTL') or 5)
+
+    # Listing pages (/home, /search) are keyset-paginated in pages of this size
+    LISTINGS_PER_PAGE = int(os.environ.get('LISTINGS_PER_PAGE') or 24)
+    LISTINGS_MAX_PER_PAGE = 100
+    # Maximum SQL queries a listing page may issue (checked by `flask check-query-budget`)
+    LISTING_QUERY_BUDGET = 8
     
+    # Property pages show this many of the latest messages per conversation
+    # (and, to owners, this many conversations); older ones load on demand
+    MESSAGES_PER_PAGE = int(os.environ.get('MESSAGES_PER_PAGE') or 20)
+    MESSAGE_THREADS_PER_PAGE = 10
+
+    # New messages are pushed over /messages/stream (SSE) or /messages/poll
+    # (long-poll) through MESSAGE_BROKER: 'memory' (one worker process only;
+    # gunicorn.conf.py won't start more) or 'redis' (shared, at MESSAGE_BROKER_URL)
+    MESSAGE_BROKER = os.environ.get('MESSAGE_BROKER') or 'memory'
+    MESSAGE_BROKER_URL = os.environ.get('MESSAGE_BROKER_URL') or 'redis://localhost:6379/0'
+    MESSAGE_STREAM_KEEPALIVE = 20
+    MESSAGE_POLL_TIMEOUT = 25
+
+    # Neighbours stored per property by `flask rebuild-similar`, and how many
+    # same-type listings closest in rent an add or edit compares against
+    SIMILAR_PROPERTIES = int(os.environ.get('SIMILAR_PROPERTIES') or 10)
+    SIMILAR_CANDIDATES = int(os.environ.get('SIMILAR_CANDIDATES') or 1000)
+
+    # Detail page views: 'buffered' counts them in memory and writes them every
+    # VIEW_FLUSH_INTERVAL seconds (or VIEW_FLUSH_SIZE views), 'sync' writes each
+    # one inside the request, 'off' doesn't count them
+    VIEW_TRACKING = os.environ.get('VIEW_TRACKING') or 'buffered'
+    VIEW_FLUSH_INTERVAL = int(os.environ.get('VIEW_FLUSH_INTERVAL') or 10)
+    VIEW_FLUSH_SIZE = int(os.environ.get('VIEW_FLUSH_SIZE') or 500)
+
+    # Append every request to this JSONL file for benchmark replay (see benchmarks/traffic.py)
+    TRAFFIC_RECORD_FILE = os.environ.get('TRAFFIC_RECORD_FILE')
+    
+    # Passwords are hashed with PASSWORD_HASH_METHOD (a werkzeug method such as
+    # 'pbkdf2:sha256:600000' or 'scrypt:32768:8:1'); hashes made under other
+    # parameters are replaced at the next successful login. 'pool' runs hashing
+    # in PASSWORD_WORKERS processes with up to PASSWORD_QUEUE requests waiting
+    # (others give up after PASSWORD_QUEUE_TIMEOUT seconds) and suits sync or
+    # threaded workers only: under gevent the waiting result() blocks the whole
+    # worker. 'inline' (the default) hashes in the request. Measure a method's
+    # cost with benchmarks/password_hashing.py.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'pbkdf2:sha256:600000'
+    PASSWORD_HASHING = os.environ.get('PASSWORD_HASHING') or 'inline'
+    PASSWORD_WORKERS = int(os.environ.get('PASSWORD_WORKERS') or max(1, (os.cpu_count() or 2) // 2))
+    PASSWORD_QUEUE = int(os.environ.get('PASSWORD_QUEUE') or 16)
+    PASSWORD_QUEUE_TIMEOUT = float(os.environ.get('PASSWORD_QUEUE_TIMEOUT') or 5)
+
+    # flask_login loads the signed-in user from the listing cache for this many
+    # seconds before reading the users table again (0 reads it every request)
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL') or 30)
+    
+    # The 'house_rental' logger's level; requests slower than SLOW_REQUEST_MS
+    # and SQL statements slower than SLOW_QUERY_MS are logged as warnings
+    LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
+    SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS') or 1000)
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS') or 100)
+    # Serve Prometheus metrics at /metrics (keep it off the public internet)
+    METRICS_ENABLED = (os.environ.get('METRICS_ENABLED') or 'true').lower() in ('1', 'true', 'yes')
+
     # Email configuration (for password reset)
     MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.gmail.com'
     MAIL_PORT = int(os.environ.get('MAIL_PORT') or 587)
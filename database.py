@@ -0,0 +1,120 @@
+"""Engine settings per database backend, and routing of read-only views to a replica."""
+import os
+import weakref
+from functools import partial, wraps
+
+from flask import current_app, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql.elements import TextClause
+
+REPLICA_BIND = 'replica'
+
+
+def engine_options(config, url):
+    """SQLAlchemy engine options for url under DATABASE_PROFILE.
+
+    Server databases get a sized connection pool that checks connections
+    before use; SQLite's settings are PRAGMAs applied per connection instead
+    (see init_engines()).
+    """
+    if config['DATABASE_PROFILE'] != 'tuned' or make_url(url).get_backend_name() == 'sqlite':
+        return {}
+    return {
+        'pool_size': config['DATABASE_POOL_SIZE'],
+        'max_overflow': config['DATABASE_MAX_OVERFLOW'],
+        'pool_timeout': config['DATABASE_POOL_TIMEOUT'],
+        'pool_recycle': config['DATABASE_POOL_RECYCLE'],
+        'pool_pre_ping': True,
+    }
+
+
+def configure_database(app):
+    """Fill in engine options and the replica bind; call before db.init_app(app)."""
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config, app.config['SQLALCHEMY_DATABASE_URI'])
+    replica = app.config['DATABASE_REPLICA_URL']
+    if replica:
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        binds[REPLICA_BIND] = dict(engine_options(app.config, replica), url=replica)
+
+
+def _sqlite_pragmas(config, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers carry on while a writer commits; NORMAL only syncs at
+    # checkpoints, which is still durable against application crashes
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT'])}")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}")
+    cursor.execute(f"PRAGMA cache_size={int(config['SQLITE_CACHE_SIZE'])}")
+    cursor.close()
+
+
+def init_engines(app, db):
+    """Apply the SQLite PRAGMAs to every new connection of the app's SQLite engines."""
+    if app.config['DATABASE_PROFILE'] != 'tuned':
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', partial(_sqlite_pragmas, app.config))
+
+
+# Engines whose pools forked children drop; weak, so apps that are thrown
+# away (one per test) don't keep theirs alive
+_fork_engines = weakref.WeakSet()
+
+
+def _dispose_after_fork():
+    for engine in list(_fork_engines):
+        engine.dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+def reset_after_fork(app, db):
+    """Give forked processes (gunicorn workers under preload_app) connection pools of their own.
+
+    Connections opened in the parent stay open there; the child only drops
+    its references to them (SQLAlchemy's engine.dispose(close=False)). One
+    fork handler, registered at import, covers the engines of every app.
+    """
+    with app.app_context():
+        _fork_engines.update(db.engines.values())
+
+
+def _is_write(clause):
+    if clause is None:
+        return False
+    if isinstance(clause, TextClause):
+        return not str(clause).lstrip().upper().startswith(('SELECT', 'WITH', 'PRAGMA'))
+    return getattr(clause, 'is_dml', False)
+
+
+class RoutingSession(Session):
+    """Session that sends a read-only view's queries to the replica bind.
+
+    Once the request writes anything (a flush or an INSERT/UPDATE/DELETE),
+    the rest of it reads from the primary too, so it sees its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('use_replica'):
+            if self._flushing or _is_write(clause):
+                self.info['use_replica'] = False
+            elif REPLICA_BIND in self._db.engines:
+                return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only(view):
+    """Serve GET requests of view from the replica when DATABASE_REPLICA_URL is set."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            current_app.extensions['sqlalchemy'].session.info['use_replica'] = True
+        return view(*args, **kwargs)
+    return wrapper
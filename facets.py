@@ -0,0 +1,70 @@
+from sqlalchemy import and_, case, func, true
+
+from listing_cache import get_listing_cache, page_key
+from listings import parse_rent
+from models import db, Property
+from geo_index import apply_area
+from search_index import apply_text_search
+
+# Upper bounds of the rent histogram's buckets; the last bucket is open-ended
+RENT_BUCKETS = [5000, 10000, 15000, 20000, 25000, 30000, 40000, 50000, 75000, 100000]
+
+
+def _rent_bucket():
+    return case(*[(Property.rent < edge, i) for i, edge in enumerate(RENT_BUCKETS)], else_=len(RENT_BUCKETS))
+
+
+def facet_query(q='', min_rent=None, max_rent=None, area=None):
+    """Listing counts matching q (and area), grouped by (property_type, rent bucket, inside [min_rent, max_rent])."""
+    bounds = [true()]
+    if min_rent is not None:
+        bounds.append(Property.rent >= min_rent)
+    if max_rent is not None:
+        bounds.append(Property.rent <= max_rent)
+    in_range = case((and_(*bounds), 1), else_=0)
+    query = (db.session.query(Property.property_type, _rent_bucket(), in_range, func.count())
+             .select_from(Property))
+    if q:
+        query, _ = apply_text_search(query, q)
+    if area is not None:
+        query = apply_area(query, area)
+    return query.group_by(Property.property_type, _rent_bucket(), in_range)
+
+
+def compute_facets(q='', min_rent=None, max_rent=None, ptype=None, area=None):
+    """Facet counts for the search form, from one facet_query() over the matching listings.
+
+    Type counts respect the text query and rent range but not the chosen
+    type, and the histogram respects the text query and type but not the
+    rent range, so each shows what changing that filter would return.
+    """
+    rows = facet_query(q, parse_rent(min_rent), parse_rent(max_rent), area).all()
+
+    types = {}
+    histogram = [0] * (len(RENT_BUCKETS) + 1)
+    total = 0
+    for prop_type, bucket, matches_rent, count in rows:
+        if matches_rent:
+            types[prop_type] = types.get(prop_type, 0) + count
+        if not ptype or prop_type == ptype:
+            histogram[bucket] += count
+            if matches_rent:
+                total += count
+    edges = [0] + RENT_BUCKETS + [None]
+    return {
+        'total': total,
+        'types': dict(sorted(types.items())),
+        'rent_histogram': [{'min': edges[i], 'max': edges[i + 1], 'count': count}
+                           for i, count in enumerate(histogram)],
+    }
+
+
+def cached_facets(q, min_rent, max_rent, ptype, area=None):
+    """compute_facets() through the listing cache; property writes retire the entries like listing pages."""
+    cache = get_listing_cache()
+    key = page_key('facets', q, min_rent, max_rent, ptype, None, None, None, area)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(q, min_rent, max_rent, ptype, area)
+        cache.set(key, facets)
+    return facets
@@ -0,0 +1,126 @@
+"""A user's favorites: a cached set of property ids, and batched adds/removes."""
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import delete, exists, insert, literal, select
+
+from listing_cache import get_listing_cache
+from models import db, Favorite, Property
+from popularity import bump_counters
+
+# Most operations accepted by one /favorites/batch request
+MAX_BATCH = 100
+
+
+def favorites_key(user_id):
+    return f"favorites:{user_id}"
+
+
+def favorite_ids(user_id, refresh=False):
+    """The set of property ids user_id has favorited.
+
+    Kept in the listing cache (as a list, so every backend can store it) for
+    FAVORITES_CACHE_TTL seconds or until the user's favorites change. A
+    change made through another worker only clears that worker's memory
+    cache, so the TTL is short; refresh=True reads the database regardless.
+    """
+    cache = get_listing_cache()
+    ids = None if refresh else cache.get(favorites_key(user_id))
+    if ids is None:
+        ids = [prop_id for (prop_id,) in db.session.query(Favorite.property_id).filter(Favorite.user_id == user_id)]
+        cache.set(favorites_key(user_id), ids, current_app.config['FAVORITES_CACHE_TTL'])
+    return set(ids)
+
+
+def invalidate_favorites(*user_ids):
+    get_listing_cache().delete(*[favorites_key(user_id) for user_id in user_ids])
+
+
+def _returns_rows():
+    """Whether INSERT/DELETE ... RETURNING can report exactly which favorites changed."""
+    dialect = db.session.get_bind().dialect
+    return dialect.insert_returning and dialect.delete_returning
+
+
+def _insert_favorites(user_id, property_ids):
+    """Insert-or-ignore user_id's favorites for property_ids; returns the ids that were new.
+
+    A single INSERT ... SELECT from properties, so ids of properties that
+    don't exist are skipped without looking them up first. Rows that already
+    exist are ignored through unique_user_property_favorite.
+    """
+    columns = ['user_id', 'property_id', 'created_at']
+    rows = (select(literal(user_id), Property.id, literal(datetime.utcnow(), Favorite.created_at.type))
+            .where(Property.id.in_(property_ids)))
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql') and _returns_rows():
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = (dialect_insert(Favorite).from_select(columns, rows)
+                .on_conflict_do_nothing(index_elements=['user_id', 'property_id'])
+                .returning(Favorite.property_id))
+        return {prop_id for (prop_id,) in db.session.execute(stmt)}
+
+    # Without RETURNING, pick the new ones first; IGNORE still covers a
+    # concurrent insert of the same favorite on MySQL
+    rows = rows.where(~exists().where(Favorite.user_id == user_id, Favorite.property_id == Property.id))
+    new_ids = {prop_id for (_, prop_id, _) in db.session.execute(rows)}
+    if new_ids:
+        stmt = insert(Favorite).from_select(columns, rows.where(Property.id.in_(new_ids)))
+        if dialect in ('mysql', 'mariadb'):
+            stmt = stmt.prefix_with('IGNORE')
+        db.session.execute(stmt)
+    return new_ids
+
+
+def _delete_favorites(user_id, property_ids):
+    """Delete user_id's favorites for property_ids; returns the ids that were removed."""
+    stmt = delete(Favorite).where(Favorite.user_id == user_id, Favorite.property_id.in_(property_ids))
+    if _returns_rows():
+        return {prop_id for (prop_id,) in db.session.execute(stmt.returning(Favorite.property_id))}
+    removed = {prop_id for (prop_id,) in db.session.query(Favorite.property_id).filter(
+        Favorite.user_id == user_id, Favorite.property_id.in_(property_ids))}
+    db.session.execute(stmt)
+    return removed
+
+
+def apply_favorite_changes(user_id, operations):
+    """Apply [(property_id, 'add' | 'remove'), ...] for user_id in one transaction.
+
+    The last operation on a property wins. The properties' favorite counters
+    move in the same transaction. Returns (added, removed), the number of
+    favorites that actually changed.
+    """
+    actions = dict(operations)
+    adds = [prop_id for prop_id, action in actions.items() if action == 'add']
+    removes = [prop_id for prop_id, action in actions.items() if action == 'remove']
+    added = _insert_favorites(user_id, adds) if adds else set()
+    removed = _delete_favorites(user_id, removes) if removes else set()
+    bump_counters(added, favorite_count=1)
+    bump_counters(removed, favorite_count=-1)
+    db.session.commit()
+    if added or removed:
+        invalidate_favorites(user_id)
+    return len(added), len(removed)
+
+
+def parse_operations(items):
+    """Validate a batch request's [{'property_id': ..., 'action': ...}] into (property_id, action) pairs.
+
+    Returns (operations, error message or None).
+    """
+    if not isinstance(items, list) or not items:
+        return None, 'operations must be a non-empty list'
+    if len(items) > MAX_BATCH:
+        return None, f'at most {MAX_BATCH} operations per request'
+    operations = []
+    for item in items:
+        try:
+            operations.append((int(item['property_id']), item['action']))
+        except (TypeError, KeyError, ValueError):
+            return None, 'each operation needs an integer property_id and an action'
+        if item['action'] not in ('add', 'remove'):
+            return None, "action must be 'add' or 'remove'"
+    return operations, None
@@ -0,0 +1,233 @@
+import math
+
+from flask import current_app
+from sqlalchemy import DDL, Integer, event, or_, text
+
+from geocoding import GEOHASH_PRECISION, encode_geohash, geocode, geohash_cell_size
+from models import db, Property
+
+KM_PER_DEGREE = 111.32
+DEFAULT_RADIUS_KM = 5.0
+MAX_RADIUS_KM = 100.0
+# Most geohash prefixes one bounding box is split into; fewer, coarser cells
+# mean fewer index range scans but more rows to filter out afterwards
+MAX_GEOHASH_CELLS = 16
+
+RTREE_TABLE = 'properties_rtree'
+CREATE_RTREE_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {RTREE_TABLE} USING rtree(id, min_lat, max_lat, min_lng, max_lng)"
+)
+
+# Like the FTS5 table, let db.create_all()/db.drop_all() manage the R*Tree too.
+event.listen(Property.__table__, 'after_create', DDL(CREATE_RTREE_TABLE).execute_if(dialect='sqlite'))
+event.listen(Property.__table__, 'before_drop', DDL(f"DROP TABLE IF EXISTS {RTREE_TABLE}").execute_if(dialect='sqlite'))
+
+
+class GeoArea:
+    """A search area: a bounding box, optionally narrowed to a circle around its centre."""
+
+    def __init__(self, south, west, north, east, center=None, radius_km=None):
+        self.south, self.west, self.north, self.east = south, west, north, east
+        self.center = center
+        self.radius_km = radius_km
+
+    @classmethod
+    def around(cls, latitude, longitude, radius_km):
+        dlat = radius_km / KM_PER_DEGREE
+        dlng = dlat / max(math.cos(math.radians(latitude)), 0.01)
+        return cls(max(latitude - dlat, -90.0), max(longitude - dlng, -180.0),
+                   min(latitude + dlat, 90.0), min(longitude + dlng, 180.0),
+                   center=(latitude, longitude), radius_km=radius_km)
+
+    def key(self):
+        """JSON-able identity of the area for cache keys."""
+        if self.center is not None:
+            return [round(self.center[0], 5), round(self.center[1], 5), self.radius_km]
+        return [round(value, 5) for value in (self.south, self.west, self.north, self.east)]
+
+
+def _float(value, low, high):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if low <= value <= high and math.isfinite(value) else None
+
+
+def parse_area(args):
+    """Build the GeoArea requested by ?near=, ?lat=&lng= or ?bbox=west,south,east,north.
+
+    near (a place name looked up in the gazetteer) and lat/lng take an
+    optional radius_km. Returns (area, error message); both are None when no
+    area was asked for.
+    """
+    radius_km = args.get('radius_km')
+    radius_km = DEFAULT_RADIUS_KM if not radius_km else _float(radius_km, 0.1, MAX_RADIUS_KM)
+    if radius_km is None:
+        return None, f"radius_km must be between 0.1 and {MAX_RADIUS_KM:g}"
+    if args.get('lat') or args.get('lng'):
+        latitude, longitude = _float(args.get('lat'), -90, 90), _float(args.get('lng'), -180, 180)
+        if latitude is None or longitude is None:
+            return None, "lat and lng must be valid coordinates"
+        return GeoArea.around(latitude, longitude, radius_km), None
+    if args.get('near'):
+        point = geocode(args['near'])
+        if point is None:
+            return None, f"Unknown location '{args['near']}'"
+        return GeoArea.around(*point, radius_km), None
+    if args.get('bbox'):
+        parts = args['bbox'].split(',')
+        if len(parts) == 4:
+            west, south = _float(parts[0], -180, 180), _float(parts[1], -90, 90)
+            east, north = _float(parts[2], -180, 180), _float(parts[3], -90, 90)
+            if None not in (west, south, east, north) and west <= east and south <= north:
+                return GeoArea(south, west, north, east), None
+        return None, "bbox must be west,south,east,north"
+    return None, None
+
+
+class RTreeGeoIndex:
+    """Property coordinates in an SQLite R*Tree virtual table, queried by bounding box."""
+
+    name = 'rtree'
+
+    def __init__(self):
+        db.session.execute(text(CREATE_RTREE_TABLE))
+        indexed = db.session.execute(text(f"SELECT count(*) FROM {RTREE_TABLE}")).scalar()
+        if indexed != Property.query.filter(Property.latitude.isnot(None)).count():
+            self.rebuild()
+        db.session.commit()
+
+    def add(self, prop):
+        self.remove(prop.id)
+        if prop.latitude is not None and prop.longitude is not None:
+            db.session.execute(
+                text(f"INSERT INTO {RTREE_TABLE}(id, min_lat, max_lat, min_lng, max_lng) "
+                     "VALUES (:id, :lat, :lat, :lng, :lng)"),
+                {'id': prop.id, 'lat': prop.latitude, 'lng': prop.longitude}
+            )
+
+    def remove(self, prop_id):
+        db.session.execute(text(f"DELETE FROM {RTREE_TABLE} WHERE id = :id"), {'id': prop_id})
+
+    def rebuild(self):
+        db.session.execute(text(f"DELETE FROM {RTREE_TABLE}"))
+        db.session.execute(text(
+            f"INSERT INTO {RTREE_TABLE}(id, min_lat, max_lat, min_lng, max_lng) "
+            "SELECT id, latitude, latitude, longitude, longitude FROM properties "
+            "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        ))
+
+    def apply(self, query, area):
+        # The R*Tree stores 32-bit floats rounded outwards, so this is a
+        # superset of the box; apply_area() filters the exact coordinates.
+        box = text(
+            f"SELECT id AS property_id FROM {RTREE_TABLE} "
+            "WHERE max_lat >= :south AND min_lat <= :north AND max_lng >= :west AND min_lng <= :east"
+        ).bindparams(south=area.south, north=area.north, west=area.west, east=area.east)
+        box = box.columns(property_id=Integer).subquery('geo')
+        return query.join(box, box.c.property_id == Property.id)
+
+
+class GeohashGeoIndex:
+    """Bounding box search through range scans of the indexed Property.geohash column.
+
+    set_coordinates() keeps the column current with every write, so there
+    is nothing to maintain here.
+    """
+
+    name = 'geohash'
+
+    def add(self, prop):
+        pass
+
+    def remove(self, prop_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def cells(self, area):
+        """Geohash prefixes whose cells together cover the area, as few and as fine as MAX_GEOHASH_CELLS allows."""
+        precision = GEOHASH_PRECISION
+        while precision > 1:
+            height, width = geohash_cell_size(precision)
+            rows = math.floor(area.north / height) - math.floor(area.south / height) + 1
+            columns = math.floor(area.east / width) - math.floor(area.west / width) + 1
+            if rows * columns <= MAX_GEOHASH_CELLS:
+                break
+            precision -= 1
+        height, width = geohash_cell_size(precision)
+        cells = set()
+        latitude = area.south
+        while True:
+            longitude = area.west
+            while True:
+                cells.add(encode_geohash(latitude, longitude, precision))
+                if longitude >= area.east:
+                    break
+                longitude = min(longitude + width, area.east)
+            if latitude >= area.north:
+                break
+            latitude = min(latitude + height, area.north)
+        return sorted(cells)
+
+    def apply(self, query, area):
+        # Each prefix is one index range; every geohash under it sorts between
+        # the prefix and the prefix padded with the last alphabet character
+        ranges = [Property.geohash.between(cell, cell.ljust(GEOHASH_PRECISION, 'z')) for cell in self.cells(area)]
+        return query.filter(or_(*ranges))
+
+
+def _rtree_available():
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    try:
+        db.session.execute(text(CREATE_RTREE_TABLE))
+        db.session.commit()
+    except Exception:
+        # This SQLite build was compiled without the R*Tree module.
+        db.session.rollback()
+        return False
+    return True
+
+
+def get_geo_index():
+    """Return the spatial index for the current app, creating it on first use."""
+    index = current_app.extensions.get('geo_index')
+    if index is None:
+        backend = current_app.config.get('GEO_BACKEND', 'auto')
+        if backend == 'rtree' or (backend == 'auto' and _rtree_available()):
+            index = RTreeGeoIndex()
+        else:
+            index = GeohashGeoIndex()
+        current_app.extensions['geo_index'] = index
+    return index
+
+
+def index_location(prop):
+    """Add or refresh a property's coordinates in the spatial index (call before committing)."""
+    get_geo_index().add(prop)
+
+
+def unindex_location(prop_id):
+    """Remove a property from the spatial index (call before committing)."""
+    get_geo_index().remove(prop_id)
+
+
+def apply_area(query, area):
+    """Restrict a Property query to listings inside area.
+
+    The spatial index narrows the rows to the bounding box; the circle is
+    then checked with an equirectangular distance, which is plain
+    arithmetic on every database and accurate to metres at city scale.
+    """
+    query = get_geo_index().apply(query, area)
+    query = query.filter(Property.latitude.between(area.south, area.north),
+                         Property.longitude.between(area.west, area.east))
+    if area.radius_km is not None:
+        latitude, longitude = area.center
+        dy = Property.latitude - latitude
+        dx = (Property.longitude - longitude) * math.cos(math.radians(latitude))
+        query = query.filter(dx * dx + dy * dy <= (area.radius_km / KM_PER_DEGREE) ** 2)
+    return query
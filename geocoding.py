@@ -0,0 +1,136 @@
+"""Offline geocoding of listing locations ("Kondhwa, Pune") against a local gazetteer file."""
+import csv
+from functools import lru_cache
+
+from flask import current_app
+from sqlalchemy import bindparam, func, update
+
+from models import db, Property
+from search_index import tokenize
+
+# Characters of geohash precision stored per property (about 1 m)
+GEOHASH_PRECISION = 12
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def normalize_place(value):
+    return ' '.join(tokenize(value))
+
+
+class Gazetteer:
+    """Known places with coordinates, loaded from a CSV of name, city, latitude, longitude, aliases.
+
+    A row whose name is its city is the city itself; any other row is a
+    locality within that city. Aliases are '|'-separated alternative names.
+    """
+
+    def __init__(self, path):
+        self.places = {}   # (name, city) -> (lat, lng)
+        self.by_name = {}  # name -> [(lat, lng), ...] across cities
+        self.cities = {}   # city name or alias -> canonical city name
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                city = normalize_place(row['city'])
+                point = (float(row['latitude']), float(row['longitude']))
+                names = [row['name']] + [alias for alias in (row.get('aliases') or '').split('|') if alias]
+                for name in map(normalize_place, names):
+                    if normalize_place(row['name']) == city:
+                        self.cities[name] = city
+                    self.places[(name, city)] = point
+                    self.by_name.setdefault(name, []).append(point)
+
+    def geocode(self, location):
+        """(latitude, longitude) of a free-text location, or None when nothing in it is known.
+
+        The last comma-separated part naming a known city picks the city; the
+        most specific earlier part that is a locality of that city wins, and
+        the city centre is the fallback. Without a city, a locality name that
+        is unique across cities still matches.
+        """
+        parts = [part for part in map(normalize_place, (location or '').split(',')) if part]
+        city = next((self.cities[part] for part in reversed(parts) if part in self.cities), None)
+        for part in parts:
+            if city is not None and (part, city) in self.places:
+                return self.places[(part, city)]
+            if city is None and len(self.by_name.get(part, [])) == 1:
+                return self.by_name[part][0]
+        if city is not None:
+            return self.places[(city, city)]
+        return None
+
+
+@lru_cache(maxsize=None)
+def load_gazetteer(path):
+    return Gazetteer(path)
+
+
+def get_gazetteer():
+    return load_gazetteer(str(current_app.config['GAZETTEER_FILE']))
+
+
+def geocode(location):
+    return get_gazetteer().geocode(location)
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Standard base32 geohash of a point; nearby points share long prefixes."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision):
+    """(height, width) in degrees of a geohash cell with this many characters."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def set_coordinates(prop):
+    """Geocode prop.location into its latitude, longitude and geohash (all None if unknown)."""
+    point = geocode(prop.location)
+    prop.latitude, prop.longitude = point or (None, None)
+    prop.geohash = encode_geohash(*point) if point else None
+
+
+def geocode_properties(batch_size=1000):
+    """Geocode every property's location again, e.g. after the gazetteer changed.
+
+    Works in id ranges, committing each. Returns (located, unknown) counts;
+    rebuild the spatial index afterwards.
+    """
+    gazetteer = get_gazetteer()
+    table = Property.__table__
+    stmt = (update(table).where(table.c.id == bindparam('prop_id'))
+            .values(latitude=bindparam('lat'), longitude=bindparam('lng'), geohash=bindparam('hash')))
+    max_id = db.session.query(func.max(Property.id)).scalar() or 0
+    located = unknown = 0
+    for start in range(0, max_id, batch_size):
+        rows = db.session.query(Property.id, Property.location).filter(
+            Property.id > start, Property.id <= start + batch_size)
+        values = []
+        for prop_id, location in rows:
+            point = gazetteer.geocode(location)
+            located += point is not None
+            unknown += point is None
+            lat, lng = point or (None, None)
+            values.append({'prop_id': prop_id, 'lat': lat, 'lng': lng,
+                           'hash': encode_geohash(lat, lng) if point else None})
+        if values:
+            db.session.execute(stmt, values)
+        db.session.commit()
+    return located, unknown
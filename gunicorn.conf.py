@@ -0,0 +1,65 @@
+"""gunicorn settings, read automatically when gunicorn is started from this directory.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is built once in the master (preload_app) and forked into the
+workers, so a worker boots in milliseconds and shares the imported code
+copy-on-write. Every setting can be overridden from the environment.
+"""
+import glob
+import multiprocessing
+import os
+import tempfile
+
+from config import Config
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('GUNICORN_BIND') or f"0.0.0.0:{os.environ.get('PORT') or 8000}"
+preload_app = True
+
+# gevent (the default) serves the long-lived /messages/stream and
+# /messages/poll connections as greenlets, so one worker per CPU is enough;
+# sync and gthread workers block per request and want 2 x CPUs + 1
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS') or 'gevent'
+cpus = multiprocessing.cpu_count()
+# The 'memory' message broker only reaches streams held by its own process,
+# and the 'memory' listing cache is only invalidated in the process that
+# made the write, so either gets a single worker; several need 'redis'
+process_local = [name for name in ('MESSAGE_BROKER', 'LISTING_CACHE') if getattr(Config, name) == 'memory']
+workers = int(os.environ.get('WEB_CONCURRENCY') or
+              (1 if process_local else cpus if worker_class == 'gevent' else 2 * cpus + 1))
+if workers > 1 and process_local:
+    raise RuntimeError(f"{workers} workers need a shared backend: set {' and '.join(process_local)} "
+                       f"to 'redis', or WEB_CONCURRENCY to 1")
+threads = int(os.environ.get('GUNICORN_THREADS') or (1 if worker_class == 'gevent' else 4))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS') or 1000)
+# Longer than MESSAGE_POLL_TIMEOUT, so a waiting long-poll isn't killed as a hung worker
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 60)
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so slow leaks can't build up
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS') or 5000)
+max_requests_jitter = max_requests // 10
+
+if worker_class == 'gevent':
+    # The preloaded app is imported in the master, before gevent's worker would
+    # patch the standard library; patch it first so the app's locks and sockets
+    # are the cooperative ones
+    from gevent import monkey
+
+    monkey.patch_all()
+
+# Each worker writes its metrics to files here and /metrics adds them up
+# (instrumentation.py). It has to be set before prometheus_client is imported.
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR',
+                                    os.path.join(tempfile.gettempdir(), 'house-rental-metrics'))
+os.makedirs(metrics_dir, exist_ok=True)
+# Start every server run from zero rather than adding to the last run's counts
+for path in glob.glob(os.path.join(metrics_dir, '*.db')):
+    os.remove(path)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
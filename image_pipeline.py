@@ -0,0 +1,271 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from flask import current_app
+from sqlalchemy import func
+
+from models import db, PropertyImage, variant_filename, variant_filenames
+from upload_storage import stream_to_staging, reference_count
+from listing_cache import invalidate_property
+from instrumentation import log, observe_image
+
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp', 'gif', 'bmp', 'tiff', 'svg', 'ico', 'avif'}
+
+# Bounding box of each responsive size; 'full' is also the main stored JPEG.
+VARIANT_SIZES = {'thumb': (400, 300), 'card': (800, 600), 'full': (1200, 800)}
+
+# Pillow save() arguments per output format
+FORMAT_OPTIONS = {
+    'avif': {'format': 'AVIF', 'quality': 60},
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 85, 'optimize': True, 'progressive': True},
+}
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def allowed_file(filename):
+    return '.' in filename and \
+           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def supported_formats(formats):
+    """Filter formats down to those this Pillow build can encode (JPEG always works)."""
+    from PIL import Image
+
+    try:
+        import pillow_avif  # noqa: F401  optional AVIF encoder for older Pillow releases
+    except ImportError:
+        pass
+    Image.init()
+    return [fmt for fmt in formats if fmt == 'jpeg' or FORMAT_OPTIONS[fmt]['format'] in Image.SAVE]
+
+
+def write_variants(image, folder, filename, formats):
+    """Save the smaller sizes and modern formats of an already full-size RGB image.
+
+    Returns the variants metadata stored on PropertyImage.variants. Sizes that
+    would be no smaller than the full image are skipped.
+    """
+    from PIL import Image
+
+    formats = supported_formats(formats)
+    widths = {}
+    for variant, size in VARIANT_SIZES.items():
+        if variant == 'full':
+            resized = image
+        else:
+            resized = image.copy()
+            resized.thumbnail(size, Image.Resampling.LANCZOS)
+            if resized.width >= image.width:
+                continue
+        widths[variant] = resized.width
+        for fmt in formats:
+            name = variant_filename(filename, variant, fmt)
+            if name != filename:
+                resized.save(os.path.join(folder, name), **FORMAT_OPTIONS[fmt])
+    return {'widths': widths, 'formats': formats}
+
+
+def _open_rgb(path):
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image.load()
+        # Convert to RGB if necessary (for PNG with transparency)
+        if image.mode not in ('RGB', 'L'):
+            return image.convert('RGB')
+        return image.copy()
+
+
+def process_image(source, folder, filename, formats=('jpeg',)):
+    """Resize an uploaded image into the main JPEG plus its responsive variants.
+
+    Runs inside a worker process, so it only takes plain paths and imports
+    Pillow itself. Returns the variants metadata.
+    """
+    from PIL import Image
+
+    image = _open_rgb(source)
+    # Create thumbnail while maintaining aspect ratio
+    image.thumbnail(VARIANT_SIZES['full'], Image.Resampling.LANCZOS)
+    image.save(os.path.join(folder, filename), **FORMAT_OPTIONS['jpeg'])
+    return write_variants(image, folder, filename, formats)
+
+
+def backfill_variants(folder, filename, formats=('jpeg',)):
+    """Generate variants for an image processed before variants existed."""
+    return write_variants(_open_rgb(os.path.join(folder, filename)), folder, filename, formats)
+
+
+def get_pool():
+    """Return this process's image worker pool, creating it on first use.
+
+    The pool is created lazily (and again after a fork) so that gunicorn
+    workers each get their own pool rather than inheriting a broken one
+    from a preloaded master.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=current_app.config['IMAGE_WORKERS'])
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def staging_path(filename):
+    return os.path.join(current_app.config['UPLOAD_STAGING_FOLDER'], filename)
+
+
+def upload_path(filename):
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+
+
+def stage_image(file_storage, property_id):
+    """Stream an upload to the staging area and return a pending PropertyImage.
+
+    Uploads are stored under the SHA-256 of their bytes, so re-uploading a
+    photo (to the same or another listing) reuses the existing file and its
+    variants instead of storing and resizing it again. The row is added to
+    the session but not committed; call submit_images() with it once the
+    surrounding transaction commits. Returns None if the file isn't an
+    allowed image.
+    """
+    if not (file_storage and allowed_file(file_storage.filename)):
+        return None
+    digest, temp_path = stream_to_staging(file_storage)
+    # Every upload is re-encoded as JPEG, whatever it arrived as
+    filename = f"{digest}.jpg"
+
+    existing = PropertyImage.query.filter(
+        PropertyImage.filename == filename, PropertyImage.status != PropertyImage.STATUS_FAILED).first()
+    if existing and existing.status == PropertyImage.STATUS_READY:
+        _remove(temp_path)
+        image = PropertyImage(filename=filename, property_id=property_id,
+                              status=PropertyImage.STATUS_READY, variants=existing.variants)
+    else:
+        os.replace(temp_path, staging_path(filename))
+        image = PropertyImage(filename=filename, property_id=property_id, status=PropertyImage.STATUS_PENDING)
+    db.session.add(image)
+    return image
+
+
+def _finish(app, filename, variants, error, started=None):
+    """Record the outcome of a processing job on every row sharing the file.
+
+    started is the job's perf_counter() at submission, for the processing time metric.
+    """
+    if started is not None:
+        observe_image(time.perf_counter() - started, error is not None)
+    with app.app_context():
+        if error:
+            values = {'status': PropertyImage.STATUS_FAILED}
+        else:
+            values = {'status': PropertyImage.STATUS_READY, 'variants': variants}
+        pending = PropertyImage.query.filter_by(filename=filename, status=PropertyImage.STATUS_PENDING)
+        property_ids = {prop_id for (prop_id,) in pending.with_entities(PropertyImage.property_id)}
+        pending.update(values)
+        db.session.commit()
+        for prop_id in property_ids:
+            invalidate_property(prop_id, listings_changed=False)
+        if error:
+            log.error("Error processing image %s: %s", filename, error)
+        elif not reference_count(filename):
+            # Every image using the file was deleted while we were processing it.
+            for name in variant_filenames(filename, variants):
+                _remove(upload_path(name))
+        _remove(staging_path(filename))
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def submit_images(images):
+    """Queue committed pending images for resizing.
+
+    Identical uploads share one job: only the oldest pending row for a file
+    is submitted and _finish() updates the rest. With IMAGE_PROCESSING =
+    'sync' the work happens inline instead, which is handy for tests and
+    one-off scripts.
+    """
+    app = current_app._get_current_object()
+    folder, formats = app.config['UPLOAD_FOLDER'], app.config['IMAGE_FORMATS']
+    for filename in dict.fromkeys(image.filename for image in images if image.status == PropertyImage.STATUS_PENDING):
+        ready = PropertyImage.query.filter_by(filename=filename, status=PropertyImage.STATUS_READY).first()
+        if ready:
+            # Another upload of the same file finished while this one was being committed
+            _finish(app, filename, ready.variants, None)
+            continue
+        first_pending = db.session.query(func.min(PropertyImage.id)).filter_by(
+            filename=filename, status=PropertyImage.STATUS_PENDING).scalar()
+        if first_pending not in [image.id for image in images]:
+            continue  # an earlier request already queued this file
+
+        source = staging_path(filename)
+        started = time.perf_counter()
+        if app.config['IMAGE_PROCESSING'] == 'sync':
+            try:
+                variants, error = process_image(source, folder, filename, formats), None
+            except Exception as e:
+                variants, error = None, e
+            _finish(app, filename, variants, error, started)
+            continue
+
+        future = get_pool().submit(process_image, source, folder, filename, formats)
+        future.add_done_callback(
+            lambda f, filename=filename, started=started: _finish(
+                app, filename, None if f.exception() else f.result(), f.exception(), started)
+        )
+
+
+def requeue_pending_images():
+    """Resubmit pending images whose staged upload survived a restart; fail the rest."""
+    pending = PropertyImage.query.filter_by(status=PropertyImage.STATUS_PENDING).all()
+    requeue = [image for image in pending if os.path.exists(staging_path(image.filename))]
+    lost = [image.id for image in pending if image not in requeue]
+    if lost:
+        PropertyImage.query.filter(PropertyImage.id.in_(lost)).update(
+            {'status': PropertyImage.STATUS_FAILED}, synchronize_session=False)
+        db.session.commit()
+    submit_images(requeue)
+    return len(requeue), len(lost)
+
+
+def shutdown_pool(wait=True):
+    """Wait for queued jobs (and their callbacks) to finish and stop the pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=wait)
+        _pool = None
+
+
+def backfill_image_variants():
+    """Generate responsive variants for every ready image that has none.
+
+    Yields (image, error) as each one finishes so callers can report progress.
+    """
+    folder, formats = current_app.config['UPLOAD_FOLDER'], current_app.config['IMAGE_FORMATS']
+    images = PropertyImage.query.filter(
+        PropertyImage.status == PropertyImage.STATUS_READY, PropertyImage.variants.is_(None)).all()
+    by_filename = {}
+    for image in images:
+        by_filename.setdefault(image.filename, []).append(image)
+    pool = get_pool()
+    futures = {pool.submit(backfill_variants, folder, filename, formats): filename for filename in by_filename}
+    for future in as_completed(futures):
+        sharing = by_filename[futures[future]]
+        error = future.exception()
+        if not error:
+            for image in sharing:
+                image.variants = future.result()
+            db.session.commit()
+        yield sharing[0], error
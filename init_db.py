@@ -1,6 +1,8 @@
-from app import app
+from app import create_app
 from models import db
 
+app = create_app(views=False, commands=False)
+
 with app.app_context():
     db.create_all()
     print('Database tables created')
@@ -0,0 +1,146 @@
+"""Request, SQL, template and image timings as Prometheus metrics, and the app's logger.
+
+Metrics live in each worker process. When PROMETHEUS_MULTIPROC_DIR is set
+(gunicorn.conf.py does it) every worker writes them to files there and
+/metrics adds up all workers.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import Response, before_render_template, g, has_app_context, has_request_context, request, \
+    template_rendered
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, \
+    generate_latest, multiprocess
+from sqlalchemy import event
+
+log = logging.getLogger('house_rental')
+
+LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Time to build a response, by route',
+                            ['endpoint', 'method', 'status'], buckets=LATENCY_BUCKETS)
+REQUEST_QUERIES = Histogram('http_request_sql_queries', 'SQL statements per request, by route', ['endpoint'],
+                            buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89))
+REQUEST_SQL_TIME = Histogram('http_request_sql_seconds', 'Time spent in SQL per request, by route', ['endpoint'],
+                             buckets=LATENCY_BUCKETS)
+TEMPLATE_RENDER = Histogram('template_render_seconds', 'render_template() time, by template', ['template'],
+                            buckets=LATENCY_BUCKETS)
+IMAGE_PROCESSING = Histogram('image_processing_seconds', 'Upload queued to variants written, by outcome',
+                             ['outcome'], buckets=(.1, .25, .5, 1, 2.5, 5, 10, 30, 60))
+SLOW_QUERIES = Counter('sql_slow_queries_total', 'SQL statements slower than SLOW_QUERY_MS, by route', ['endpoint'])
+
+
+class _ProcessQueueHandler(QueueHandler):
+    """Hands records to a background thread so logging never blocks a request on I/O.
+
+    The thread is started per process on first use, so forked workers get
+    their own instead of queueing into one that only exists in the parent.
+    """
+
+    def __init__(self, targets):
+        super().__init__(queue.SimpleQueue())
+        self.targets = targets
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self.queue = queue.SimpleQueue()
+                    listener = QueueListener(self.queue, *self.targets, respect_handler_level=True)
+                    listener.start()
+                    atexit.register(listener.stop)
+                    self._pid = os.getpid()
+        super().emit(record)
+
+
+def configure_logging(app):
+    """Send the 'house_rental' logger through a queue to stderr at LOG_LEVEL."""
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s'))
+    log.setLevel(app.config['LOG_LEVEL'])
+    log.handlers = [_ProcessQueueHandler([stream])]
+    log.propagate = False
+
+
+def _endpoint():
+    if has_request_context():
+        return request.endpoint or 'unmatched'
+    return 'background'
+
+
+def observe_image(seconds, failed):
+    IMAGE_PROCESSING.labels('failed' if failed else 'ready').observe(seconds)
+
+
+def init_instrumentation(app, db):
+    """Time every request, SQL statement and template render of app."""
+    slow_query = app.config['SLOW_QUERY_MS'] / 1000
+    slow_request = app.config['SLOW_REQUEST_MS'] / 1000
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+        g.sql_queries = 0
+        g.sql_seconds = 0.0
+
+    @app.after_request
+    def record_request(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = _endpoint()
+        REQUEST_LATENCY.labels(endpoint, request.method, response.status_code).observe(elapsed)
+        REQUEST_QUERIES.labels(endpoint).observe(g.sql_queries)
+        REQUEST_SQL_TIME.labels(endpoint).observe(g.sql_seconds)
+        if elapsed >= slow_request:
+            log.warning("Slow request %s %s: %.0f ms, %d queries (%.0f ms in SQL)", request.method,
+                        request.full_path.rstrip('?'), elapsed * 1000, g.sql_queries, g.sql_seconds * 1000)
+        return response
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.query_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.query_started
+        if has_request_context() and 'sql_queries' in g:
+            g.sql_queries += 1
+            g.sql_seconds += elapsed
+        if elapsed >= slow_query:
+            SLOW_QUERIES.labels(_endpoint()).inc()
+            log.warning("Slow query (%.0f ms) in %s: %s", elapsed * 1000, _endpoint(),
+                        ' '.join(statement.split())[:1000])
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+    def template_started(sender, template, context, **extra):
+        if has_app_context():
+            g.setdefault('template_started', []).append(time.perf_counter())
+
+    def template_finished(sender, template, context, **extra):
+        if has_app_context() and g.get('template_started'):
+            elapsed = time.perf_counter() - g.template_started.pop()
+            TEMPLATE_RENDER.labels(template.name or 'string').observe(elapsed)
+
+    before_render_template.connect(template_started, app, weak=False)
+    template_rendered.connect(template_finished, app, weak=False)
+
+
+def metrics_response():
+    """All metrics in the Prometheus text format, summed over workers in multiprocess mode."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
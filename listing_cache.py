@@ -0,0 +1,234 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+from listings import listing_query, parse_rent
+from models import Property
+
+# Bumped on every write that can change which properties a listing page
+# shows; result-set keys embed it, so one increment retires all of them.
+GENERATION_KEY = 'generation'
+
+# Card templates whose rendered fragments are cached per property
+CARD_TEMPLATES = ('_property_card.html', '_search_result_card.html')
+
+
+class MemoryCache:
+    """In-process LRU cache with a TTL on every entry.
+
+    Each process has its own copy and an invalidation only reaches the
+    process that made the write, so this backend is for a single worker
+    (gunicorn.conf.py refuses to start more with it); several workers need
+    the redis backend.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # Counters live outside the LRU so eviction can never rewind them
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None or entry[0] < now:
+                    self._entries.pop(key, None)
+                    values.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    values.append(entry[1])
+        return values
+
+    def get(self, key):
+        return self.get_many([key])[0]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Cache shared by every worker, kept in Redis (or anything speaking its protocol).
+
+    Values are stored as JSON with a TTL. Configure the server with
+    `maxmemory-policy volatile-lru` so that it evicts cached entries but
+    never the TTL-less generation counter.
+    """
+
+    def __init__(self, url, ttl=300, prefix='listing-cache:'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get_many(self, keys):
+        if not keys:
+            return []
+        return [None if raw is None else json.loads(raw)
+                for raw in self.client.mget([self.prefix + key for key in keys])]
+
+    def get(self, key):
+        return self.get_many([key])[0]
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl or self.ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            if key.decode() != self.prefix + GENERATION_KEY:
+                self.client.delete(key)
+
+
+class NullCache:
+    """Caches nothing; LISTING_CACHE = 'none'."""
+
+    def get_many(self, keys):
+        return [None] * len(keys)
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def counter(self, key):
+        return 0
+
+    def incr(self, key):
+        return 0
+
+    def clear(self):
+        pass
+
+
+def get_listing_cache():
+    """Return the app's listing cache, creating it on first use."""
+    cache = current_app.extensions.get('listing_cache')
+    if cache is None:
+        backend = current_app.config['LISTING_CACHE']
+        ttl = current_app.config['LISTING_CACHE_TTL']
+        if backend == 'redis':
+            cache = RedisCache(current_app.config['LISTING_CACHE_URL'], ttl)
+        elif backend == 'memory':
+            cache = MemoryCache(current_app.config['LISTING_CACHE_SIZE'], ttl)
+        else:
+            cache = NullCache()
+        current_app.extensions['listing_cache'] = cache
+    return cache
+
+
+def page_key(view, q, min_rent, max_rent, ptype, sort, cursor, per_page, area=None):
+    """Cache key of one listing page, built from the normalized filters.
+
+    Equivalent requests (different case or spacing in q, "5000" vs
+    "5000.0") share a key; the current generation makes keys from before the
+    last listing write unreachable.
+    """
+    filters = [' '.join((q or '').lower().split()), parse_rent(min_rent), parse_rent(max_rent),
+               ptype or None, sort, cursor or None, per_page, area.key() if area is not None else None]
+    generation = get_listing_cache().counter(GENERATION_KEY)
+    return f"page:{generation}:{view}:{json.dumps(filters, separators=(',', ':'))}"
+
+
+def cached_page(key, load_page):
+    """Return ({'ids', 'next_cursor'}, properties) for a listing page.
+
+    On a miss load_page() runs and its items are returned so the cards can be
+    rendered without loading them again; on a hit properties is None.
+    """
+    cache = get_listing_cache()
+    entry = cache.get(key)
+    if entry is not None:
+        return entry, None
+    page = load_page()
+    entry = {'ids': [p.id for p in page.items], 'next_cursor': page.next_cursor}
+    cache.set(key, entry)
+    return entry, page.items
+
+
+def card_key(template, prop_id):
+    return f"card:{template}:{prop_id}"
+
+
+def cached_cards(template, ids, properties, render_card):
+    """Return the cached card entries for ids, in order.
+
+    render_card(property) builds the entry for a card that isn't cached;
+    cards missing from properties are loaded in one query. Properties that
+    no longer exist are skipped.
+    """
+    cache = get_listing_cache()
+    keys = [card_key(template, prop_id) for prop_id in ids]
+    entries = dict(zip(ids, cache.get_many(keys)))
+    missing = [prop_id for prop_id, entry in entries.items() if entry is None]
+    if missing:
+        loaded = {p.id: p for p in properties or []}
+        if any(prop_id not in loaded for prop_id in missing):
+            loaded.update((p.id, p) for p in listing_query().filter(Property.id.in_(missing)))
+        for prop_id in missing:
+            if prop_id in loaded:
+                entries[prop_id] = render_card(loaded[prop_id])
+                cache.set(card_key(template, prop_id), entries[prop_id])
+    return [entries[prop_id] for prop_id in ids if entries[prop_id] is not None]
+
+
+def invalidate_property(prop_id, listings_changed=True):
+    """Drop everything cached about a property after a committed write.
+
+    Its card fragments always go. listings_changed retires every cached
+    page too, since adding, deleting or editing a property can move it into
+    or out of any filter and sort order; leave it False for changes that
+    only affect how the card looks, such as an image finishing processing.
+    """
+    cache = get_listing_cache()
+    cache.delete(*[card_key(template, prop_id) for template in CARD_TEMPLATES])
+    if listings_changed:
+        invalidate_listings()
+
+
+def invalidate_listings():
+    """Retire every cached listing page and facet count, e.g. after a bulk import added listings."""
+    get_listing_cache().incr(GENERATION_KEY)
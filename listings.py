@@ -0,0 +1,87 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload, selectinload
+
+from models import db, Property, Favorite
+from geo_index import apply_area
+from search_index import apply_text_search
+
+
+def listing_query():
+    """Property query that loads everything a listing card renders.
+
+    Owners are joined into the main SELECT and images are fetched for the
+    whole page with one extra IN query, so rendering N cards costs two
+    queries instead of 2N + 1 lazy loads.
+    """
+    return Property.query.options(
+        joinedload(Property.owner),
+        selectinload(Property.images),
+    )
+
+
+def parse_rent(value):
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def filtered_listings(q='', min_rent=None, max_rent=None, ptype=None, area=None):
+    """Apply the search form filters shared by /home and /search.
+
+    area is a geo_index.GeoArea from parse_area(), or None for anywhere.
+
+    Returns (query, rank) where rank is the relevance expression from the
+    search index, or None when there is no text query.
+    """
+    props = listing_query()
+    rank = None
+    if q:
+        props, rank = apply_text_search(props, q)
+    min_rent = parse_rent(min_rent)
+    if min_rent is not None:
+        props = props.filter(Property.rent >= min_rent)
+    max_rent = parse_rent(max_rent)
+    if max_rent is not None:
+        props = props.filter(Property.rent <= max_rent)
+    if ptype:
+        props = props.filter(Property.property_type == ptype)
+    if area is not None:
+        props = apply_area(props, area)
+    return props, rank
+
+
+def owner_listings(owner_id):
+    """An owner's properties, newest first."""
+    return listing_query().filter(Property.owner_id == owner_id).order_by(Property.created_at.desc())
+
+
+def favorite_listings(user_id):
+    """A user's favorited properties, most recently favorited first."""
+    return (listing_query()
+            .join(Favorite, Favorite.property_id == Property.id)
+            .filter(Favorite.user_id == user_id)
+            .order_by(Favorite.created_at.desc()))
+
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements executed inside the block.
+
+    Yields a list that collects each statement; use len() on it afterwards.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
@@ -0,0 +1,105 @@
+import json
+import queue
+import threading
+
+from flask import current_app
+
+
+class Subscription:
+    """A queue of events published to one channel, closed with close()."""
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue()
+
+    def get(self, timeout):
+        """Next event, or None if none arrives within timeout seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class MemoryBroker:
+    """In-process pub/sub. Only reaches subscribers in the same worker process."""
+
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                self._channels.pop(subscription.channel, None)
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.queue.put(event)
+
+
+class RedisBroker(MemoryBroker):
+    """Pub/sub through Redis (or anything speaking its protocol), shared by every worker.
+
+    Each process keeps one Redis connection listening on a pattern and fans
+    messages out to its local subscribers, so idle streams cost no
+    connections of their own.
+    """
+
+    def __init__(self, url, prefix='message-events:'):
+        import redis
+
+        super().__init__()
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(**{prefix + '*': self._deliver})
+        self._pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def _deliver(self, message):
+        channel = message['channel'].decode()[len(self.prefix):]
+        super().publish(channel, json.loads(message['data']))
+
+    def publish(self, channel, event):
+        self.client.publish(self.prefix + channel, json.dumps(event))
+
+
+def get_broker():
+    """Return the app's message broker, creating it on first use."""
+    broker = current_app.extensions.get('message_broker')
+    if broker is None:
+        if current_app.config['MESSAGE_BROKER'] == 'redis':
+            broker = RedisBroker(current_app.config['MESSAGE_BROKER_URL'])
+        else:
+            broker = MemoryBroker()
+        current_app.extensions['message_broker'] = broker
+    return broker
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+def publish_message(owner_id, tenant_id, event_for):
+    """Push a new-message event to the owner and the tenant of its thread; event_for(user_id) builds each one's."""
+    broker = get_broker()
+    for user_id in {owner_id, tenant_id}:
+        broker.publish(user_channel(user_id), event_for(user_id))
+
+
+def format_sse(event):
+    """One Server-Sent Events frame; the message id lets a reconnecting browser resume."""
+    return f"id: {event['id']}\nevent: message\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,203 @@
+from datetime import datetime
+
+from flask import render_template, url_for
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import aliased, joinedload
+
+from models import db, User, Property, Message
+from pagination import paginate
+
+# Threads are paged newest first by (timestamp, id), like the listing sorts
+THREAD_SORT = 'thread'
+THREAD_KEYS = [(Message.timestamp, True), (Message.id, True)]
+
+
+class Thread:
+    """One tenant's conversation with the owner about a property."""
+
+    def __init__(self, property_id, tenant, page):
+        self.property_id = property_id
+        self.tenant = tenant
+        self.messages = page.items
+        self.next_cursor = page.next_cursor
+
+    @property
+    def latest_id(self):
+        return self.messages[0].id if self.messages else 0
+
+    @property
+    def shown_ids(self):
+        """(oldest, newest) id of the messages on this page, or None if it has none."""
+        return (self.messages[-1].id, self.messages[0].id) if self.messages else None
+
+
+def thread_query(viewer, prop, tenant_id):
+    """Messages between tenant_id and the owner of prop, as visible to viewer.
+
+    Goes through the viewer's lazy='dynamic' message relationship, so a
+    tenant can only ever read their own thread and the owner only threads on
+    their own listings. Returns None if viewer can't see the thread.
+    """
+    if viewer.id == prop.owner_id:
+        messages = viewer.messages_received
+    elif viewer.id == tenant_id:
+        messages = viewer.messages_sent
+    else:
+        return None
+    return messages.filter(Message.property_id == prop.id, Message.tenant_id == tenant_id)
+
+
+def thread_page(query, cursor=None, per_page=20):
+    """A page of a thread, newest first, starting before cursor."""
+    return paginate(query.options(joinedload(Message.tenant)), THREAD_SORT, THREAD_KEYS, cursor, per_page)
+
+
+def newer_messages(query, after_id, limit=50):
+    """Messages in a thread with an id above after_id, oldest first."""
+    return (query.options(joinedload(Message.tenant))
+            .filter(Message.id > after_id)
+            .order_by(Message.id)
+            .limit(limit)
+            .all())
+
+
+def visible_threads(viewer, prop, threads_per_page=10, per_page=20):
+    """The threads viewer may read on prop's detail page, each with its latest page of messages.
+
+    Tenants get their own thread (even while it's empty, so new messages
+    can be polled into it); the owner gets the threads_per_page most
+    recently active ones. The cost is bounded by threads_per_page * per_page
+    however long the history is.
+    """
+    if not viewer.is_authenticated:
+        return []
+    if viewer.id != prop.owner_id:
+        return [Thread(prop.id, viewer, thread_page(thread_query(viewer, prop, viewer.id), per_page=per_page))]
+
+    recent = (viewer.messages_received
+              .filter(Message.property_id == prop.id)
+              .with_entities(Message.tenant_id)
+              .group_by(Message.tenant_id)
+              .order_by(func.max(Message.timestamp).desc())
+              .limit(threads_per_page)
+              .all())
+    tenant_ids = [tenant_id for (tenant_id,) in recent]
+    tenants = {user.id: user for user in User.query.filter(User.id.in_(tenant_ids))}
+    return [Thread(prop.id, tenants[tenant_id], thread_page(thread_query(viewer, prop, tenant_id), per_page=per_page))
+            for tenant_id in tenant_ids]
+
+
+def serialize_message(message):
+    return {
+        'id': message.id,
+        'tenant_id': message.tenant_id,
+        'sender': message.tenant.name,
+        'text': message.message_text,
+        'timestamp': message.timestamp.isoformat() if message.timestamp else None,
+    }
+
+
+def messages_since(user_id, after_id, limit=50):
+    """Messages in any of user_id's conversations with an id above after_id, oldest first."""
+    return (Message.query.options(joinedload(Message.tenant))
+            .filter(or_(Message.owner_id == user_id, Message.tenant_id == user_id), Message.id > after_id)
+            .order_by(Message.id)
+            .limit(limit)
+            .all())
+
+
+def message_event(message, viewer_id):
+    """The payload pushed to viewer_id, one of a conversation's participants, when message is sent.
+
+    The HTML is rendered for viewer_id rather than the current user, who is
+    the sender when the message is published.
+    """
+    return {
+        **serialize_message(message),
+        'property_id': message.property_id,
+        'owner_id': message.owner_id,
+        'url': url_for('listings.property_detail', prop_id=message.property_id),
+        'html': render_template('_messages.html', messages=[message], viewer_id=viewer_id),
+    }
+
+
+class Inbox:
+    """An owner's conversations with per-listing and overall totals.
+
+    The counting is done by conversation_query()'s GROUP BY; the totals
+    here only add up its rows, one per conversation.
+    """
+
+    def __init__(self, conversations):
+        self.conversations = conversations
+        self.by_property = {}
+        for row in conversations:
+            totals = self.by_property.setdefault(row.property_id, {'conversations': 0, 'messages': 0, 'unread': 0})
+            totals['conversations'] += 1
+            totals['messages'] += row.message_count
+            totals['unread'] += row.unread_count
+        self.message_count = sum(totals['messages'] for totals in self.by_property.values())
+        self.unread_count = sum(totals['unread'] for totals in self.by_property.values())
+
+
+def conversation_query(owner_id):
+    """Every conversation on owner_id's listings, most recently active first.
+
+    One query: messages are counted per (property, tenant) over
+    ix_messages_owner_id_property_id_tenant_id_read_at, then each group is
+    joined to its latest message, its listing and its tenant.
+    """
+    groups = (db.session.query(Message.property_id, Message.tenant_id,
+                               func.count(Message.id).label('message_count'),
+                               func.sum(case((Message.read_at.is_(None), 1), else_=0)).label('unread_count'),
+                               func.max(Message.id).label('latest_id'))
+              .filter(Message.owner_id == owner_id)
+              .group_by(Message.property_id, Message.tenant_id)
+              .subquery())
+    latest = aliased(Message)
+    return (db.session.query(groups.c.property_id, groups.c.tenant_id, groups.c.message_count,
+                             groups.c.unread_count, Property.title.label('property_title'),
+                             User.name.label('tenant_name'), latest.id.label('latest_id'),
+                             latest.message_text.label('latest_text'), latest.timestamp.label('latest_at'))
+            .join(latest, latest.id == groups.c.latest_id)
+            .join(Property, Property.id == groups.c.property_id)
+            .join(User, User.id == groups.c.tenant_id)
+            .order_by(groups.c.latest_id.desc()))
+
+
+def owner_inbox(owner_id):
+    return Inbox(conversation_query(owner_id).all())
+
+
+def serialize_conversation(row):
+    return {
+        'property_id': row.property_id,
+        'property_title': row.property_title,
+        'tenant_id': row.tenant_id,
+        'tenant_name': row.tenant_name,
+        'message_count': row.message_count,
+        'unread_count': row.unread_count,
+        'latest': {
+            'id': row.latest_id,
+            'text': row.latest_text,
+            'timestamp': row.latest_at.isoformat() if row.latest_at else None,
+        },
+        'url': url_for('listings.property_detail', prop_id=row.property_id),
+    }
+
+
+def mark_read(owner_id, property_id, shown):
+    """Mark the owner's unread messages on a listing that the owner has been shown as read (caller commits).
+
+    shown maps each tenant id to the (oldest, newest) id of the messages of
+    their thread that were rendered; older unread messages stay unread
+    until the owner pages back to them.
+    """
+    shown = {tenant_id: ids for tenant_id, ids in shown.items() if ids}
+    if not shown:
+        return 0
+    return (Message.query
+            .filter(Message.owner_id == owner_id, Message.property_id == property_id, Message.read_at.is_(None),
+                    or_(*[and_(Message.tenant_id == tenant_id, Message.id.between(oldest, newest))
+                          for tenant_id, (oldest, newest) in shown.items()]))
+            .update({Message.read_at: datetime.utcnow()}, synchronize_session=False))
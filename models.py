@@ -1,8 +1,33 @@
+import os
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
 
-db = SQLAlchemy()
+from database import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# File extension for each responsive image output format
+IMAGE_FORMAT_EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg'}
+
+def variant_filename(filename, variant, fmt):
+    """Filename of one size/format variant of an uploaded image.
+
+    The full-size JPEG is the original upload filename itself.
+    """
+    if variant == 'full' and fmt == 'jpeg':
+        return filename
+    stem = os.path.splitext(filename)[0]
+    return f"{stem}.{variant}.{IMAGE_FORMAT_EXTENSIONS[fmt]}"
+
+def variant_filenames(filename, variants):
+    """Every file written for an image, given its variants metadata."""
+    names = {filename}
+    if variants:
+        for variant in variants['widths']:
+            for fmt in variants['formats']:
+                names.add(variant_filename(filename, variant, fmt))
+    return sorted(names)
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -43,6 +68,34 @@ class Property(db.Model):
     property_type = db.Column(db.String(50), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Denormalized counters behind the 'popular' sort, updated with the writes
+    # that change them (popularity.py) and repaired by reconcile-popularity
+    favorite_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    message_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    view_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    popularity = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Set from location by the offline geocoder (geocoding.py); None when it
+    # isn't in the gazetteer. geohash backs radius/bbox search off SQLite.
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    geohash = db.Column(db.String(12), nullable=True)
+    # Identifies a row of a bulk import file (bulk_import.py), so importing
+    # the same file again skips the listings already created from it
+    import_key = db.Column(db.String(100), nullable=True)
+
+    # Indexes match the listing query shapes: every sort is tie-broken on id
+    # (keyset pagination), optionally filtered by type first.
+    __table_args__ = (
+        db.Index('ix_properties_created_at_id', 'created_at', 'id'),
+        db.Index('ix_properties_rent_id', 'rent', 'id'),
+        db.Index('ix_properties_type_created_at_id', 'property_type', 'created_at', 'id'),
+        db.Index('ix_properties_type_rent_id', 'property_type', 'rent', 'id'),
+        db.Index('ix_properties_popularity_id', 'popularity', 'id'),
+        db.Index('ix_properties_type_popularity_id', 'property_type', 'popularity', 'id'),
+        db.Index('ix_properties_owner_id_created_at', 'owner_id', 'created_at'),
+        db.Index('ix_properties_geohash', 'geohash'),
+        db.UniqueConstraint('owner_id', 'import_key', name='unique_owner_import_key'),
+    )
 
     # Relationships
     property_messages = db.relationship('Message', 
@@ -51,31 +104,79 @@ class Property(db.Model):
                                         lazy='dynamic',
                                         cascade='all, delete-orphan')
 
-    images = db.relationship('PropertyImage', backref='property', cascade='all, delete-orphan')
+    images = db.relationship('PropertyImage', backref='property', cascade='all, delete-orphan',
+                             order_by='PropertyImage.id')
     
     # ✅ ADDED: Favorites relationship for property
     favorites = db.relationship('Favorite', backref='property_rel', cascade='all, delete-orphan')
 
+    def get_ready_images(self):
+        """Returns this property's processed PropertyImage rows."""
+        return [img for img in self.images if img.status == PropertyImage.STATUS_READY]
+
     def get_images(self):
-        """Returns a list of image filenames for this property."""
-        return [img.filename for img in self.images]
+        """Returns a list of filenames for this property's processed images."""
+        return [img.filename for img in self.get_ready_images()]
     
     def get_first_image(self):
-        """Returns the first image filename, or None if no images."""
-        if self.images:
-            return self.images[0].filename
+        """Returns the first processed image filename, or None if there isn't one."""
+        images = self.get_images()
+        if images:
+            return images[0]
         return None
 
+    def has_pending_images(self):
+        """True while uploaded images are still being processed."""
+        return any(img.status == PropertyImage.STATUS_PENDING for img in self.images)
+
     def __repr__(self):
         return f'<Property {self.title}>'
 
 class PropertyImage(db.Model):
     __tablename__ = 'property_images'
+    STATUS_PENDING = 'pending'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(200), nullable=False)
     property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=False)
     # ✅ ADDED BACK: created_at field (useful for sorting images)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Uploads are resized in the background; only 'ready' images have a file in UPLOAD_FOLDER
+    status = db.Column(db.String(20), nullable=False, default=STATUS_READY, server_default=STATUS_READY)
+    # Responsive variants written next to the main file, e.g.
+    # {"widths": {"thumb": 400, "card": 800, "full": 1200}, "formats": ["webp", "jpeg"]}
+    variants = db.Column(db.JSON, nullable=True)
+
+    def variant_filename(self, variant, fmt='jpeg'):
+        """Filename of a variant, falling back to the main file if it wasn't generated."""
+        if self.variants and variant in self.variants['widths'] and fmt in self.variants['formats']:
+            return variant_filename(self.filename, variant, fmt)
+        return self.filename
+
+    def variant_formats(self):
+        """Formats available for this image, most efficient first."""
+        if not self.variants:
+            return []
+        return [fmt for fmt in IMAGE_FORMAT_EXTENSIONS if fmt in self.variants['formats']]
+
+    def srcset_entries(self, fmt):
+        """[(filename, width)] for every size available in fmt, smallest first."""
+        if not self.variants or fmt not in self.variants['formats']:
+            return []
+        widths = sorted(self.variants['widths'].items(), key=lambda item: item[1])
+        return [(variant_filename(self.filename, variant, fmt), width) for variant, width in widths]
+
+    def all_filenames(self):
+        """The main file plus every generated variant."""
+        return variant_filenames(self.filename, self.variants)
+
+    __table_args__ = (
+        db.Index('ix_property_images_property_id_id', 'property_id', 'id'),
+        # Uploads are content-addressed and shared, so files are looked up (and refcounted) by name
+        db.Index('ix_property_images_filename', 'filename'),
+    )
 
     def __repr__(self):
         return f'<PropertyImage {self.filename}>'
@@ -89,6 +190,17 @@ class Message(db.Model):
     tenant_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=False)
+    read_at = db.Column(db.DateTime, nullable=True)  # when the owner read it; None while unread
+
+    __table_args__ = (
+        db.Index('ix_messages_property_id_timestamp', 'property_id', 'timestamp'),
+        # One tenant's conversation about a property, paged by (timestamp, id)
+        db.Index('ix_messages_property_id_tenant_id_timestamp', 'property_id', 'tenant_id', 'timestamp'),
+        db.Index('ix_messages_owner_id_timestamp', 'owner_id', 'timestamp'),
+        # Covers the owner inbox GROUP BY (and its unread counts) without touching the table
+        db.Index('ix_messages_owner_id_property_id_tenant_id_read_at', 'owner_id', 'property_id', 'tenant_id', 'read_at'),
+        db.Index('ix_messages_tenant_id', 'tenant_id'),
+    )
 
     def __repr__(self):
         return f'<Message {self.id}>'
@@ -101,10 +213,46 @@ class Favorite(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # ✅ FIXED: Added unique constraint to prevent duplicate favorites
-    __table_args__ = (db.UniqueConstraint('user_id', 'property_id', name='unique_user_property_favorite'),)
+    # (its index also serves lookups by user_id alone)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'property_id', name='unique_user_property_favorite'),
+        db.Index('ix_favorites_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_favorites_property_id', 'property_id'),
+    )
     
     # Relationship
     property = db.relationship('Property', backref='favorited_by')
     
     def __repr__(self):
-        return f'<Favorite user:{self.user_id} property:{self.property_id}>'
\ No newline at end of file
+        return f'<Favorite user:{self.user_id} property:{self.property_id}>'
+
+
+class PropertyViewDaily(db.Model):
+    """Detail page views of a property per (UTC) day, written in batches by view_tracking.py."""
+    __tablename__ = 'property_views_daily'
+    id = db.Column(db.Integer, primary_key=True)
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    views = db.Column(db.Integer, nullable=False, default=0)
+
+    # Flushes upsert on it; it also serves per-property date range sums
+    __table_args__ = (
+        db.UniqueConstraint('property_id', 'day', name='unique_property_view_day'),
+    )
+
+
+class SimilarProperty(db.Model):
+    """One of a property's precomputed nearest neighbours (see recommendations.py)."""
+    __tablename__ = 'similar_properties'
+    id = db.Column(db.Integer, primary_key=True)
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=False)
+    similar_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=False)
+    rank = db.Column(db.Integer, nullable=False)  # 0 is the most similar
+    score = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (
+        # The detail page reads one property's list in rank order
+        db.Index('ix_similar_properties_property_id_rank', 'property_id', 'rank'),
+        # Deleting a property removes it from other lists
+        db.Index('ix_similar_properties_similar_id', 'similar_id'),
+    )
@@ -0,0 +1,145 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import and_, or_
+
+from models import Property
+
+# Sort name -> (column, descending). Every sort is tie-broken on Property.id in
+# the same direction so that the ordering is total and cursors are stable.
+SORT_COLUMNS = {
+    'rent_low': (Property.rent, False),
+    'rent_high': (Property.rent, True),
+    'newest': (Property.created_at, True),
+    'oldest': (Property.created_at, False),
+    'popular': (Property.popularity, True),
+}
+
+
+class Page:
+    """One page of keyset-paginated results."""
+
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+
+def sort_keys(sort, rank=None):
+    """Return the [(expression, descending)] keys used to order and paginate a listing query.
+
+    rank is the relevance expression from the search index; it is only used
+    for the 'relevance' sort, which falls back to newest first without it.
+    """
+    if sort == 'relevance' and rank is not None:
+        return [(rank, False), (Property.id, False)]
+    column, descending = SORT_COLUMNS.get(sort, SORT_COLUMNS['newest'])
+    return [(column, descending), (Property.id, descending)]
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(sort, values):
+    payload = json.dumps({'s': sort, 'k': [_encode_value(v) for v in values]}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def _key_type(expr):
+    """The Python type a sort key's values must have: int, float, datetime or str (None if unknown)."""
+    try:
+        python_type = expr.type.python_type
+    except NotImplementedError:
+        return None
+    if python_type in (float, Decimal):
+        return float
+    return python_type if python_type in (int, datetime, str) else None
+
+
+def _matches(value, expected):
+    if isinstance(value, bool) or value is None:
+        return False
+    if expected is float:
+        return isinstance(value, (int, float))
+    if expected is None:
+        return isinstance(value, (int, float, str, datetime))
+    return isinstance(value, expected)
+
+
+def decode_cursor(token, sort, keys):
+    """Return the key values stored in a cursor for keys ([(expression, descending)]).
+
+    None if the cursor is missing, malformed, for another sort, or holds a
+    value of the wrong type for its key (which would otherwise reach the
+    seek clause as it is).
+    """
+    if not token:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        values = [_decode_value(v) for v in payload['k']]
+    except (ValueError, TypeError, KeyError):
+        return None
+    if payload.get('s') != sort or len(values) != len(keys):
+        return None
+    if not all(_matches(value, _key_type(expr)) for value, (expr, _) in zip(values, keys)):
+        return None
+    return values
+
+
+def _after(keys, values):
+    """Build the WHERE clause selecting rows that sort strictly after values.
+
+    The redundant inclusive bound on the leading key lets the database seek
+    straight to the cursor position in the matching index instead of
+    filtering the OR expansion row by row.
+    """
+    clauses = []
+    for i, (expr, descending) in enumerate(keys):
+        equal_prefix = [k == v for (k, _), v in zip(keys[:i], values[:i])]
+        clauses.append(and_(*equal_prefix, expr < values[i] if descending else expr > values[i]))
+    first, descending = keys[0]
+    return and_(first <= values[0] if descending else first >= values[0], or_(*clauses))
+
+
+def page_query(query, sort, keys, cursor=None, per_page=24):
+    """Return query ordered by keys, starting after cursor and limited to per_page + 1 rows.
+
+    Each row is (item, *sort_key_values); the extra row tells paginate()
+    whether another page follows.
+    """
+    values = decode_cursor(cursor, sort, keys)
+    if values is not None:
+        query = query.filter(_after(keys, values))
+    query = query.add_columns(*[expr.label(f'sort_key_{i}') for i, (expr, _) in enumerate(keys)])
+    query = query.order_by(*[expr.desc() if descending else expr.asc() for expr, descending in keys])
+    return query.limit(per_page + 1)
+
+
+def paginate(query, sort, keys, cursor=None, per_page=24):
+    """Return a Page of query ordered by keys, starting after cursor.
+
+    The cursor carries the sort keys of the last row of the previous page, so
+    fetching page N is a range scan of per_page + 1 rows like page 1.
+    """
+    rows = page_query(query, sort, keys, cursor, per_page).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(sort, list(rows[-1][1:]))
+    return Page([row[0] for row in rows], next_cursor)
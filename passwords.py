@@ -0,0 +1,85 @@
+"""Password hashing under a configurable policy, optionally run in a bounded process pool."""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_slots = None
+
+
+class PasswordHashingBusy(Exception):
+    """Every hashing slot stayed taken for PASSWORD_QUEUE_TIMEOUT seconds."""
+
+
+@lru_cache(maxsize=None)
+def hash_prefix(method):
+    """The parameter prefix ("pbkdf2:sha256:600000") of hashes made with method, defaults filled in."""
+    return generate_password_hash('', method).split('$', 1)[0]
+
+
+def needs_rehash(stored, method):
+    return stored.split('$', 1)[0] != hash_prefix(method)
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method)
+
+
+def _verify(stored, password, method):
+    """(matches, new hash if the stored one was made under other parameters, else None)."""
+    if not check_password_hash(stored, password):
+        return False, None
+    if needs_rehash(stored, method):
+        return True, generate_password_hash(password, method)
+    return True, None
+
+
+def get_pool():
+    """Return this process's hashing pool, creating it on first use (and again after a fork).
+
+    At most PASSWORD_WORKERS hashes run at once and PASSWORD_QUEUE more may
+    wait for one, so a burst of logins can't take over every CPU.
+    """
+    global _pool, _pool_pid, _slots
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            workers = current_app.config['PASSWORD_WORKERS']
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_pid = os.getpid()
+            _slots = threading.BoundedSemaphore(workers + current_app.config['PASSWORD_QUEUE'])
+        return _pool
+
+
+def _run(fn, *args):
+    if current_app.config['PASSWORD_HASHING'] != 'pool':
+        return fn(*args)
+    pool = get_pool()
+    slots = _slots
+    if not slots.acquire(timeout=current_app.config['PASSWORD_QUEUE_TIMEOUT']):
+        raise PasswordHashingBusy()
+    try:
+        return pool.submit(fn, *args).result()
+    finally:
+        slots.release()
+
+
+def hash_password(password):
+    """Hash a new password with PASSWORD_HASH_METHOD."""
+    return _run(_hash, password, current_app.config['PASSWORD_HASH_METHOD'])
+
+
+def verify_password(stored, password):
+    """Check password against a stored hash; returns (matches, new hash or None).
+
+    A new hash comes back when the password matched but was stored under
+    other parameters than PASSWORD_HASH_METHOD; save it in place of the old
+    one. Raises PasswordHashingBusy when the pool is saturated.
+    """
+    return _run(_verify, stored, password, current_app.config['PASSWORD_HASH_METHOD'])
+
@@ -0,0 +1,53 @@
+from sqlalchemy import func, or_, select, update
+
+from models import db, Property, Favorite, Message
+
+# How much one of each counts towards Property.popularity. Stored scores use
+# the weights they were computed with; run reconcile-popularity after a change.
+POPULARITY_WEIGHTS = {'favorite_count': 5, 'message_count': 10, 'view_count': 1}
+
+
+def popularity_score(favorite_count, message_count, view_count):
+    """The popularity formula, for numbers or SQL expressions alike."""
+    return (POPULARITY_WEIGHTS['favorite_count'] * favorite_count
+            + POPULARITY_WEIGHTS['message_count'] * message_count
+            + POPULARITY_WEIGHTS['view_count'] * view_count)
+
+
+def bump_counters(prop_ids, **deltas):
+    """Add deltas (e.g. favorite_count=1) to the counters of prop_ids, in the caller's transaction.
+
+    One UPDATE that increments in SQL, so concurrent writers don't lose
+    counts, and moves popularity by the weighted total.
+    """
+    prop_ids = list(prop_ids)
+    deltas = {name: n for name, n in deltas.items() if n}
+    if not prop_ids or not deltas:
+        return
+    values = {name: getattr(Property, name) + n for name, n in deltas.items()}
+    values['popularity'] = Property.popularity + sum(POPULARITY_WEIGHTS[name] * n for name, n in deltas.items())
+    db.session.execute(update(Property).where(Property.id.in_(prop_ids)).values(values))
+
+
+def reconcile_popularity(batch_size=1000):
+    """Recount favorites and messages for every property and fix any counter that drifted.
+
+    Works through the table in id ranges, committing each, so writers are
+    never blocked for long. View counts have no other record and are kept
+    as they are. Returns the number of properties corrected.
+    """
+    favorites = select(func.count()).where(Favorite.property_id == Property.id).scalar_subquery()
+    messages = select(func.count()).where(Message.property_id == Property.id).scalar_subquery()
+    score = popularity_score(favorites, messages, Property.view_count)
+    max_id = db.session.query(func.max(Property.id)).scalar() or 0
+    fixed = 0
+    for start in range(0, max_id, batch_size):
+        stmt = (update(Property)
+                .where(Property.id > start, Property.id <= start + batch_size,
+                       or_(Property.favorite_count != favorites, Property.message_count != messages,
+                           Property.popularity != score))
+                .values(favorite_count=favorites, message_count=messages, popularity=score)
+                .execution_options(synchronize_session=False))
+        fixed += db.session.execute(stmt).rowcount
+        db.session.commit()
+    return fixed
@@ -0,0 +1,170 @@
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, or_, select
+
+from listings import listing_query
+from models import db, Property, SimilarProperty
+from search_index import tokenize
+
+# How many times a word counts in the text vector, by field
+FIELD_WEIGHTS = {'title': 2, 'location': 3, 'description': 1}
+# Share of the score from text similarity; the rest is rent closeness
+TEXT_WEIGHT = 0.7
+# Rent closeness is exp(-|log(rent_a / rent_b)| / RENT_SCALE)
+RENT_SCALE = 0.35
+# Neighbours must be of the same property_type and within this factor of the rent
+RENT_BAND = 2.0
+# Vocabulary cap per batch; memory is rows x MAX_TERMS x 4 bytes
+MAX_TERMS = 2048
+# Query rows scored against their rent window at a time
+CHUNK = 256
+
+FEATURE_COLUMNS = (Property.id, Property.rent, Property.title, Property.location, Property.description)
+
+
+def _terms(row):
+    terms = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(getattr(row, field)):
+            terms[token] += weight
+    return terms
+
+
+def _features(rows):
+    """(ids, log rents, L2-normalized TF-IDF matrix) for rows sorted by rent."""
+    # NumPy is imported here, not at module level, so web workers only pay for
+    # it once a listing is saved or `flask rebuild-similar` runs
+    import numpy as np
+
+    docs = [_terms(row) for row in rows]
+    df = Counter(term for doc in docs for term in doc)
+    # Words in a single listing can't make two listings similar
+    vocab = [term for term, n in df.most_common(MAX_TERMS) if n > 1]
+    columns = {term: i for i, term in enumerate(vocab)}
+    vectors = np.zeros((len(docs), len(vocab)), dtype=np.float32)
+    for i, doc in enumerate(docs):
+        for term, count in doc.items():
+            if term in columns:
+                vectors[i, columns[term]] = 1 + np.log(count)
+    vectors *= np.log((1 + len(docs)) / (1 + np.array([df[term] for term in vocab], dtype=np.float32))) + 1
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms == 0, 1, norms)
+    log_rents = np.log(np.maximum([row.rent for row in rows], 1.0))
+    return [row.id for row in rows], log_rents, vectors
+
+
+def _nearest(ids, log_rents, vectors, k, queries=None):
+    """Yield (property_id, [(similar_id, score), ...] best first) for each query row.
+
+    Rows must be sorted by rent, so each chunk of queries only has to be
+    scored against the contiguous window of rows within RENT_BAND of it.
+    """
+    import numpy as np
+
+    band = np.log(RENT_BAND)
+    queries = np.arange(len(ids)) if queries is None else np.asarray(queries)
+    for start in range(0, len(queries), CHUNK):
+        rows = queries[start:start + CHUNK]
+        lo = int(np.searchsorted(log_rents, log_rents[rows].min() - band, 'left'))
+        hi = int(np.searchsorted(log_rents, log_rents[rows].max() + band, 'right'))
+        rent_gap = np.abs(log_rents[rows, None] - log_rents[None, lo:hi])
+        scores = TEXT_WEIGHT * (vectors[rows] @ vectors[lo:hi].T) + (1 - TEXT_WEIGHT) * np.exp(-rent_gap / RENT_SCALE)
+        scores[rent_gap > band] = -np.inf
+        scores[np.arange(len(rows)), rows - lo] = -np.inf  # not similar to itself
+        n = min(k, hi - lo - 1)
+        top = np.argpartition(-scores, n - 1, axis=1)[:, :n] if n > 0 else np.empty((len(rows), 0), dtype=int)
+        for i, row in enumerate(rows):
+            best = top[i][np.argsort(-scores[i, top[i]])]
+            yield ids[row], [(ids[lo + j], float(scores[i, j])) for j in best if np.isfinite(scores[i, j])]
+
+
+def _store(lists):
+    """Replace the stored neighbour lists of the properties in lists ({property_id: [(similar_id, score)]})."""
+    if not lists:
+        return
+    db.session.execute(delete(SimilarProperty).where(SimilarProperty.property_id.in_(list(lists))))
+    rows = [{'property_id': prop_id, 'similar_id': similar_id, 'rank': rank, 'score': score}
+            for prop_id, neighbours in lists.items() for rank, (similar_id, score) in enumerate(neighbours)]
+    if rows:
+        db.session.execute(insert(SimilarProperty), rows)
+
+
+def rebuild_similar(batch_size=1000):
+    """Recompute every property's neighbour list; returns the number of properties processed.
+
+    Works one property_type at a time (neighbours never cross types),
+    committing after each, so the detail page keeps its old lists meanwhile.
+    """
+    k = current_app.config['SIMILAR_PROPERTIES']
+    types = [ptype for (ptype,) in db.session.query(Property.property_type).distinct()]
+    done = 0
+    for ptype in types:
+        rows = db.session.query(*FEATURE_COLUMNS).filter(Property.property_type == ptype).order_by(Property.rent).all()
+        ids, log_rents, vectors = _features(rows)
+        lists = {}
+        for prop_id, neighbours in _nearest(ids, log_rents, vectors, k):
+            lists[prop_id] = neighbours
+            if len(lists) >= batch_size:
+                _store(lists)
+                lists = {}
+        _store(lists)
+        db.session.commit()
+        done += len(rows)
+    # Lists left behind by properties deleted without remove_similar()
+    db.session.execute(delete(SimilarProperty).where(SimilarProperty.property_id.not_in(select(Property.id))))
+    db.session.commit()
+    return done
+
+
+def refresh_similar(prop_id):
+    """Recompute one property's neighbours after it was added or edited, then commit.
+
+    Only the SIMILAR_CANDIDATES listings of the same type closest in rent are
+    scored, with their own TF-IDF weights, so this is cheap enough to run in
+    the request; scores are close to, not identical with, a full rebuild's.
+    The property is also let into each neighbour's list if it beats that
+    list's weakest entry.
+    """
+    k = current_app.config['SIMILAR_PROPERTIES']
+    prop = db.session.query(*FEATURE_COLUMNS, Property.property_type).filter(Property.id == prop_id).first()
+    if prop is None:
+        return
+    candidates = (db.session.query(*FEATURE_COLUMNS)
+                  .filter(Property.property_type == prop.property_type, Property.id != prop_id,
+                          Property.rent.between(prop.rent / RENT_BAND, prop.rent * RENT_BAND))
+                  .order_by(func.abs(Property.rent - prop.rent))
+                  .limit(current_app.config['SIMILAR_CANDIDATES'])
+                  .all())
+    rows = sorted([prop] + candidates, key=lambda row: row.rent)
+    ids, log_rents, vectors = _features(rows)
+    [(_, neighbours)] = _nearest(ids, log_rents, vectors, k, [ids.index(prop_id)])
+
+    lists = {prop_id: neighbours}
+    current = {}
+    for entry in SimilarProperty.query.filter(SimilarProperty.property_id.in_([sid for sid, _ in neighbours])):
+        current.setdefault(entry.property_id, []).append((entry.rank, entry.similar_id, entry.score))
+    for similar_id, score in neighbours:
+        entries = [(sid, s) for _, sid, s in sorted(current.get(similar_id, [])) if sid != prop_id]
+        if len(entries) < k or score > entries[-1][1]:
+            lists[similar_id] = sorted(entries + [(prop_id, score)], key=lambda entry: -entry[1])[:k]
+    _store(lists)
+    db.session.commit()
+
+
+def remove_similar(prop_id):
+    """Drop a property's list and its appearances in other lists (call before committing its deletion)."""
+    db.session.execute(delete(SimilarProperty).where(
+        or_(SimilarProperty.property_id == prop_id, SimilarProperty.similar_id == prop_id)))
+
+
+def similar_query(prop_id):
+    """The stored neighbours of prop_id, most similar first, loaded for rendering."""
+    return (listing_query()
+            .join(SimilarProperty, SimilarProperty.similar_id == Property.id)
+            .filter(SimilarProperty.property_id == prop_id)
+            .order_by(SimilarProperty.rank))
+
+
+def similar_listings(prop_id, limit):
+    return similar_query(prop_id).limit(limit).all()
@@ -0,0 +1,288 @@
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+from flask import current_app
+from sqlalchemy import DDL, Float, Integer, column, event, or_, text, values
+from sqlalchemy.orm import Session
+
+from models import db, Property
+
+# Column weights used for BM25 ranking: a hit in the title counts for more
+# than a hit in the location, which counts for more than the description.
+FIELD_WEIGHTS = {'title': 10.0, 'location': 5.0, 'description': 1.0}
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+FTS_TABLE = 'properties_fts'
+CREATE_FTS_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, location, description, tokenize='unicode61 remove_diacritics 2')"
+)
+
+# Keep the FTS5 table's lifecycle tied to the properties table so that
+# db.create_all()/db.drop_all() (init_db.py, seed_data.py) manage it too.
+event.listen(Property.__table__, 'after_create', DDL(CREATE_FTS_TABLE).execute_if(dialect='sqlite'))
+event.listen(Property.__table__, 'before_drop', DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect='sqlite'))
+
+# Session.info key of the MemorySearchIndex changes waiting for a commit
+PENDING_KEY = 'search_index_pending'
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_pending(session):
+    for index, prop_id, fields in session.info.pop(PENDING_KEY, []):
+        index.apply_change(prop_id, fields)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+def substring_search(query, q):
+    """Listings whose title or location contains q anywhere (e.g. "bhk" in "2BHK"), unranked.
+
+    The fallback for searches no indexed term starts with, so they still
+    match what the original ILIKE search did.
+    """
+    q = q.strip()
+    return query.filter(or_(Property.title.icontains(q, autoescape=True),
+                            Property.location.icontains(q, autoescape=True)))
+
+
+def tokenize(value):
+    """Lower-case, accent-fold and split text the same way FTS5's unicode61 tokenizer does."""
+    if not value:
+        return []
+    folded = unicodedata.normalize('NFKD', value.lower())
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch))
+    return TOKEN_RE.findall(folded)
+
+
+class FTS5SearchIndex:
+    """Inverted index stored in an SQLite FTS5 virtual table, ranked with bm25()."""
+
+    name = 'fts5'
+
+    def __init__(self):
+        db.session.execute(text(CREATE_FTS_TABLE))
+        indexed = db.session.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar()
+        if indexed != Property.query.count():
+            self.rebuild()
+        db.session.commit()
+
+    def add(self, prop):
+        self.remove(prop.id)
+        db.session.execute(
+            text(f"INSERT INTO {FTS_TABLE}(rowid, title, location, description) "
+                 "VALUES (:id, :title, :location, :description)"),
+            {'id': prop.id, 'title': prop.title, 'location': prop.location,
+             'description': prop.description or ''}
+        )
+
+    def remove(self, prop_id):
+        db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {'id': prop_id})
+
+    def rebuild(self):
+        db.session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        db.session.execute(text(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, location, description) "
+            "SELECT id, title, location, coalesce(description, '') FROM properties"
+        ))
+
+    def apply(self, query, q):
+        tokens = tokenize(q)
+        if not tokens:
+            return query, None
+        # Quote every token so user input can never be parsed as FTS5 syntax,
+        # and prefix-match the terms so partial words ("pun") still find "Pune".
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        hit = db.session.execute(text(f"SELECT 1 FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match LIMIT 1"),
+                                 {'match': match}).first()
+        if hit is None:
+            return substring_search(query, q), None
+        weights = ', '.join(str(w) for w in FIELD_WEIGHTS.values())
+        fts = text(
+            f"SELECT rowid AS property_id, bm25({FTS_TABLE}, {weights}) AS rank "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+        ).bindparams(match=match).columns(property_id=Integer, rank=Float).subquery('fts')
+        query = query.join(fts, fts.c.property_id == Property.id)
+        # bm25() is negative and lower is better, so ascending order is best-first.
+        return query, fts.c.rank
+
+
+class MemorySearchIndex:
+    """In-process inverted index with BM25 scoring, used when FTS5 is unavailable.
+
+    The index lives in each worker process and is built from the database on
+    first use, so writes made through another worker are only picked up after
+    a restart or an explicit rebuild. add() and remove() take effect when the
+    session commits, and are dropped if it rolls back instead.
+    """
+
+    name = 'memory'
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rebuild()
+
+    def _reset(self):
+        self.postings = {}
+        self.doc_terms = {}
+        self.doc_lengths = {}
+        self.vocabulary = []
+        self.total_length = 0.0
+
+    def _add_document(self, prop_id, fields):
+        self._remove_document(prop_id)
+        terms = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(fields.get(field)):
+                terms[token] = terms.get(token, 0.0) + weight
+        length = sum(terms.values())
+        self.doc_terms[prop_id] = terms
+        self.doc_lengths[prop_id] = length
+        self.total_length += length
+        for term, tf in terms.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                insort(self.vocabulary, term)
+            postings[prop_id] = tf
+
+    def _remove_document(self, prop_id):
+        terms = self.doc_terms.pop(prop_id, None)
+        if terms is None:
+            return
+        self.total_length -= self.doc_lengths.pop(prop_id)
+        for term in terms:
+            postings = self.postings[term]
+            postings.pop(prop_id, None)
+            if not postings:
+                del self.postings[term]
+                del self.vocabulary[bisect_left(self.vocabulary, term)]
+
+    def _expand(self, token):
+        """Return every indexed term that starts with token."""
+        position = bisect_left(self.vocabulary, token)
+        terms = []
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(token):
+            terms.append(self.vocabulary[position])
+            position += 1
+        return terms
+
+    def _defer(self, prop_id, fields):
+        db.session.info.setdefault(PENDING_KEY, []).append((self, prop_id, fields))
+
+    def apply_change(self, prop_id, fields):
+        """Index fields for prop_id now, or remove it when fields is None."""
+        with self._lock:
+            if fields is None:
+                self._remove_document(prop_id)
+            else:
+                self._add_document(prop_id, fields)
+
+    def add(self, prop):
+        self._defer(prop.id, {'title': prop.title, 'location': prop.location, 'description': prop.description})
+
+    def remove(self, prop_id):
+        self._defer(prop_id, None)
+
+    def rebuild(self):
+        rows = db.session.query(Property.id, Property.title, Property.location, Property.description).all()
+        with self._lock:
+            self._reset()
+            for prop_id, title, location, description in rows:
+                self._add_document(prop_id, {'title': title, 'location': location, 'description': description})
+
+    def search(self, q):
+        """Return [(property_id, score)] for documents matching every query token, best first."""
+        tokens = tokenize(q)
+        if not tokens:
+            return []
+        with self._lock:
+            n_docs = len(self.doc_terms)
+            if not n_docs:
+                return []
+            avg_length = self.total_length / n_docs
+            scores = None
+            for token in tokens:
+                token_scores = {}
+                for term in self._expand(token):
+                    postings = self.postings[term]
+                    idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for prop_id, tf in postings.items():
+                        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[prop_id] / avg_length)
+                        token_scores[prop_id] = token_scores.get(prop_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {pid: s + token_scores[pid] for pid, s in scores.items() if pid in token_scores}
+                if not scores:
+                    return []
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def apply(self, query, q):
+        if not tokenize(q):
+            return query, None
+        hits = self.search(q)[:current_app.config['SEARCH_MAX_HITS']]
+        if not hits:
+            return substring_search(query, q), None
+        # Join the best hits as a CTE of inline VALUES (id, position): no bind
+        # parameter per hit, and the position is a plain column that keyset
+        # pagination can seek on
+        ranked = values(column('property_id', Integer), column('rank', Integer), name='search_hits',
+                        literal_binds=True).data([(prop_id, position) for position, (prop_id, _) in enumerate(hits)])
+        ranked = ranked.cte('search_hits')
+        return query.join(ranked, ranked.c.property_id == Property.id), ranked.c.rank
+
+
+def _fts5_available():
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    try:
+        db.session.execute(text(CREATE_FTS_TABLE))
+        db.session.commit()
+    except Exception:
+        # This SQLite build was compiled without the FTS5 extension.
+        db.session.rollback()
+        return False
+    return True
+
+
+def get_search_index():
+    """Return the search index for the current app, creating it on first use."""
+    index = current_app.extensions.get('search_index')
+    if index is None:
+        backend = current_app.config.get('SEARCH_BACKEND', 'auto')
+        if backend == 'fts5' or (backend == 'auto' and _fts5_available()):
+            index = FTS5SearchIndex()
+        else:
+            index = MemorySearchIndex()
+        current_app.extensions['search_index'] = index
+    return index
+
+
+def index_property(prop):
+    """Add or refresh a property in the search index (call before committing)."""
+    get_search_index().add(prop)
+
+
+def unindex_property(prop_id):
+    """Remove a property from the search index (call before committing)."""
+    get_search_index().remove(prop_id)
+
+
+def apply_text_search(query, q):
+    """Restrict a Property query to listings matching q.
+
+    Returns (query, rank) where rank is an expression that puts the most
+    relevant listings first when sorted ascending, or None when q contains
+    no searchable terms.
+    """
+    return get_search_index().apply(query, q)
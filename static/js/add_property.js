@@ -0,0 +1,255 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const uploadContainer = document.getElementById('uploadContainer');
+    const imageInput = document.getElementById('imageInput');
+    const imagesPreview = document.getElementById('imagesPreview');
+    const previewGrid = document.getElementById('previewGrid');
+    const noImagesMessage = document.getElementById('noImagesMessage');
+    const uploadProgress = document.getElementById('uploadProgress');
+    const progressFill = document.getElementById('progressFill');
+    const progressText = document.getElementById('progressText');
+
+    let uploadedFiles = [];
+    const MAX_FILES = 10;
+    const MAX_FILE_SIZE = 10 * 1024 * 1024; // 10MB
+
+    // Click on container to trigger file input
+    uploadContainer.addEventListener('click', function() {
+        imageInput.click();
+    });
+
+    // Handle file selection
+    imageInput.addEventListener('change', function() {
+        handleFiles(this.files);
+    });
+
+    // Drag and drop functionality
+    uploadContainer.addEventListener('dragover', function(e) {
+        e.preventDefault();
+        this.classList.add('dragover');
+    });
+
+    uploadContainer.addEventListener('dragleave', function() {
+        this.classList.remove('dragover');
+    });
+
+    uploadContainer.addEventListener('drop', function(e) {
+        e.preventDefault();
+        this.classList.remove('dragover');
+
+        if (e.dataTransfer.files && e.dataTransfer.files.length > 0) {
+            handleFiles(e.dataTransfer.files);
+        }
+    });
+
+    function handleFiles(files) {
+        const validFiles = Array.from(files).filter(file => {
+            // Check file type
+            if (!file.type.startsWith('image/')) {
+                showToast('Please select only image files.', 'error');
+                return false;
+            }
+
+            // Check file size
+            if (file.size > MAX_FILE_SIZE) {
+                showToast(`File "${file.name}" is too large. Maximum size is 10MB.`, 'error');
+                return false;
+            }
+
+            return true;
+        });
+
+        // Check total file count
+        if (uploadedFiles.length + validFiles.length > MAX_FILES) {
+            showToast(`You can only upload up to ${MAX_FILES} images.`, 'error');
+            validFiles.splice(MAX_FILES - uploadedFiles.length);
+        }
+
+        if (validFiles.length > 0) {
+            // Simulate upload progress
+            simulateUploadProgress(validFiles);
+
+            // Add to uploaded files
+            uploadedFiles = [...uploadedFiles, ...validFiles];
+
+            // Update preview
+            updatePreview();
+
+            showToast(`Added ${validFiles.length} image(s) successfully.`, 'success');
+        }
+    }
+
+    function simulateUploadProgress(files) {
+        uploadProgress.classList.add('uploading');
+        let progress = 0;
+
+        const interval = setInterval(() => {
+            progress += 5;
+            progressFill.style.width = `${progress}%`;
+            progressText.textContent = `${progress}%`;
+
+            if (progress >= 100) {
+                clearInterval(interval);
+                setTimeout(() => {
+                    uploadProgress.classList.remove('uploading');
+                    progressFill.style.width = '0%';
+                    progressText.textContent = '0%';
+                }, 500);
+            }
+        }, 50);
+    }
+
+    function updatePreview() {
+        previewGrid.innerHTML = '';
+
+        if (uploadedFiles.length === 0) {
+            imagesPreview.classList.remove('has-images');
+            noImagesMessage.style.display = 'block';
+            return;
+        }
+
+        imagesPreview.classList.add('has-images');
+        noImagesMessage.style.display = 'none';
+
+        uploadedFiles.forEach((file, index) => {
+            const reader = new FileReader();
+
+            reader.onload = function(e) {
+                const previewItem = document.createElement('div');
+                previewItem.className = 'preview-item';
+                previewItem.innerHTML = `
+                    <img src="${e.target.result}" class="preview-image" alt="Preview">
+                    <button type="button" class="preview-remove" data-index="${index}">
+                        <i class="fas fa-times"></i>
+                    </button>
+                    <div class="preview-info">
+                        <div class="preview-name">${file.name}</div>
+                        <div class="preview-size">${formatFileSize(file.size)}</div>
+                    </div>
+                `;
+
+                previewGrid.appendChild(previewItem);
+
+                // Add remove functionality
+                const removeBtn = previewItem.querySelector('.preview-remove');
+                removeBtn.addEventListener('click', function() {
+                    const removeIndex = parseInt(this.getAttribute('data-index'));
+                    removeImage(removeIndex);
+                });
+            };
+
+            reader.readAsDataURL(file);
+        });
+
+        // Update image counter
+        updateImageCounter();
+    }
+
+    function removeImage(index) {
+        uploadedFiles.splice(index, 1);
+        updatePreview();
+        showToast('Image removed.', 'info');
+    }
+
+    function updateImageCounter() {
+        // Remove existing counter
+        const existingCounter = document.querySelector('.image-counter');
+        if (existingCounter) {
+            existingCounter.remove();
+        }
+
+        // Add new counter
+        const counter = document.createElement('div');
+        counter.className = 'image-counter';
+        counter.textContent = `${uploadedFiles.length} of ${MAX_FILES} images selected`;
+        imagesPreview.appendChild(counter);
+    }
+
+    function formatFileSize(bytes) {
+        if (bytes === 0) return '0 Bytes';
+        const k = 1024;
+        const sizes = ['Bytes', 'KB', 'MB', 'GB'];
+        const i = Math.floor(Math.log(bytes) / Math.log(k));
+        return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
+    }
+
+    function showToast(message, type = 'info') {
+        const toast = document.createElement('div');
+        toast.className = `position-fixed bottom-0 end-0 p-3`;
+        toast.style.zIndex = '1050';
+
+        const bgColor = type === 'error' ? 'var(--accent-color)' : 
+                       type === 'success' ? 'var(--success-color)' : 'var(--secondary-color)';
+
+        toast.innerHTML = `
+            <div class="toast show" role="alert" style="border-left: 4px solid ${bgColor}">
+                <div class="toast-header">
+                    <i class="fas fa-${type === 'error' ? 'exclamation-circle' : type === 'success' ? 'check-circle' : 'info-circle'} me-2" style="color: ${bgColor}"></i>
+                    <strong class="me-auto">${type.charAt(0).toUpperCase() + type.slice(1)}</strong>
+                    <button type="button" class="btn-close" data-bs-dismiss="toast"></button>
+                </div>
+                <div class="toast-body">${message}</div>
+            </div>
+        `;
+
+        document.body.appendChild(toast);
+
+        setTimeout(() => {
+            toast.remove();
+        }, 4000);
+    }
+
+    // Form validation - REMOVED the strict image requirement
+    const form = document.getElementById('propertyForm');
+    form.addEventListener('submit', function(e) {
+        let valid = true;
+
+        // Check required form fields
+        const requiredFields = form.querySelectorAll('input[required], select[required], textarea[required]');
+        requiredFields.forEach(field => {
+            if (!field.value.trim()) {
+                valid = false;
+                field.classList.add('is-invalid');
+            } else {
+                field.classList.remove('is-invalid');
+            }
+        });
+
+        // Images are optional now
+        if (uploadedFiles.length === 0) {
+            // Just show a warning, don't prevent submission
+            showToast('No images uploaded. You can add images later.', 'warning');
+        }
+
+        if (!valid) {
+            e.preventDefault();
+            showToast('Please fill in all required fields.', 'error');
+        }
+    });
+
+    // Add real-time character count for description
+    const descriptionField = document.querySelector('textarea[name="description"]');
+    if (descriptionField) {
+        const charCount = document.createElement('div');
+        charCount.className = 'form-hint text-end';
+        charCount.textContent = '0/2000 characters';
+        descriptionField.parentNode.appendChild(charCount);
+
+        descriptionField.addEventListener('input', function() {
+            const count = this.value.length;
+            charCount.textContent = `${count}/2000 characters`;
+
+            if (count > 2000) {
+                charCount.style.color = 'var(--accent-color)';
+            } else {
+                charCount.style.color = '#6c757d';
+            }
+        });
+
+        // Initialize character count
+        const initialCount = descriptionField.value.length;
+        charCount.textContent = `${initialCount}/2000 characters`;
+        if (initialCount > 2000) {
+            charCount.style.color = 'var(--accent-color)';
+        }
+    }
+});
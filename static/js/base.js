@@ -0,0 +1,112 @@
+// Back to top button
+const backToTopButton = document.getElementById('backToTop');
+
+window.addEventListener('scroll', () => {
+    if (window.pageYOffset > 300) {
+        backToTopButton.classList.add('show');
+    } else {
+        backToTopButton.classList.remove('show');
+    }
+});
+
+backToTopButton.addEventListener('click', () => {
+    window.scrollTo({
+        top: 0,
+        behavior: 'smooth'
+    });
+});
+
+// Auto-dismiss alerts after 5 seconds
+document.addEventListener('DOMContentLoaded', () => {
+    const alerts = document.querySelectorAll('.alert');
+    alerts.forEach(alert => {
+        setTimeout(() => {
+            const bsAlert = new bootstrap.Alert(alert);
+            bsAlert.close();
+        }, 5000);
+    });
+
+    // Initialize dropdowns
+    const dropdownElementList = [].slice.call(document.querySelectorAll('.dropdown-toggle'));
+    const dropdownList = dropdownElementList.map(function (dropdownToggleEl) {
+        return new bootstrap.Dropdown(dropdownToggleEl);
+    });
+});
+
+// Push new messages on pages whose <body> has data-message-stream: Server-Sent
+// Events, or long polling where EventSource is missing. Pages handle
+// 'messages:new' themselves (and preventDefault); anywhere else a toast links
+// to the conversation.
+document.addEventListener('DOMContentLoaded', () => {
+    const { messageStream, messagePoll } = document.body.dataset;
+    if (!messageStream) return;
+    const section = document.querySelector('[data-messages-after]');
+    let after = section ? Number(section.dataset.messagesAfter) : 0;
+
+    const deliver = message => {
+        after = Math.max(after, message.id);
+        const handled = !document.dispatchEvent(new CustomEvent('messages:new', { detail: message, cancelable: true }));
+        if (handled) return;
+        const toast = document.createElement('div');
+        toast.className = 'position-fixed bottom-0 end-0 p-3';
+        toast.style.zIndex = '1050';
+        toast.innerHTML = `<div class="toast show" role="alert"><div class="toast-body">
+            <i class="fas fa-envelope me-2"></i><a></a></div></div>`;
+        const link = toast.querySelector('a');
+        link.href = message.url;
+        link.textContent = `New message from ${message.sender}`;
+        document.body.appendChild(toast);
+        setTimeout(() => toast.remove(), 8000);
+    };
+
+    if (window.EventSource) {
+        const source = new EventSource(`${messageStream}?after=${after}`);
+        source.addEventListener('message', e => deliver(JSON.parse(e.data)));
+    } else {
+        const poll = () => fetch(`${messagePoll}?after=${after}`)
+            .then(response => response.json())
+            .then(data => data.messages.forEach(deliver))
+            .catch(() => new Promise(resolve => setTimeout(resolve, 5000)))
+            .finally(poll);
+        poll();
+    }
+});
+
+// Infinite scroll for listing grids: fetch the next keyset page as JSON
+// and append its pre-rendered cards instead of reloading the page
+document.addEventListener('DOMContentLoaded', () => {
+    const loadMore = document.getElementById('loadMore');
+    if (!loadMore || !('IntersectionObserver' in window)) return;
+    const grid = document.getElementById(loadMore.dataset.grid);
+    let loading = false;
+
+    const loadNextPage = () => {
+        if (loading) return;
+        loading = true;
+        const url = new URL(loadMore.href, window.location.origin);
+        url.searchParams.set('format', 'json');
+        fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+            .then(response => response.json())
+            .then(data => {
+                const template = document.createElement('template');
+                template.innerHTML = data.html;
+                const cards = Array.from(template.content.children);
+                grid.append(...cards);
+                document.dispatchEvent(new CustomEvent('listings:loaded', { detail: { cards } }));
+                if (data.has_more) {
+                    loadMore.href = data.next_url;
+                } else {
+                    observer.disconnect();
+                    loadMore.parentElement.remove();
+                }
+            })
+            .catch(error => console.error('Error loading more listings:', error))
+            .finally(() => { loading = false; });
+    };
+
+    const observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) loadNextPage();
+    }, { rootMargin: '400px' });
+    observer.observe(loadMore);
+});
+
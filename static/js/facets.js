@@ -0,0 +1,57 @@
+// Live counts for the search form: option labels show how many listings each
+// type has, and the histogram shows rents for the current query and type.
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('form[data-facets-url]').forEach(function(form) {
+        const histogram = form.querySelector('.rent-histogram');
+        const typeSelect = form.querySelector('select[name="type"]');
+        const minInput = form.elements['min_rent'];
+        const maxInput = form.elements['max_rent'];
+        let timer = null;
+        let pending = null;
+
+        function render(facets) {
+            Array.from(typeSelect.options).forEach(function(option) {
+                if (!option.dataset.label) option.dataset.label = option.textContent;
+                const count = option.value ? (facets.types[option.value] || 0) : null;
+                option.textContent = option.dataset.label + (count === null ? '' : ' (' + count + ')');
+            });
+            if (!histogram) return;
+            const min = parseFloat(minInput.value), max = parseFloat(maxInput.value);
+            const peak = Math.max(1, ...facets.rent_histogram.map(b => b.count));
+            histogram.innerHTML = '';
+            facets.rent_histogram.forEach(function(bucket) {
+                const bar = document.createElement('div');
+                const inRange = !(min >= (bucket.max === null ? Infinity : bucket.max) || max < bucket.min);
+                bar.className = 'bar' + (inRange ? ' in-range' : '');
+                bar.style.height = (100 * bucket.count / peak) + '%';
+                bar.title = '₹' + bucket.min.toLocaleString() + (bucket.max === null ? '+' : ' – ₹' + bucket.max.toLocaleString())
+                    + ': ' + bucket.count + ' listings';
+                bar.addEventListener('click', function() {
+                    minInput.value = bucket.min || '';
+                    maxInput.value = bucket.max === null ? '' : bucket.max;
+                    refresh();
+                });
+                histogram.appendChild(bar);
+            });
+        }
+
+        function refresh() {
+            const params = new URLSearchParams();
+            ['q', 'min_rent', 'max_rent', 'type', 'near', 'radius_km'].forEach(function(name) {
+                if (form.elements[name] && form.elements[name].value) params.set(name, form.elements[name].value);
+            });
+            if (pending) pending.abort();
+            pending = new AbortController();
+            fetch(form.dataset.facetsUrl + '?' + params, { signal: pending.signal })
+                .then(response => response.json())
+                .then(render)
+                .catch(() => {});
+        }
+
+        form.addEventListener('input', function() {
+            clearTimeout(timer);
+            timer = setTimeout(refresh, 300);
+        });
+        refresh();
+    });
+});
@@ -0,0 +1,195 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Add animation to property cards when they come into view
+    const propertyCards = document.querySelectorAll('.property-card');
+
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.style.opacity = '1';
+                entry.target.style.transform = 'translateY(0)';
+            }
+        });
+    }, { threshold: 0.1 });
+
+    propertyCards.forEach(card => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(20px)';
+        card.style.transition = 'opacity 0.5s ease, transform 0.5s ease';
+        observer.observe(card);
+    });
+
+    // Cards are cached for every user, so mark this user's favorites here
+    const grid = document.getElementById('propertyGrid');
+    const userFavorites = new Set(grid ? JSON.parse(grid.dataset.userFavorites) : []);
+    function markFavorites(cards) {
+        cards.forEach(card => {
+            const btn = card.querySelector('.favorite-btn');
+            if (btn && userFavorites.has(Number(btn.getAttribute('data-property-id')))) {
+                btn.classList.add('active');
+                btn.querySelector('i').classList.replace('far', 'fas');
+            }
+        });
+    }
+    markFavorites(document.querySelectorAll('#propertyGrid > *'));
+
+    // Wire up cards appended by infinite scroll
+    document.addEventListener('listings:loaded', function(e) {
+        markFavorites(e.detail.cards);
+        e.detail.cards.forEach(card => {
+            const btn = card.querySelector('.favorite-btn');
+            if (btn) {
+                btn.addEventListener('click', function(ev) {
+                    ev.preventDefault();
+                    ev.stopPropagation();
+                    toggleFavorite(this, this.getAttribute('data-property-id'));
+                });
+            }
+        });
+    });
+
+    // FAVORITES FUNCTIONALITY
+    const favoriteButtons = document.querySelectorAll('.favorite-btn');
+
+    favoriteButtons.forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            e.preventDefault();
+            e.stopPropagation();
+
+            toggleFavorite(this, this.getAttribute('data-property-id'));
+        });
+    });
+});
+
+// ADD THIS FUNCTION - toggleFavorite for onclick
+function toggleFavorite(button, propertyId) {
+    const icon = button.querySelector('i');
+    const isActive = button.classList.contains('active');
+
+    // Toggle visual state immediately for better UX
+    if (isActive) {
+        button.classList.remove('active');
+        icon.classList.remove('fas');
+        icon.classList.add('far');
+        showToast('Removed from favorites', 'info');
+    } else {
+        button.classList.add('active');
+        icon.classList.remove('far');
+        icon.classList.add('fas');
+        showToast('Added to favorites', 'success');
+    }
+
+    // Clicks are sent in batches, so quick toggles cost one request
+    queueFavorite(propertyId, !isActive ? 'add' : 'remove')
+    .then(ok => {
+        if (!ok) {
+            // Revert visual state if request failed
+            if (!isActive) {
+                button.classList.remove('active');
+                icon.classList.remove('fas');
+                icon.classList.add('far');
+            } else {
+                button.classList.add('active');
+                icon.classList.remove('far');
+                icon.classList.add('fas');
+            }
+
+            showToast('Failed to update favorites', 'error');
+        }
+    });
+}
+
+// Favorite changes made within FAVORITE_BATCH_DELAY ms of each other go
+// to /favorites/batch together; each promise resolves true once saved
+const FAVORITE_BATCH_DELAY = 400;
+let pendingFavorites = [];
+let favoriteTimer = null;
+function queueFavorite(propertyId, action) {
+    return new Promise(resolve => {
+        pendingFavorites.push({ operation: { property_id: Number(propertyId), action: action }, resolve: resolve });
+        clearTimeout(favoriteTimer);
+        favoriteTimer = setTimeout(flushFavorites, FAVORITE_BATCH_DELAY);
+    });
+}
+function flushFavorites() {
+    const batch = pendingFavorites;
+    pendingFavorites = [];
+    fetch(document.getElementById('propertyGrid').dataset.batchUrl, {
+        method: 'POST',
+        body: JSON.stringify({ operations: batch.map(item => item.operation) }),
+        headers: {
+            'Content-Type': 'application/json',
+            'X-Requested-With': 'XMLHttpRequest'
+        }
+    })
+    .then(response => response.json())
+    .then(data => batch.forEach(item => item.resolve(Boolean(data.success))))
+    .catch(error => {
+        console.error('Error:', error);
+        batch.forEach(item => item.resolve(false));
+    });
+}
+
+// KEEP THE EXISTING toggleFavorite function for the event listener version
+function toggleFavoriteOld(propertyId, addToFavorites) {
+    const formData = new FormData();
+    formData.append('property_id', propertyId);
+    formData.append('action', addToFavorites ? 'add' : 'remove');
+
+    fetch('/favorites/toggle', {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest'
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            // Revert visual state if request failed
+            const btn = document.querySelector(`.favorite-btn[data-property-id="${propertyId}"]`);
+            const icon = btn.querySelector('i');
+
+            if (addToFavorites) {
+                btn.classList.remove('active');
+                icon.classList.remove('fas');
+                icon.classList.add('far');
+            } else {
+                btn.classList.add('active');
+                icon.classList.remove('far');
+                icon.classList.add('fas');
+            }
+
+            showToast('Failed to update favorites', 'error');
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        showToast('Failed to update favorites', 'error');
+    });
+}
+
+function showToast(message, type = 'info') {
+    const toast = document.createElement('div');
+    toast.className = `position-fixed bottom-0 end-0 p-3`;
+    toast.style.zIndex = '1050';
+
+    const bgColor = type === 'error' ? 'var(--accent-color)' : 
+                   type === 'success' ? 'var(--success-color)' : 'var(--secondary-color)';
+
+    toast.innerHTML = `
+        <div class="toast show" role="alert" style="border-left: 4px solid ${bgColor}">
+            <div class="toast-header">
+                <i class="fas fa-${type === 'error' ? 'exclamation-circle' : type === 'success' ? 'check-circle' : 'info-circle'} me-2" style="color: ${bgColor}"></i>
+                <strong class="me-auto">${type.charAt(0).toUpperCase() + type.slice(1)}</strong>
+                <button type="button" class="btn-close" data-bs-dismiss="toast"></button>
+            </div>
+            <div class="toast-body">${message}</div>
+        </div>
+    `;
+
+    document.body.appendChild(toast);
+
+    setTimeout(() => {
+        toast.remove();
+    }, 3000);
+}
@@ -0,0 +1,52 @@
+// Ensure fields are empty on page load
+window.onload = function() {
+    const emailField = document.querySelector('input[name="email"]');
+    const passwordField = document.querySelector('input[name="password"]');
+    if (emailField) emailField.value = '';
+    if (passwordField) passwordField.value = '';
+};
+
+function socialLogin(provider) {
+    // Show loading state
+    const buttons = document.querySelectorAll('.social-btn');
+    buttons.forEach(btn => btn.disabled = true);
+
+    // Simulate social login process
+    const toast = document.createElement('div');
+    toast.className = 'position-fixed bottom-0 end-0 p-3';
+    toast.style.zIndex = '1050';
+    toast.innerHTML = `
+        <div class="toast show" role="alert">
+            <div class="toast-header">
+                <i class="fas fa-info-circle text-primary me-2"></i>
+                <strong class="me-auto">Social Login</strong>
+                <button type="button" class="btn-close" data-bs-dismiss="toast"></button>
+            </div>
+            <div class="toast-body">
+                ${provider.charAt(0).toUpperCase() + provider.slice(1)} login functionality coming soon!
+            </div>
+        </div>
+    `;
+    document.body.appendChild(toast);
+
+    // Remove toast after 3 seconds and re-enable buttons
+    setTimeout(() => {
+        toast.remove();
+        buttons.forEach(btn => btn.disabled = false);
+    }, 3000);
+}
+
+// Add hover effects for social buttons
+document.addEventListener('DOMContentLoaded', function() {
+    const socialBtns = document.querySelectorAll('.social-btn');
+    socialBtns.forEach(btn => {
+        btn.addEventListener('mouseenter', function() {
+            if (!this.disabled) {
+                this.style.transform = 'translateY(-3px)';
+            }
+        });
+        btn.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+        });
+    });
+});
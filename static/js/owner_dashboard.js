@@ -0,0 +1,25 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Add loading animation to cards
+    const propertyCards = document.querySelectorAll('.property-card');
+
+    propertyCards.forEach((card, index) => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(20px)';
+
+        setTimeout(() => {
+            card.style.transition = 'all 0.5s ease';
+            card.style.opacity = '1';
+            card.style.transform = 'translateY(0)';
+        }, index * 100);
+    });
+
+    // Add confirmation for delete buttons
+    const deleteButtons = document.querySelectorAll('.btn-outline-danger');
+    deleteButtons.forEach(button => {
+        button.addEventListener('click', function(e) {
+            if (!confirm('Are you sure you want to delete this property?')) {
+                e.preventDefault();
+            }
+        });
+    });
+});
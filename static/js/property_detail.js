@@ -0,0 +1,132 @@
+    document.addEventListener('DOMContentLoaded', function() {
+        // Smooth scrolling for anchor links
+        document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+            anchor.addEventListener('click', function (e) {
+                e.preventDefault();
+                document.querySelector(this.getAttribute('href')).scrollIntoView({
+                    behavior: 'smooth'
+                });
+            });
+        });
+
+        // Add animation to cards
+        const cards = document.querySelectorAll('.card');
+        cards.forEach((card, index) => {
+            card.style.opacity = '0';
+            card.style.transform = 'translateY(20px)';
+
+            setTimeout(() => {
+                card.style.transition = 'all 0.5s ease';
+                card.style.opacity = '1';
+                card.style.transform = 'translateY(0)';
+            }, index * 100);
+        });
+
+        // Message threads: page in older messages on demand
+        document.querySelectorAll('.message-thread').forEach(thread => {
+            const list = thread.querySelector('.messages-list');
+            const loadOlder = thread.querySelector('.load-older');
+
+            const fetchThread = params => fetch(`${thread.dataset.url}&${new URLSearchParams(params)}`, {
+                headers: { 'X-Requested-With': 'XMLHttpRequest' }
+            }).then(response => response.json());
+
+            if (loadOlder) {
+                loadOlder.addEventListener('click', function() {
+                    fetchThread({ before: thread.dataset.nextCursor }).then(data => {
+                        list.insertAdjacentHTML('beforeend', data.html);
+                        thread.dataset.nextCursor = data.next_cursor || '';
+                        if (!data.has_more) loadOlder.remove();
+                    });
+                });
+            }
+
+        });
+
+        // New messages pushed by the stream opened in base.html
+        document.addEventListener('messages:new', function(e) {
+            const message = e.detail;
+            if (message.property_id !== Number(document.querySelector('.property-header').dataset.propertyId)) return;
+            const thread = document.querySelector(`.message-thread[data-tenant-id="${message.tenant_id}"]`);
+            if (!thread || message.id <= Number(thread.dataset.latestId)) return;
+            e.preventDefault();
+            thread.querySelector('.messages-list').insertAdjacentHTML('afterbegin', message.html);
+            thread.dataset.latestId = message.id;
+            const empty = thread.querySelector('.no-messages');
+            if (empty) empty.remove();
+        });
+
+        // Auto-resize textarea
+        const messageTextarea = document.querySelector('textarea[name="message_text"]');
+        if (messageTextarea) {
+            messageTextarea.addEventListener('input', function() {
+                this.style.height = 'auto';
+                this.style.height = (this.scrollHeight) + 'px';
+            });
+        }
+    });
+    document.addEventListener('DOMContentLoaded', function() {
+    // Favorite button functionality
+    const favoriteBtn = document.getElementById('favoriteBtn');
+    if (favoriteBtn) {
+        favoriteBtn.addEventListener('click', function() {
+            const icon = this.querySelector('i');
+            if (icon.classList.contains('far')) {
+                icon.classList.remove('far');
+                icon.classList.add('fas');
+                this.innerHTML = '<i class="fas fa-heart me-2"></i>Saved to Favorites';
+                this.classList.remove('btn-outline-primary');
+                this.classList.add('btn-primary');
+                showToast('Property added to favorites!');
+            } else {
+                icon.classList.remove('fas');
+                icon.classList.add('far');
+                this.innerHTML = '<i class="far fa-heart me-2"></i>Save to Favorites';
+                this.classList.remove('btn-primary');
+                this.classList.add('btn-outline-primary');
+                showToast('Property removed from favorites!');
+            }
+        });
+    }
+
+    // Share button functionality
+    const shareBtn = document.getElementById('shareBtn');
+    if (shareBtn) {
+        shareBtn.addEventListener('click', function() {
+            if (navigator.share) {
+                const title = document.querySelector('.property-header').dataset.propertyTitle;
+                navigator.share({
+                    title: title,
+                    text: `Check out this property: ${title}`,
+                    url: window.location.href
+                });
+            } else {
+                // Fallback: copy to clipboard
+                navigator.clipboard.writeText(window.location.href);
+                showToast('Link copied to clipboard!');
+            }
+        });
+    }
+
+    function showToast(message) {
+        // Your existing toast function
+        const toast = document.createElement('div');
+        toast.className = 'position-fixed bottom-0 end-0 p-3';
+        toast.style.zIndex = '1050';
+        toast.innerHTML = `
+            <div class="toast show" role="alert">
+                <div class="toast-header">
+                    <i class="fas fa-info-circle text-primary me-2"></i>
+                    <strong class="me-auto">Notification</strong>
+                    <button type="button" class="btn-close" data-bs-dismiss="toast"></button>
+                </div>
+                <div class="toast-body">${message}</div>
+            </div>
+        `;
+        document.body.appendChild(toast);
+
+        setTimeout(() => {
+            toast.remove();
+        }, 3000);
+    }
+});
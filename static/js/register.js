@@ -0,0 +1,191 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // User type selection
+    const renterCard = document.getElementById('renterCard');
+    const ownerCard = document.getElementById('ownerCard');
+    const isOwnerInput = document.getElementById('isOwnerInput');
+
+    renterCard.addEventListener('click', function() {
+        renterCard.classList.add('selected');
+        ownerCard.classList.remove('selected');
+        isOwnerInput.checked = false;
+    });
+
+    ownerCard.addEventListener('click', function() {
+        ownerCard.classList.add('selected');
+        renterCard.classList.remove('selected');
+        isOwnerInput.checked = true;
+    });
+
+    // Default selection
+    renterCard.classList.add('selected');
+
+    // Password visibility toggle
+    const togglePassword = document.getElementById('togglePassword');
+    const passwordInput = document.getElementById('password');
+
+    togglePassword.addEventListener('click', function() {
+        const type = passwordInput.getAttribute('type') === 'password' ? 'text' : 'password';
+        passwordInput.setAttribute('type', type);
+        this.innerHTML = type === 'password' ? '<i class="fas fa-eye"></i>' : '<i class="fas fa-eye-slash"></i>';
+    });
+
+    // Password strength indicator
+    passwordInput.addEventListener('input', function() {
+        const password = this.value;
+        const strengthBar = document.getElementById('passwordStrength');
+        const hints = {
+            length: document.getElementById('lengthHint'),
+            uppercase: document.getElementById('uppercaseHint'),
+            lowercase: document.getElementById('lowercaseHint'),
+            number: document.getElementById('numberHint'),
+            special: document.getElementById('specialHint')
+        };
+
+        // Reset classes
+        strengthBar.className = 'password-strength-bar';
+        Object.values(hints).forEach(hint => hint.classList.remove('valid'));
+
+        let strength = 0;
+
+        // Check password criteria
+        if (password.length >= 8) {
+            strength += 1;
+            hints.length.classList.add('valid');
+        }
+
+        if (/[A-Z]/.test(password)) {
+            strength += 1;
+            hints.uppercase.classList.add('valid');
+        }
+
+        if (/[a-z]/.test(password)) {
+            strength += 1;
+            hints.lowercase.classList.add('valid');
+        }
+
+        if (/[0-9]/.test(password)) {
+            strength += 1;
+            hints.number.classList.add('valid');
+        }
+
+        if (/[^A-Za-z0-9]/.test(password)) {
+            strength += 1;
+            hints.special.classList.add('valid');
+        }
+
+        // Update strength bar
+        if (strength === 0) {
+            strengthBar.style.width = '0';
+        } else if (strength <= 2) {
+            strengthBar.classList.add('strength-weak');
+        } else if (strength === 3) {
+            strengthBar.classList.add('strength-fair');
+        } else if (strength === 4) {
+            strengthBar.classList.add('strength-good');
+        } else {
+            strengthBar.classList.add('strength-strong');
+        }
+
+        // Check password confirmation
+        checkPasswordMatch();
+    });
+
+    // Password confirmation check
+    const confirmInput = document.getElementById('confirmPassword');
+
+    confirmInput.addEventListener('input', checkPasswordMatch);
+
+    function checkPasswordMatch() {
+        const password = passwordInput.value;
+        const confirm = confirmInput.value;
+        const confirmValid = document.getElementById('confirmValid');
+        const confirmInvalid = document.getElementById('confirmInvalid');
+
+        if (confirm === '') {
+            confirmValid.style.display = 'none';
+            confirmInvalid.style.display = 'none';
+        } else if (password === confirm) {
+            confirmValid.style.display = 'block';
+            confirmInvalid.style.display = 'none';
+        } else {
+            confirmValid.style.display = 'none';
+            confirmInvalid.style.display = 'block';
+        }
+    }
+
+    // Form validation
+    const form = document.getElementById('registerForm');
+    const submitBtn = document.getElementById('submitBtn');
+
+    form.addEventListener('submit', function(e) {
+        let isValid = true;
+
+        // Check required fields
+        const requiredFields = form.querySelectorAll('[required]');
+        requiredFields.forEach(field => {
+            if (!field.value.trim()) {
+                isValid = false;
+                field.classList.add('is-invalid');
+            } else {
+                field.classList.remove('is-invalid');
+            }
+        });
+
+        // Check password match
+        if (passwordInput.value !== confirmInput.value) {
+            isValid = false;
+            confirmInput.classList.add('is-invalid');
+        } else {
+            confirmInput.classList.remove('is-invalid');
+        }
+
+        // Check terms agreement
+        const agreeTerms = document.getElementById('agreeTerms');
+        if (!agreeTerms.checked) {
+            isValid = false;
+            agreeTerms.classList.add('is-invalid');
+        } else {
+            agreeTerms.classList.remove('is-invalid');
+        }
+
+        if (!isValid) {
+            e.preventDefault();
+            alert('Please fill in all required fields correctly and agree to the terms.');
+        }
+    });
+
+    // Real-time validation for name and email
+    const nameInput = document.querySelector('input[name="name"]');
+    const emailInput = document.querySelector('input[name="email"]');
+
+    nameInput.addEventListener('input', function() {
+        const nameValid = document.getElementById('nameValid');
+        const nameInvalid = document.getElementById('nameInvalid');
+
+        if (this.value.trim().length >= 2) {
+            nameValid.style.display = 'block';
+            nameInvalid.style.display = 'none';
+            this.classList.remove('is-invalid');
+        } else {
+            nameValid.style.display = 'none';
+            nameInvalid.style.display = 'block';
+            this.classList.add('is-invalid');
+        }
+    });
+
+    emailInput.addEventListener('input', function() {
+        const emailValid = document.getElementById('emailValid');
+        const emailInvalid = document.getElementById('emailInvalid');
+        const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+
+        if (emailRegex.test(this.value)) {
+            emailValid.style.display = 'block';
+            emailInvalid.style.display = 'none';
+            this.classList.remove('is-invalid');
+        } else {
+            emailValid.style.display = 'none';
+            emailInvalid.style.display = 'block';
+            this.classList.add('is-invalid');
+        }
+    });
+});
@@ -0,0 +1,115 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.getElementById('resetPasswordForm');
+    const submitBtn = form.querySelector('button[type="submit"]');
+
+    // Password visibility toggle
+    const togglePassword = document.getElementById('togglePassword');
+    const passwordInput = document.getElementById('password');
+
+    togglePassword.addEventListener('click', function() {
+        const type = passwordInput.getAttribute('type') === 'password' ? 'text' : 'password';
+        passwordInput.setAttribute('type', type);
+        this.innerHTML = type === 'password' ? '<i class="fas fa-eye"></i>' : '<i class="fas fa-eye-slash"></i>';
+    });
+
+    // Password strength indicator
+    passwordInput.addEventListener('input', function() {
+        const password = this.value;
+        const strengthBar = document.getElementById('passwordStrength');
+        const hints = {
+            length: document.getElementById('lengthHint'),
+            uppercase: document.getElementById('uppercaseHint'),
+            lowercase: document.getElementById('lowercaseHint'),
+            number: document.getElementById('numberHint'),
+            special: document.getElementById('specialHint')
+        };
+
+        // Reset classes
+        strengthBar.className = 'password-strength-bar';
+        Object.values(hints).forEach(hint => hint.classList.remove('valid'));
+
+        let strength = 0;
+
+        // Check password criteria
+        if (password.length >= 8) {
+            strength += 1;
+            hints.length.classList.add('valid');
+        }
+
+        if (/[A-Z]/.test(password)) {
+            strength += 1;
+            hints.uppercase.classList.add('valid');
+        }
+
+        if (/[a-z]/.test(password)) {
+            strength += 1;
+            hints.lowercase.classList.add('valid');
+        }
+
+        if (/[0-9]/.test(password)) {
+            strength += 1;
+            hints.number.classList.add('valid');
+        }
+
+        if (/[^A-Za-z0-9]/.test(password)) {
+            strength += 1;
+            hints.special.classList.add('valid');
+        }
+
+        // Update strength bar
+        if (strength === 0) {
+            strengthBar.style.width = '0';
+        } else if (strength <= 2) {
+            strengthBar.classList.add('strength-weak');
+        } else if (strength === 3) {
+            strengthBar.classList.add('strength-fair');
+        } else if (strength === 4) {
+            strengthBar.classList.add('strength-good');
+        } else {
+            strengthBar.classList.add('strength-strong');
+        }
+
+        // Check password confirmation
+        checkPasswordMatch();
+    });
+
+    // Password confirmation check
+    const confirmInput = document.getElementById('confirmPassword');
+
+    confirmInput.addEventListener('input', checkPasswordMatch);
+
+    function checkPasswordMatch() {
+        const password = passwordInput.value;
+        const confirm = confirmInput.value;
+        const confirmValid = document.getElementById('confirmValid');
+        const confirmInvalid = document.getElementById('confirmInvalid');
+
+        if (confirm === '') {
+            confirmValid.style.display = 'none';
+            confirmInvalid.style.display = 'none';
+        } else if (password === confirm) {
+            confirmValid.style.display = 'block';
+            confirmInvalid.style.display = 'none';
+            confirmInput.classList.remove('is-invalid');
+            confirmInput.classList.add('is-valid');
+        } else {
+            confirmValid.style.display = 'none';
+            confirmInvalid.style.display = 'block';
+            confirmInput.classList.remove('is-valid');
+            confirmInput.classList.add('is-invalid');
+        }
+    }
+
+    form.addEventListener('submit', function(e) {
+        // Check password match
+        if (passwordInput.value !== confirmInput.value) {
+            e.preventDefault();
+            alert('Passwords do not match. Please check your confirmation password.');
+            return;
+        }
+
+        // Add loading state
+        submitBtn.disabled = true;
+        submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin me-2"></i> Resetting...';
+    });
+});
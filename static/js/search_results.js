@@ -0,0 +1,82 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Toggle filters visibility
+    const filterToggle = document.getElementById('filterToggle');
+    const searchFilters = document.getElementById('searchFilters');
+
+    filterToggle.addEventListener('click', function() {
+        searchFilters.style.display = searchFilters.style.display === 'none' ? 'block' : 'none';
+    });
+
+    // Sort functionality
+    const sortSelect = document.getElementById('sortSelect');
+    sortSelect.addEventListener('change', function() {
+        // In a real implementation, this would submit a form or make an API call
+        // For now, we'll just show a loading state
+        const propertyCards = document.querySelectorAll('.property-card');
+        propertyCards.forEach(card => {
+            card.style.opacity = '0.5';
+        });
+
+        setTimeout(() => {
+            propertyCards.forEach(card => {
+                card.style.opacity = '1';
+            });
+        }, 500);
+    });
+
+    // Favorite button functionality
+    const favoriteButtons = document.querySelectorAll('.btn-action.favorite');
+    favoriteButtons.forEach(btn => {
+        btn.addEventListener('click', function() {
+            const icon = this.querySelector('i');
+            if (icon.classList.contains('far')) {
+                icon.classList.remove('far');
+                icon.classList.add('fas');
+                this.style.background = 'rgba(231, 76, 60, 1)';
+                // Show success message
+                showToast('Property added to favorites!');
+            } else {
+                icon.classList.remove('fas');
+                icon.classList.add('far');
+                this.style.background = 'rgba(231, 76, 60, 0.9)';
+                // Show remove message
+                showToast('Property removed from favorites!');
+            }
+        });
+    });
+
+    // Add animation to property cards
+    const propertyCards = document.querySelectorAll('.property-card');
+    propertyCards.forEach((card, index) => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(20px)';
+
+        setTimeout(() => {
+            card.style.transition = 'all 0.5s ease';
+            card.style.opacity = '1';
+            card.style.transform = 'translateY(0)';
+        }, index * 100);
+    });
+
+    // Toast notification function
+    function showToast(message) {
+        const toast = document.createElement('div');
+        toast.className = 'position-fixed bottom-0 end-0 p-3';
+        toast.style.zIndex = '1050';
+        toast.innerHTML = `
+            <div class="toast show" role="alert">
+                <div class="toast-header">
+                    <i class="fas fa-info-circle text-primary me-2"></i>
+                    <strong class="me-auto">Notification</strong>
+                    <button type="button" class="btn-close" data-bs-dismiss="toast"></button>
+                </div>
+                <div class="toast-body">${message}</div>
+            </div>
+        `;
+        document.body.appendChild(toast);
+
+        setTimeout(() => {
+            toast.remove();
+        }, 3000);
+    }
+});
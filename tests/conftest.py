@@ -0,0 +1,72 @@
+import pytest
+
+from app import create_app
+from config import Config
+from models import db, User, Property
+
+
+class TestConfig(Config):
+    TESTING = True
+    SECRET_KEY = 'test'
+    WTF_CSRF_ENABLED = False
+    LISTING_CACHE = 'none'
+    IMAGE_PROCESSING = 'sync'
+    VIEW_TRACKING = 'off'
+    PASSWORD_HASHING = 'inline'
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    METRICS_ENABLED = False
+    TEMPLATE_CACHE_DIR = ''
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Build an app on a fresh SQLite database in tmp_path; keyword arguments override TestConfig."""
+    def make(commands=False, **overrides):
+        settings = {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+            'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+            'UPLOAD_STAGING_FOLDER': str(tmp_path / 'uploads' / 'staging'),
+            **overrides,
+        }
+        app = create_app(type('Config', (TestConfig,), settings), commands=commands)
+        with app.app_context():
+            db.create_all()
+        return app
+    return make
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+def add_owner(email='owner@example.com'):
+    owner = User(name='Owner', email=email, password='x', is_owner=True)
+    db.session.add(owner)
+    db.session.commit()
+    return owner
+
+
+def add_listings(owner, count, **fields):
+    """Add count listings for owner (indexed for search); returns them."""
+    from geo_index import index_location
+    from search_index import index_property
+
+    props = []
+    for i in range(count):
+        values = {'title': f'Sunny 2BHK flat {i}', 'description': 'Close to the station and the market.',
+                  'location': 'Kondhwa, Pune', 'rent': 10000 + i, 'property_type': '2BHK', **fields}
+        prop = Property(owner_id=owner.id, **values)
+        db.session.add(prop)
+        db.session.flush()
+        index_property(prop)
+        index_location(prop)
+        props.append(prop)
+    db.session.commit()
+    return props
+
+
+def log_in(client, user_id):
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
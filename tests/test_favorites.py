@@ -0,0 +1,98 @@
+import pytest
+
+from favorites import favorite_ids
+from models import db, Favorite, Property
+from tests.conftest import add_listings, add_owner, log_in
+
+
+@pytest.fixture
+def setup(make_app):
+    """An app with the memory listing cache, an owner's three listings and a client logged in as the owner."""
+    def build(**overrides):
+        app = make_app(LISTING_CACHE='memory', **overrides)
+        with app.app_context():
+            owner = add_owner()
+            ids = [prop.id for prop in add_listings(owner, 3)]
+            owner_id = owner.id
+        client = app.test_client()
+        log_in(client, owner_id)
+        return app, client, owner_id, ids
+    return build
+
+
+def toggle(client, prop_id, action):
+    return client.post('/favorites/toggle', data={'property_id': prop_id, 'action': action}).get_json()
+
+
+def batch(client, *operations):
+    response = client.post('/favorites/batch', json={'operations': [
+        {'property_id': prop_id, 'action': action} for prop_id, action in operations]})
+    return response.status_code, response.get_json()
+
+
+def favorite_count(app, prop_id):
+    with app.app_context():
+        return db.session.get(Property, prop_id).favorite_count
+
+
+def test_adding_a_favorite_twice_inserts_it_once(setup):
+    app, client, owner_id, ids = setup()
+    assert toggle(client, ids[0], 'add') == {'success': True, 'action': 'added'}
+    assert toggle(client, ids[0], 'add') == {'success': True, 'action': 'no_change'}
+    with app.app_context():
+        assert Favorite.query.filter_by(user_id=owner_id, property_id=ids[0]).count() == 1
+    assert favorite_count(app, ids[0]) == 1
+
+
+def test_removing_a_missing_favorite_changes_nothing(setup):
+    app, client, owner_id, ids = setup()
+    assert toggle(client, ids[0], 'remove') == {'success': True, 'action': 'no_change'}
+    assert favorite_count(app, ids[0]) == 0
+
+
+def test_adding_an_unknown_property_is_not_found(setup):
+    app, client, owner_id, ids = setup()
+    assert toggle(client, max(ids) + 1, 'add') == {'success': False, 'error': 'Property not found'}
+    status, body = batch(client, (max(ids) + 1, 'add'))
+    assert status == 200 and (body['added'], body['favorites']) == (0, [])
+
+
+def test_mixed_batch(setup):
+    app, client, owner_id, ids = setup()
+    toggle(client, ids[0], 'add')
+    status, body = batch(client, (ids[0], 'remove'), (ids[1], 'add'), (ids[2], 'add'), (ids[2], 'remove'),
+                         (ids[1], 'add'), (max(ids) + 1, 'add'))
+    # The last operation on a property wins
+    assert status == 200
+    assert (body['added'], body['removed'], body['favorites']) == (1, 1, [ids[1]])
+    assert [favorite_count(app, prop_id) for prop_id in ids] == [0, 1, 0]
+
+    status, body = batch(client, (ids[0], 'like'))
+    assert status == 400 and not body['success']
+
+
+def test_toggle_invalidates_cached_favorites(setup):
+    app, client, owner_id, ids = setup()
+    with app.test_request_context():
+        assert favorite_ids(owner_id) == set()
+    toggle(client, ids[0], 'add')
+    with app.test_request_context():
+        assert favorite_ids(owner_id) == {ids[0]}
+    toggle(client, ids[0], 'remove')
+    with app.test_request_context():
+        assert favorite_ids(owner_id) == set()
+
+
+def test_stale_cache_in_another_worker(setup, make_app):
+    app, client, owner_id, ids = setup()
+    # A second app on the same database stands in for another gunicorn worker
+    other = make_app(LISTING_CACHE='memory')
+    with other.test_request_context():
+        assert favorite_ids(owner_id) == set()
+    toggle(client, ids[0], 'add')
+
+    other_client = other.test_client()
+    log_in(other_client, owner_id)
+    assert toggle(other_client, ids[0], 'add') == {'success': True, 'action': 'no_change'}
+    status, body = batch(other_client, (ids[1], 'remove'))
+    assert body['favorites'] == [ids[0]]
@@ -0,0 +1,65 @@
+from message_events import get_broker, user_channel
+from models import db, Message, User
+from tests.conftest import add_listings, add_owner, log_in
+
+
+def test_pushed_messages_are_rendered_for_each_recipient(app):
+    with app.app_context():
+        owner = add_owner()
+        tenant = User(name='Tenant', email='tenant@example.com', password='x')
+        db.session.add(tenant)
+        db.session.commit()
+        owner_id, tenant_id = owner.id, tenant.id
+        prop_id = add_listings(owner, 1)[0].id
+
+        broker = get_broker()
+        to_owner = broker.subscribe(user_channel(owner_id))
+        to_tenant = broker.subscribe(user_channel(tenant_id))
+        client = app.test_client()
+        log_in(client, tenant_id)
+        response = client.post(f'/property/{prop_id}', data={'message_text': 'Is it still available?'})
+        assert response.status_code == 302
+
+        owner_event, tenant_event = to_owner.get(timeout=1), to_tenant.get(timeout=1)
+        to_owner.close()
+        to_tenant.close()
+    assert owner_event['text'] == tenant_event['text'] == 'Is it still available?'
+    # Only the owner sees the message flagged as new, although the tenant sent it
+    assert 'New</span>' in owner_event['html']
+    assert 'New</span>' not in tenant_event['html']
+
+
+def test_owner_only_reads_the_messages_shown(make_app):
+    app = make_app(MESSAGES_PER_PAGE=2)
+    with app.app_context():
+        owner = add_owner()
+        tenants = [User(name=f'Tenant {i}', email=f'tenant{i}@example.com', password='x') for i in range(2)]
+        db.session.add_all(tenants)
+        db.session.commit()
+        owner_id, tenant_ids = owner.id, [tenant.id for tenant in tenants]
+        prop_id = add_listings(owner, 1)[0].id
+
+    for tenant_id in tenant_ids:
+        client = app.test_client()
+        log_in(client, tenant_id)
+        for i in range(3):
+            client.post(f'/property/{prop_id}', data={'message_text': f'Message {i}'})
+
+    def unread():
+        with app.app_context():
+            return sorted((m.tenant_id, m.message_text) for m in Message.query.filter(Message.read_at.is_(None)))
+
+    owner_client = app.test_client()
+    log_in(owner_client, owner_id)
+    page = owner_client.get(f'/property/{prop_id}')
+    assert page.status_code == 200
+    # Each thread shows its latest two; the first tenant's messages all have
+    # lower ids than the second's, but their oldest one was not shown either
+    assert unread() == [(tenant_ids[0], 'Message 0'), (tenant_ids[1], 'Message 0')]
+
+    thread = owner_client.get(f'/property/{prop_id}/messages', query_string={'tenant': tenant_ids[0]}).get_json()
+    older = owner_client.get(f'/property/{prop_id}/messages',
+                             query_string={'tenant': tenant_ids[0], 'before': thread['next_cursor']}).get_json()
+    assert [m['text'] for m in older['messages']] == ['Message 0']
+    assert 'New</span>' in older['html']
+    assert unread() == [(tenant_ids[1], 'Message 0')]
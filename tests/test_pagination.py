@@ -0,0 +1,75 @@
+import pytest
+
+from pagination import decode_cursor, encode_cursor, sort_keys
+from tests.conftest import add_listings, add_owner, log_in
+
+
+@pytest.fixture
+def client(app):
+    with app.app_context():
+        owner = add_owner()
+        # Nine listings over three rents, so rent_low has ties to break on id
+        for rent in (15000, 10000, 20000):
+            add_listings(owner, 3, rent=rent)
+        owner_id = owner.id
+    client = app.test_client()
+    log_in(client, owner_id)
+    return client
+
+
+def walk(client, sort, limit=2):
+    """Follow next_cursor from the first page of /home; returns [(rent, id)] of every listing seen."""
+    seen, cursor = [], None
+    while True:
+        params = {'format': 'json', 'sort': sort, 'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        body = client.get('/home', query_string=params).get_json()
+        seen += [(p['rent'], p['id']) for p in body['properties']]
+        cursor = body['next_cursor']
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize('sort', ['rent_low', 'rent_high', 'newest', 'oldest', 'popular'])
+def test_cursor_pages_cover_every_listing_once(client, sort):
+    seen = walk(client, sort)
+    assert len(seen) == len(set(seen)) == 9
+    if sort == 'rent_low':
+        # Equal rents come out in id order, across page boundaries
+        assert seen == sorted(seen)
+    if sort == 'rent_high':
+        assert seen == sorted(seen, reverse=True)
+
+
+def test_cursor_round_trip(app):
+    keys = sort_keys('rent_low')
+    token = encode_cursor('rent_low', [12000.5, 7])
+    assert decode_cursor(token, 'rent_low', keys) == [12000.5, 7]
+    # Integral rents come back as ints from JSON and still match a float key
+    assert decode_cursor(encode_cursor('rent_low', [12000, 7]), 'rent_low', keys) == [12000, 7]
+
+
+def test_cursor_for_another_sort_is_ignored(app):
+    token = encode_cursor('rent_low', [12000.0, 7])
+    assert decode_cursor(token, 'rent_high', sort_keys('rent_high')) is None
+
+
+@pytest.mark.parametrize('sort, values', [
+    ('rent_low', ['12000', 7]),
+    ('rent_low', [12000.0, '7']),
+    ('rent_low', [12000.0, None]),
+    ('rent_low', [True, 7]),
+    ('rent_low', [12000.0]),
+    ('newest', [12000.0, 7]),
+    ('newest', [{'not': 'a date'}, 7]),
+])
+def test_tampered_cursor_is_rejected(client, sort, values):
+    token = encode_cursor(sort, values)
+    assert decode_cursor(token, sort, sort_keys(sort)) is None
+    assert decode_cursor('not-a-cursor!', sort, sort_keys(sort)) is None
+    # The page ignores it and starts from the beginning instead of failing
+    response = client.get('/home', query_string={'format': 'json', 'sort': sort, 'limit': 2, 'cursor': token})
+    assert response.status_code == 200
+    first = client.get('/home', query_string={'format': 'json', 'sort': sort, 'limit': 2}).get_json()
+    assert response.get_json()['properties'] == first['properties']
@@ -0,0 +1,54 @@
+import pytest
+
+import listings
+from models import db, Favorite, Property, PropertyImage
+from tests.conftest import add_listings, add_owner
+
+
+@pytest.fixture
+def seeded_app(make_app):
+    app = make_app(commands=True)
+    with app.app_context():
+        owner = add_owner()
+        props = add_listings(owner, 2 * app.config['LISTING_QUERY_BUDGET'] + 1, title='Sunny flat near the park')
+        for prop in props:
+            db.session.add(PropertyImage(property_id=prop.id, filename=f'{prop.id}.jpg'))
+            db.session.add(Favorite(user_id=owner.id, property_id=prop.id))
+        db.session.commit()
+        db.session.remove()
+    return app
+
+
+def check_query_budget(app):
+    return app.test_cli_runner().invoke(args=['check-query-budget'])
+
+
+def test_listing_pages_are_within_budget(seeded_app):
+    result = check_query_budget(seeded_app)
+    assert result.exit_code == 0, result.output
+    assert 'GROWS WITH CARDS' not in result.output
+
+
+def test_lazy_loaded_cards_fail_the_check(seeded_app, monkeypatch):
+    # Without eager loading every card lazy-loads its owner and images
+    monkeypatch.setattr(listings, 'listing_query', lambda: Property.query)
+    result = check_query_budget(seeded_app)
+    assert result.exit_code == 1
+    assert 'GROWS WITH CARDS' in result.output or 'OVER BUDGET' in result.output
+
+
+def test_error_pages_fail_the_check(seeded_app):
+    seeded_app.view_functions['favorites.favorites'] = lambda: ('gone', 404)
+    result = check_query_budget(seeded_app)
+    assert result.exit_code == 1
+    assert 'BAD STATUS' in result.output
+
+
+def test_too_few_listings_to_measure(make_app):
+    app = make_app(commands=True)
+    with app.app_context():
+        add_listings(add_owner(), 3)
+        db.session.remove()
+    result = check_query_budget(app)
+    assert result.exit_code == 1
+    assert 'Needs at least' in result.output
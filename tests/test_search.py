@@ -0,0 +1,86 @@
+import pytest
+
+from models import db, Property
+from search_index import get_search_index, index_property, unindex_property
+from tests.conftest import add_listings, add_owner
+
+
+@pytest.fixture(params=['fts5', 'memory'])
+def search_app(make_app, request):
+    app = make_app(SEARCH_BACKEND=request.param)
+    with app.app_context():
+        owner = add_owner()
+        add_listings(owner, 3)
+        add_listings(owner, 1, title='Spacious villa with garden', property_type='Villa', location='Baner, Pune')
+        db.session.remove()
+    return app
+
+
+def search_titles(app, q, **args):
+    response = app.test_client().get('/search', query_string={'q': q, 'format': 'json', **args})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_search_matches_word_prefixes(search_app):
+    assert [p['title'] for p in search_titles(search_app, 'vill')['properties']] == ['Spacious villa with garden']
+
+
+def test_search_falls_back_to_substrings(search_app):
+    # "bhk" starts no indexed word ("2bhk" does), but the title contains it
+    titles = [p['title'] for p in search_titles(search_app, 'bhk')['properties']]
+    assert sorted(titles) == ['Sunny 2BHK flat 0', 'Sunny 2BHK flat 1', 'Sunny 2BHK flat 2']
+
+
+def test_search_pages_by_relevance(search_app):
+    first = search_titles(search_app, 'sunny', limit=2)
+    assert len(first['properties']) == 2 and first['has_more']
+    second = search_titles(search_app, 'sunny', limit=2, cursor=first['next_cursor'])
+    seen = [p['id'] for p in first['properties'] + second['properties']]
+    assert len(seen) == len(set(seen)) == 3 and not second['has_more']
+
+
+def test_facets_use_the_same_fallback(search_app):
+    response = search_app.test_client().get('/search/facets', query_string={'q': 'bhk'})
+    assert response.status_code == 200
+    assert response.get_json()['types'] == {'2BHK': 3}
+
+
+def test_memory_backend_caps_hits(make_app):
+    app = make_app(SEARCH_BACKEND='memory', SEARCH_MAX_HITS=2)
+    with app.app_context():
+        add_listings(add_owner(), 5)
+        db.session.remove()
+    assert len(search_titles(app, 'sunny')['properties']) == 2
+
+
+def test_memory_index_follows_commits_and_rollbacks(make_app):
+    app = make_app(SEARCH_BACKEND='memory')
+    with app.app_context():
+        owner = add_owner()
+        index = get_search_index()
+        villa = add_listings(owner, 1, title='Villa with garden')[0]
+        villa_id = villa.id
+        assert [prop_id for prop_id, _ in index.search('villa')] == [villa_id]
+
+        # A rolled back add, edit or delete leaves the index as the database has it
+        prop = Property(owner_id=owner.id, title='Lakeside villa', description='', location='Pune',
+                        rent=20000, property_type='Villa')
+        db.session.add(prop)
+        db.session.flush()
+        index_property(prop)
+        villa.title = 'Bungalow with garden'
+        index_property(villa)
+        db.session.rollback()
+        assert [prop_id for prop_id, _ in index.search('villa')] == [villa_id]
+        assert index.search('bungalow') == []
+
+        unindex_property(villa_id)
+        db.session.delete(db.session.get(Property, villa_id))
+        db.session.rollback()
+        assert [prop_id for prop_id, _ in index.search('villa')] == [villa_id]
+
+        unindex_property(villa_id)
+        db.session.delete(db.session.get(Property, villa_id))
+        db.session.commit()
+        assert index.search('villa') == []
@@ -0,0 +1,185 @@
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import uuid
+from collections import defaultdict
+from urllib.parse import quote
+
+from flask import abort, current_app, request
+from sqlalchemy import func
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+
+from instrumentation import log
+from models import db, PropertyImage, variant_filenames
+
+CHUNK_SIZE = 64 * 1024
+
+# Uploads are named after the SHA-256 of their bytes: "<64 hex digits>.<ext>",
+# and their variants "<64 hex digits>.<variant>.<ext>"
+CONTENT_ADDRESSED_RE = re.compile(r'^[0-9a-f]{64}\.')
+VARIANT_RE = re.compile(r'^(?P<stem>.+)\.(?P<variant>thumb|card|full)\.(?P<ext>\w+)$')
+
+
+def stream_to_staging(file_storage):
+    """Copy an upload into the staging folder while hashing it.
+
+    Returns (sha256 hex digest, temporary path). Nothing is buffered in memory
+    beyond one chunk, and concurrent uploads never share a temporary file.
+    """
+    folder = current_app.config['UPLOAD_STAGING_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    temp_path = os.path.join(folder, f".upload-{uuid.uuid4().hex}")
+    digest = hashlib.sha256()
+    with open(temp_path, 'wb') as out:
+        while True:
+            chunk = file_storage.stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest(), temp_path
+
+
+def send_upload(filename):
+    """Serve a stored upload with long-lived, immutable caching.
+
+    Stored files are never rewritten under the same name, so they get
+    `Cache-Control: public, max-age=UPLOADS_MAX_AGE, immutable` and a strong
+    ETag (the content hash for content-addressed files). Conditional and Range
+    requests are answered with 304/206. With UPLOADS_SENDFILE set only the
+    headers are produced here and the front proxy streams the bytes.
+    """
+    path = safe_join(current_app.config['UPLOAD_FOLDER'], filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    mode = current_app.config['UPLOADS_SENDFILE']
+    # Content-addressed names already identify their bytes; tag legacy files by mtime/size
+    etag = filename if CONTENT_ADDRESSED_RE.match(filename) else True
+
+    if mode:
+        # Leave the body, and Range requests, to the proxy
+        response = current_app.response_class(
+            mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        if mode == 'x-accel-redirect':
+            response.headers['X-Accel-Redirect'] = current_app.config['UPLOADS_ACCEL_PREFIX'] + quote(filename)
+        else:
+            response.headers['X-Sendfile'] = path
+        stat = os.stat(path)
+        response.set_etag(f"{stat.st_mtime}-{stat.st_size}" if etag is True else etag)
+        response.last_modified = stat.st_mtime
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config['UPLOADS_MAX_AGE']
+        response = response.make_conditional(request)
+    else:
+        response = send_file(path, request.environ, etag=etag, conditional=True,
+                             max_age=current_app.config['UPLOADS_MAX_AGE'])
+    response.cache_control.immutable = True
+    return response
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def reference_count(filename):
+    """Number of PropertyImage rows sharing a stored file."""
+    return db.session.query(func.count(PropertyImage.id)).filter(PropertyImage.filename == filename).scalar()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def release_files(images):
+    """Delete stored files that no PropertyImage references any more.
+
+    images is a list of (filename, variants) captured before the rows were
+    deleted; call this after the deletion has been committed so a rollback
+    never leaves rows pointing at missing files.
+    """
+    folder = current_app.config['UPLOAD_FOLDER']
+    for filename, variants in images:
+        if reference_count(filename) == 0:
+            for name in variant_filenames(filename, variants):
+                _remove(os.path.join(folder, name))
+            log.info("Deleted image: %s", filename)
+
+
+def dedupe_uploads(dry_run=False):
+    """Collapse byte-identical legacy uploads onto one content-addressed file.
+
+    Every main image in UPLOAD_FOLDER with a legacy "name_timestamp.ext" name
+    is hashed; each group of identical files is reduced to one file named
+    "<sha256>.<ext>" (its variants are renamed with it), PropertyImage rows
+    are pointed at it, and the duplicates and their variants are deleted.
+    Returns a dict of counts describing what was (or would be) done.
+    """
+    folder = current_app.config['UPLOAD_FOLDER']
+    files = sorted(name for name in os.listdir(folder) if os.path.isfile(os.path.join(folder, name)))
+    variants_by_stem = defaultdict(list)
+    groups = defaultdict(list)
+    for name in files:
+        match = VARIANT_RE.match(name)
+        if match:
+            variants_by_stem[match.group('stem')].append(name)
+        elif not CONTENT_ADDRESSED_RE.match(name) and not name.startswith('.'):
+            groups[file_digest(os.path.join(folder, name))].append(name)
+
+    stats = {'files': sum(len(names) for names in groups.values()), 'removed': 0, 'renamed': 0,
+             'rows_updated': 0, 'unreferenced': 0}
+    obsolete = []
+    for digest, names in groups.items():
+        rows = PropertyImage.query.filter(PropertyImage.filename.in_(names)).all()
+        if not rows:
+            stats['unreferenced'] += len(names)
+        # Prefer keeping a file whose variants have already been generated.
+        with_variants = [row.filename for row in rows if row.variants]
+        keeper = with_variants[0] if with_variants else names[0]
+        keeper_variants = next((row.variants for row in rows if row.filename == keeper and row.variants), None)
+        canonical = f"{digest}{os.path.splitext(keeper)[1].lower()}"
+        keeper_stem, canonical_stem = os.path.splitext(keeper)[0], os.path.splitext(canonical)[0]
+
+        stats['renamed'] += 1
+        stats['removed'] += len(names) - 1
+        stats['rows_updated'] += len(rows)
+        if dry_run:
+            continue
+        # Link the keeper (and its variants) under the new name first, repoint
+        # the rows, and only then delete the old names, so an interruption
+        # never leaves a row pointing at a missing file.
+        renames = [(keeper, canonical)] + [
+            (variant, canonical_stem + variant[len(keeper_stem):]) for variant in variants_by_stem.get(keeper_stem, [])
+        ]
+        for old, new in renames:
+            _link(os.path.join(folder, old), os.path.join(folder, new))
+        for row in rows:
+            row.filename = canonical
+            row.variants = keeper_variants
+        for name in names:
+            obsolete.append(name)
+            obsolete.extend(variants_by_stem.get(os.path.splitext(name)[0], []))
+
+    if not dry_run:
+        db.session.commit()
+        for name in obsolete:
+            _remove(os.path.join(folder, name))
+    return stats
+
+
+def _link(source, destination):
+    if os.path.exists(destination):
+        return
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
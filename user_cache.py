@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy.orm import make_transient_to_detached
+
+from listing_cache import get_listing_cache
+from models import db, User
+
+# Columns kept in the cache; the password hash never is
+CACHED_FIELDS = ('name', 'email', 'is_owner', 'created_at')
+
+
+def user_key(user_id):
+    return f"user:{user_id}"
+
+
+def load_cached_user(user_id):
+    """The User for flask_login's user_loader, from the listing cache when possible.
+
+    A hit is attached to the session without a query; anything not cached
+    (the password, relationships) still loads on first access. Entries live
+    USER_CACHE_TTL seconds, so a change to a cached field can take that long
+    to show up.
+    """
+    ttl = current_app.config['USER_CACHE_TTL']
+    if not ttl:
+        return db.session.get(User, user_id)
+    cache = get_listing_cache()
+    fields = cache.get(user_key(user_id))
+    if fields is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            fields = {name: getattr(user, name) for name in CACHED_FIELDS}
+            fields['created_at'] = user.created_at.isoformat() if user.created_at else None
+            cache.set(user_key(user_id), fields, ttl)
+        return user
+    user = db.session.identity_map.get(db.session.identity_key(User, user_id))
+    if user is not None:
+        return user
+    created_at = fields['created_at']
+    user = User(id=user_id, **dict(fields, created_at=datetime.fromisoformat(created_at) if created_at else None))
+    make_transient_to_detached(user)
+    db.session.add(user)
+    return user
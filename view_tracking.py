@@ -0,0 +1,156 @@
+import atexit
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import bindparam, func, insert, update
+
+from instrumentation import log
+from models import db, Property, PropertyViewDaily
+from popularity import POPULARITY_WEIGHTS
+
+
+class ViewBuffer:
+    """Detail page views counted in memory and written to the database in batches.
+
+    Each worker process keeps its own buffer. A background thread flushes it
+    every VIEW_FLUSH_INTERVAL seconds, or sooner once VIEW_FLUSH_SIZE views
+    are waiting, so a crash loses at most one interval's worth. Flushes only
+    ever add to the stored counts, so any number of workers can flush
+    concurrently.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.interval = app.config['VIEW_FLUSH_INTERVAL']
+        self.size = app.config['VIEW_FLUSH_SIZE']
+        self.pid = os.getpid()
+        self._counts = Counter()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='view-flusher', daemon=True)
+        self._thread.start()
+
+    def record(self, prop_id):
+        with self._lock:
+            self._counts[(prop_id, datetime.utcnow().date())] += 1
+            self._pending += 1
+            full = self._pending >= self.size
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write out everything buffered so far; returns the number of views written."""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._pending = 0
+        if not counts:
+            return 0
+        try:
+            with self.app.app_context():
+                write_views(counts)
+        except Exception as e:
+            # Keep the views for the next attempt rather than dropping them
+            log.error("Error flushing view counts: %s", e)
+            with self._lock:
+                self._counts.update(counts)
+                self._pending += sum(counts.values())
+            return 0
+        return sum(counts.values())
+
+    def stop(self):
+        if self.pid != os.getpid():
+            return  # a forked child's copy; the parent flushes its own views
+        self._stopped = True
+        self._wake.set()
+        self.flush()
+
+
+def write_views(counts):
+    """Add {(property_id, day): views} to the daily table and the properties' view counters, in one transaction.
+
+    Views of properties deleted since they were counted are dropped.
+    """
+    prop_ids = {prop_id for prop_id, _ in counts}
+    existing = {prop_id for (prop_id,) in db.session.query(Property.id).filter(Property.id.in_(prop_ids))}
+    rows = [{'property_id': prop_id, 'day': day, 'views': views}
+            for (prop_id, day), views in counts.items() if prop_id in existing]
+    if not rows:
+        return
+
+    dialect = db.session.get_bind().dialect.name
+    table = PropertyViewDaily.__table__
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(index_elements=['property_id', 'day'],
+                                          set_={'views': table.c.views + stmt.excluded.views})
+        db.session.execute(stmt, rows)
+    elif dialect in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        db.session.execute(stmt.on_duplicate_key_update(views=table.c.views + stmt.inserted.views), rows)
+    else:
+        for row in rows:
+            updated = db.session.execute(
+                update(table).where(table.c.property_id == row['property_id'], table.c.day == row['day'])
+                .values(views=table.c.views + row['views'])).rowcount
+            if not updated:
+                db.session.execute(insert(table), [row])
+
+    totals = Counter()
+    for row in rows:
+        totals[row['property_id']] += row['views']
+    properties = Property.__table__
+    db.session.execute(
+        update(properties).where(properties.c.id == bindparam('prop_id'))
+        .values(view_count=properties.c.view_count + bindparam('views'),
+                popularity=properties.c.popularity + POPULARITY_WEIGHTS['view_count'] * bindparam('views')),
+        [{'prop_id': prop_id, 'views': views} for prop_id, views in totals.items()])
+    db.session.commit()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_view_buffer():
+    """Return this process's view buffer, creating it (and its flusher thread) on first use and after a fork."""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None or _buffer.pid != os.getpid():
+            _buffer = ViewBuffer(current_app._get_current_object())
+            atexit.register(_buffer.stop)
+        return _buffer
+
+
+def record_view(prop_id):
+    """Count one detail page view of prop_id ('sync' VIEW_TRACKING writes it straight away)."""
+    if current_app.config['VIEW_TRACKING'] == 'sync':
+        write_views(Counter({(prop_id, datetime.utcnow().date()): 1}))
+    elif current_app.config['VIEW_TRACKING'] == 'buffered':
+        get_view_buffer().record(prop_id)
+
+
+def recent_views(prop_ids, days=7):
+    """{property_id: views over the last `days` days, today included} for prop_ids."""
+    if not prop_ids:
+        return {}
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    rows = (db.session.query(PropertyViewDaily.property_id, func.sum(PropertyViewDaily.views))
+            .filter(PropertyViewDaily.property_id.in_(prop_ids), PropertyViewDaily.day >= since)
+            .group_by(PropertyViewDaily.property_id))
+    return {prop_id: int(views) for prop_id, views in rows}
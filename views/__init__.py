@@ -0,0 +1,8 @@
+"""The app's routes, one blueprint per area; create_app() registers them."""
+
+
+def register_blueprints(app):
+    from views import auth, favorites, listings, messages, pages, uploads
+
+    for module in (pages, auth, listings, favorites, messages, uploads):
+        app.register_blueprint(module.bp)
@@ -0,0 +1,158 @@
+from flask import Blueprint, current_app, flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required, login_user, logout_user
+from itsdangerous import URLSafeTimedSerializer
+
+from favorites import favorite_ids
+from forms import RegisterForm, LoginForm, ForgotPasswordForm, ResetPasswordForm
+from instrumentation import log
+from listings import owner_listings
+from models import db, User
+from passwords import hash_password, verify_password, PasswordHashingBusy
+
+bp = Blueprint('auth', __name__)
+
+
+def reset_serializer():
+    """Serializer for password reset tokens, keyed on SECRET_KEY."""
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
+
+
+@bp.errorhandler(PasswordHashingBusy)
+def password_hashing_busy(error):
+    flash('We are handling a lot of sign-ins right now. Please try again in a moment.', 'warning')
+    return redirect(request.url)
+
+# -------------------------------------------------------
+# Profile Route
+# -------------------------------------------------------
+
+@bp.route('/profile')
+@login_required
+def profile():
+    """User profile page"""
+    # Get user's favorite property IDs
+    user_favorites = set()
+    try:
+        user_favorites = favorite_ids(current_user.id)
+    except Exception as e:
+        log.error("Error getting favorites for profile: %s", e)
+        user_favorites = set()
+
+    # Get user's properties if they are an owner
+    user_properties = []
+    if current_user.is_owner:
+        user_properties = owner_listings(current_user.id).all()
+
+    return render_template('profile.html',
+                         user=current_user,
+                         user_favorites=user_favorites,
+                         user_properties=user_properties)
+
+# -------------------------------------------------------
+# Register
+# -------------------------------------------------------
+@bp.route('/register', methods=['GET','POST'])
+def register():
+    if current_user.is_authenticated:
+        return redirect(url_for('listings.index'))
+    form = RegisterForm()
+    if form.validate_on_submit():
+        existing = User.query.filter_by(email=form.email.data.lower()).first()
+        if existing:
+            flash('Email already registered. Please login.', 'warning')
+            return redirect(url_for('auth.login'))
+        hashed = hash_password(form.password.data)
+        user = User(name=form.name.data, email=form.email.data.lower(), password=hashed, is_owner=form.is_owner.data)
+        db.session.add(user)
+        db.session.commit()
+        flash('Registration successful. Please login.', 'success')
+        return redirect(url_for('auth.login'))
+    return render_template('register.html', form=form)
+
+# -------------------------------------------------------
+# Login
+# -------------------------------------------------------
+@bp.route('/login', methods=['GET','POST'])
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for('listings.index'))
+    form = LoginForm()
+    if form.validate_on_submit():
+        user = User.query.filter_by(email=form.email.data.lower()).first()
+        matches, new_hash = verify_password(user.password, form.password.data) if user else (False, None)
+        if matches:
+            if new_hash:
+                # Stored under an older hashing policy; upgrade it now that we have the password
+                user.password = new_hash
+                db.session.commit()
+            login_user(user, remember=form.remember.data)
+            flash('Logged in successfully.', 'success')
+            return redirect(url_for('listings.index'))
+        flash('Invalid credentials.', 'danger')
+    return render_template('login.html', form=form)
+
+# -------------------------------------------------------
+# Logout
+# -------------------------------------------------------
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash('Logged out.', 'info')
+    return redirect(url_for('auth.login'))
+
+# -------------------------------------------------------
+# FORGOT PASSWORD ROUTES - FIXED
+# -------------------------------------------------------
+
+@bp.route('/forgot-password', methods=['GET', 'POST'])
+def forgot_password():
+    if current_user.is_authenticated:
+        return redirect(url_for('listings.index'))
+
+    form = ForgotPasswordForm()
+    if form.validate_on_submit():  # ✅ FIXED: validate_on_submit (not validate_onSubmit)
+        user = User.query.filter_by(email=form.email.data.lower()).first()
+
+        # For security, always show success message even if email doesn't exist
+        flash('If an account with that email exists, a password reset link has been sent.', 'info')
+
+        if user:
+            # Generate reset token (valid for 1 hour)
+            token = reset_serializer().dumps(user.email, salt='password-reset-salt')
+
+            # In development: show the reset link instead of emailing
+            if current_app.config['DEBUG']:
+                reset_url = url_for('auth.reset_password', token=token, _external=True)
+                flash(f'DEBUG: Reset URL: {reset_url}', 'info')
+
+        return redirect(url_for('auth.login'))
+
+    return render_template('forgot_password.html', form=form)
+
+@bp.route('/reset-password/<token>', methods=['GET', 'POST'])
+def reset_password(token):
+    if current_user.is_authenticated:
+        return redirect(url_for('listings.index'))
+
+    try:
+        # Verify token (valid for 1 hour)
+        email = reset_serializer().loads(token, salt='password-reset-salt', max_age=3600)
+    except:
+        flash('The reset link is invalid or has expired.', 'danger')
+        return redirect(url_for('auth.forgot_password'))
+
+    form = ResetPasswordForm()
+    if form.validate_on_submit():
+        user = User.query.filter_by(email=email).first()
+        if user:
+            # Update password
+            user.password = hash_password(form.password.data)
+            db.session.commit()
+
+            flash('Your password has been updated! You can now log in.', 'success')
+            return redirect(url_for('auth.login'))
+        else:
+            flash('User not found.', 'danger')
+
+    return render_template('reset_password.html', form=form)
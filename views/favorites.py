@@ -0,0 +1,79 @@
+from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+
+from favorites import favorite_ids, apply_favorite_changes, parse_operations
+from instrumentation import log
+from listings import favorite_listings
+from models import db, Property
+
+bp = Blueprint('favorites', __name__)
+
+# -------------------------------------------------------
+# FAVORITES FUNCTIONALITY
+# -------------------------------------------------------
+
+@bp.route('/favorites/toggle', methods=['POST'])
+@login_required
+def toggle_favorite():
+    property_id = request.form.get('property_id')
+    action = request.form.get('action')
+
+    if not property_id:
+        return jsonify({'success': False, 'error': 'Property ID required'})
+
+    try:
+        property_id = int(property_id)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid property ID'})
+
+    if action not in ('add', 'remove'):
+        return jsonify({'success': True, 'action': 'no_change'})
+
+    added, removed = apply_favorite_changes(current_user.id, [(property_id, action)])
+    if added:
+        return jsonify({'success': True, 'action': 'added'})
+    if removed:
+        return jsonify({'success': True, 'action': 'removed'})
+    # Nothing was inserted either because it's already a favorite or because
+    # the property doesn't exist; ask the database, as the cached favorites
+    # may predate a change made through another worker
+    if action == 'add' and db.session.get(Property, property_id) is None:
+        return jsonify({'success': False, 'error': 'Property not found'})
+    return jsonify({'success': True, 'action': 'no_change'})
+
+@bp.route('/favorites/batch', methods=['POST'])
+@login_required
+def batch_favorites():
+    """Apply several favorite changes in one transaction.
+
+    Takes JSON {"operations": [{"property_id": 1, "action": "add"}, ...]} and
+    returns the counts changed plus the user's favorite ids afterwards, read
+    from the database rather than a cache that may be stale.
+    """
+    data = request.get_json(silent=True) or {}
+    operations, error = parse_operations(data.get('operations'))
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+
+    user_id = current_user.id  # read before the commit expires it
+    added, removed = apply_favorite_changes(user_id, operations)
+    return jsonify({'success': True, 'added': added, 'removed': removed,
+                    'favorites': sorted(favorite_ids(user_id, refresh=True))})
+
+@bp.route('/favorites')
+@login_required
+def favorites():
+    """Display user's favorite properties"""
+    try:
+        favorite_properties = favorite_listings(current_user.id).all()
+
+        # Get user's favorite property IDs for the template
+        user_favorite_ids = [p.id for p in favorite_properties]
+
+        return render_template('favorites.html',
+                             properties=favorite_properties,
+                             user_favorites=user_favorite_ids)
+    except Exception as e:
+        log.error("Error in favorites route: %s", e)
+        flash('Error loading favorites.', 'error')
+        return redirect(url_for('listings.index'))
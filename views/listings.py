@@ -0,0 +1,448 @@
+import json
+import zipfile
+
+from flask import (Blueprint, current_app, flash, jsonify, redirect, render_template, request, stream_with_context,
+                   url_for)
+from flask_login import current_user, login_required
+from markupsafe import Markup
+
+from bulk_import import ImageArchive, import_format, import_listings
+from database import read_only
+from facets import cached_facets
+from favorites import favorite_ids, invalidate_favorites
+from forms import PropertyForm, MessageForm
+from geo_index import parse_area, index_location, unindex_location
+from geocoding import set_coordinates
+from image_pipeline import allowed_file, stage_image, submit_images
+from instrumentation import log
+from listing_cache import page_key, cached_page, cached_cards, invalidate_property
+from listings import filtered_listings, owner_listings
+from message_events import publish_message
+from messaging import visible_threads, message_event, owner_inbox, mark_read
+from models import db, Property, PropertyImage, Message as MessageModel, Favorite, PropertyViewDaily
+from pagination import paginate, sort_keys
+from popularity import bump_counters
+from recommendations import similar_listings, refresh_similar, remove_similar
+from search_index import index_property, unindex_property
+from upload_storage import release_files
+from view_tracking import record_view, recent_views
+
+bp = Blueprint('listings', __name__)
+
+# -------------------------------------------------------
+# Listing Pagination Helpers
+# -------------------------------------------------------
+def get_per_page():
+    """Page size for listing pages, overridable with ?limit= up to LISTINGS_MAX_PER_PAGE."""
+    per_page = current_app.config['LISTINGS_PER_PAGE']
+    try:
+        per_page = int(request.args.get('limit', per_page))
+    except ValueError:
+        pass
+    return max(1, min(per_page, current_app.config['LISTINGS_MAX_PER_PAGE']))
+
+def listing_card(template, p):
+    """Rendered card HTML plus the JSON fields for one property; cached until it changes."""
+    first_image = p.get_first_image()
+    return {
+        'html': render_template(template, p=p),
+        'data': {
+            'id': p.id,
+            'title': p.title,
+            'location': p.location,
+            'latitude': p.latitude,
+            'longitude': p.longitude,
+            'rent': p.rent,
+            'property_type': p.property_type,
+            'created_at': p.created_at.isoformat() if p.created_at else None,
+            'owner_name': p.owner.name,
+            'image_url': url_for('uploads.uploaded_file', filename=first_image) if first_image else None,
+            'images_pending': p.has_pending_images(),
+            'url': url_for('listings.property_detail', prop_id=p.id),
+        },
+    }
+
+def render_listing_page(view, template, card_template, rank=False):
+    """Render a page of /home or /search, or just the next batch of cards as JSON for infinite scroll.
+
+    The page's property ids and each rendered card come from the listing
+    cache; only the viewer's favorites are looked up on every request.
+    """
+    q = request.args.get('q', '')
+    min_rent = request.args.get('min_rent')
+    max_rent = request.args.get('max_rent')
+    ptype = request.args.get('type')
+    sort = request.args.get('sort', 'relevance' if rank else 'newest')
+    cursor = request.args.get('cursor')
+    per_page = get_per_page()
+    area, error = parse_area(request.args)
+    if error:
+        if request.args.get('format') == 'json':
+            return jsonify({'error': error}), 400
+        flash(error, 'warning')
+
+    def load_page():
+        # Images and owners are eager-loaded for the cards
+        props, rank_expr = filtered_listings(q, min_rent, max_rent, ptype, area)
+        # relevance orders by BM25 rank from the search index and falls back
+        # to newest first when there are no search terms
+        return paginate(props, sort, sort_keys(sort, rank_expr if rank else None), cursor, per_page)
+
+    key = page_key(view, q, min_rent, max_rent, ptype, sort, cursor, per_page, area)
+    page, properties = cached_page(key, load_page)
+    cards = cached_cards(card_template, page['ids'], properties, lambda p: listing_card(card_template, p))
+    user_favorites = get_user_favorites()
+
+    next_url = None
+    if page['next_cursor']:
+        args = request.args.to_dict()
+        args.pop('format', None)
+        args['cursor'] = page['next_cursor']
+        next_url = url_for(request.endpoint, **args)
+
+    cards_html = Markup(''.join(card['html'] for card in cards))
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'properties': [card['data'] for card in cards],
+            'html': cards_html,
+            'favorites': user_favorites,
+            'next_cursor': page['next_cursor'],
+            'next_url': next_url,
+            'has_more': page['next_cursor'] is not None,
+        })
+
+    return render_template(template, properties=[card['data'] for card in cards], cards_html=cards_html,
+                           user_favorites=user_favorites, next_cursor=page['next_cursor'], next_url=next_url)
+
+def update_similar(prop_id):
+    """Refresh a property's similar listings after a write; a failure only leaves them stale."""
+    try:
+        refresh_similar(prop_id)
+    except Exception as e:
+        db.session.rollback()
+        log.error("Error refreshing similar properties for %s: %s", prop_id, e)
+
+def get_user_favorites():
+    """IDs of the current user's favorite properties, sorted (empty for anonymous users)."""
+    if not current_user.is_authenticated:
+        return []
+    try:
+        return sorted(favorite_ids(current_user.id))
+    except Exception as e:
+        log.error("Error getting favorites: %s", e)
+        return []
+
+# -------------------------------------------------------
+# ✅ Home page (was your old index)
+# -------------------------------------------------------
+@bp.route('/home')
+@login_required
+@read_only
+def index():
+    return render_listing_page('home', 'index.html', '_property_card.html')
+
+# -------------------------------------------------------
+# Owner Dashboard
+# -------------------------------------------------------
+@bp.route('/owner/dashboard')
+@login_required
+def owner_dashboard():
+    if not current_user.is_owner:
+        flash('Access denied: not an owner account.', 'warning')
+        return redirect(url_for('listings.index'))
+    properties = owner_listings(current_user.id).all()
+    return render_template('owner_dashboard.html', properties=properties, inbox=owner_inbox(current_user.id),
+                           weekly_views=recent_views([p.id for p in properties]))
+
+# -------------------------------------------------------
+# Add Property
+# -------------------------------------------------------
+@bp.route('/property/add', methods=['GET','POST'])
+@login_required
+def add_property():
+    if not current_user.is_owner:
+        flash('Only owners can add properties.', 'warning')
+        return redirect(url_for('listings.index'))
+
+    form = PropertyForm()
+
+    if form.validate_on_submit():
+        log.debug("Form validation passed")
+        # Create the property first
+        prop = Property(
+            title=form.title.data,
+            description=form.description.data,
+            location=form.location.data,
+            rent=form.rent.data,
+            property_type=form.property_type.data,
+            owner_id=current_user.id
+        )
+        set_coordinates(prop)
+        db.session.add(prop)
+        db.session.flush()  # Get the property ID without committing
+        log.debug("Property created with ID: %s", prop.id)
+
+        # Handle multiple images: stage the uploads now, resize them in the background
+        staged_images = []
+        if 'images' in request.files:
+            files = request.files.getlist('images')
+            log.debug("Number of files received: %s", len(files))
+            for file in files:
+                if file and file.filename != '':
+                    log.debug("Processing file: %s", file.filename)
+                    if allowed_file(file.filename):
+                        prop_image = stage_image(file, prop.id)
+                        if prop_image:
+                            staged_images.append(prop_image)
+                            log.debug("Staged image: %s", prop_image.filename)
+                    else:
+                        log.debug("File type not allowed: %s", file.filename)
+
+        index_property(prop)
+        index_location(prop)
+        db.session.commit()
+        log.debug("Database committed successfully")
+        invalidate_property(prop.id)
+        update_similar(prop.id)
+        submit_images(staged_images)
+
+        image_count = len(staged_images)
+        if image_count > 0:
+            flash(f'Property added successfully with {image_count} image(s). Photos will appear once processed.', 'success')
+        else:
+            flash('Property added successfully, but no images were uploaded.', 'info')
+
+        return redirect(url_for('listings.owner_dashboard'))
+    else:
+        log.debug("Form validation failed: %s", form.errors)
+        if request.method == 'POST':
+            flash('Please fix the errors in the form.', 'danger')
+
+    return render_template('add_property.html', form=form)
+
+# -------------------------------------------------------
+# Bulk Import
+# -------------------------------------------------------
+@bp.route('/owner/import', methods=['POST'])
+@login_required
+def import_properties():
+    """Add listings from an uploaded CSV or JSONL `file`, with their photos in an optional `images` zip.
+
+    Streams one JSON line of progress per batch (see bulk_import.py); if it
+    stops short, posting the same file again skips the listings already added.
+    """
+    if not current_user.is_owner:
+        return jsonify({'error': 'Only owners can import properties'}), 403
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'error': 'Upload a CSV or JSONL file as "file"'}), 400
+    fmt = import_format(upload.filename)
+    if fmt is None:
+        return jsonify({'error': 'The file must be .csv, .jsonl or .ndjson'}), 400
+    archive = request.files.get('images')
+    images = None
+    if archive and archive.filename:
+        try:
+            images = ImageArchive(archive.stream)
+        except zipfile.BadZipFile:
+            return jsonify({'error': '"images" must be a zip archive'}), 400
+
+    owner_id = current_user.id
+
+    def progress():
+        try:
+            for event in import_listings(upload.stream, fmt, owner_id, images):
+                yield json.dumps(event) + '\n'
+        except Exception as e:
+            db.session.rollback()
+            log.error("Bulk import for owner %s failed: %s", owner_id, e)
+            yield json.dumps({'error': 'Import failed; upload the same file again to resume', 'done': True}) + '\n'
+
+    return current_app.response_class(stream_with_context(progress()), mimetype='application/x-ndjson',
+                                      headers={'X-Accel-Buffering': 'no'})
+
+# -------------------------------------------------------
+# Property Details
+# -------------------------------------------------------
+@bp.route('/property/<int:prop_id>', methods=['GET','POST'])
+@read_only
+def property_detail(prop_id):
+    prop = Property.query.get_or_404(prop_id)
+    form = MessageForm()
+
+    # Get user's favorite status for this property
+    is_favorite = False
+    if current_user.is_authenticated:
+        try:
+            is_favorite = prop_id in favorite_ids(current_user.id)
+        except Exception as e:
+            log.error("Error checking favorite status: %s", e)
+            is_favorite = False
+
+    if form.validate_on_submit() and current_user.is_authenticated:
+        msg = MessageModel(
+            tenant_id=current_user.id,
+            owner_id=prop.owner_id,
+            property_id=prop.id,
+            message_text=form.message_text.data
+        )
+        db.session.add(msg)
+        bump_counters([prop.id], message_count=1)
+        db.session.commit()
+        publish_message(msg.owner_id, msg.tenant_id, lambda user_id: message_event(msg, user_id))
+        flash('Message sent to owner.', 'success')
+        return redirect(url_for('listings.property_detail', prop_id=prop.id))
+
+    # Owners looking at their own listing don't count as views
+    if not (current_user.is_authenticated and current_user.id == prop.owner_id):
+        record_view(prop.id)
+
+    # Only the viewer's own threads, and only their latest messages; older
+    # and newer ones are fetched from messages.property_messages()
+    threads = visible_threads(current_user, prop, current_app.config['MESSAGE_THREADS_PER_PAGE'],
+                              current_app.config['MESSAGES_PER_PAGE'])
+
+    page = render_template('property_detail.html',
+                         property=prop,
+                         form=form,
+                         threads=threads,
+                         similar_properties=similar_listings(prop.id, 2),
+                         is_favorite=is_favorite)
+    # Marked read only after rendering, so the page still flags them as new
+    if threads and current_user.id == prop.owner_id:
+        if mark_read(current_user.id, prop.id, {t.tenant.id: t.shown_ids for t in threads}):
+            db.session.commit()
+    return page
+
+# -------------------------------------------------------
+# Edit Property
+# -------------------------------------------------------
+@bp.route('/property/<int:prop_id>/edit', methods=['GET','POST'])
+@login_required
+def edit_property(prop_id):
+    prop = Property.query.get_or_404(prop_id)
+    if prop.owner_id != current_user.id:
+        flash('Not authorized to edit this property.', 'danger')
+        return redirect(url_for('listings.index'))
+
+    form = PropertyForm(obj=prop)
+    if form.validate_on_submit():
+        prop.title = form.title.data
+        prop.description = form.description.data
+        prop.location = form.location.data
+        prop.rent = form.rent.data
+        prop.property_type = form.property_type.data
+
+        # Check if user wants to replace existing images
+        delete_existing = request.form.get('delete_existing_images') == 'true'
+        new_image_count = 0
+        staged_images = []
+        released_images = []
+
+        # Handle image uploads
+        if 'images' in request.files:
+            files = request.files.getlist('images')
+            has_new_images = any(file and file.filename != '' for file in files)
+
+            if has_new_images:
+                # If replacing images, delete old ones
+                if delete_existing:
+                    # Files are shared between identical uploads, so they are
+                    # only removed once the commit leaves them unreferenced
+                    released_images = [(image.filename, image.variants) for image in prop.images]
+
+                    # Delete all PropertyImage records
+                    PropertyImage.query.filter_by(property_id=prop.id).delete()
+                    log.info("Deleted all existing image records for property %s", prop.id)
+
+                # Add new images (resized in the background once committed)
+                for file in files:
+                    if file and file.filename != '' and allowed_file(file.filename):
+                        prop_image = stage_image(file, prop.id)
+                        if prop_image:
+                            staged_images.append(prop_image)
+                            new_image_count += 1
+                            log.debug("Staged new image: %s for property %s", prop_image.filename, prop.id)
+
+                if new_image_count > 0:
+                    flash(f'Updated property with {new_image_count} new image(s).', 'success')
+                else:
+                    flash('Property updated, but no valid images were uploaded.', 'warning')
+
+            elif delete_existing:
+                # User checked replace but didn't upload new images - delete existing
+                released_images = [(image.filename, image.variants) for image in prop.images]
+
+                PropertyImage.query.filter_by(property_id=prop.id).delete()
+                flash('All existing images have been removed.', 'info')
+                log.info("Removed all images for property %s", prop.id)
+
+        # Single commit at the end for all changes
+        set_coordinates(prop)
+        index_property(prop)
+        index_location(prop)
+        db.session.commit()
+        invalidate_property(prop.id)
+        update_similar(prop.id)
+        release_files(released_images)
+        submit_images(staged_images)
+        log.info("Updated property %s with %s new images", prop.id, new_image_count)
+        flash('Property updated successfully.', 'success')
+        return redirect(url_for('listings.owner_dashboard'))
+
+    return render_template('edit_property.html', form=form, property=prop)
+
+# -------------------------------------------------------
+# Delete Property
+# -------------------------------------------------------
+@bp.route('/property/<int:prop_id>/delete', methods=['POST'])
+@login_required
+def delete_property(prop_id):
+    prop = Property.query.get_or_404(prop_id)
+    if prop.owner_id != current_user.id:
+        flash('Not authorized to delete this property.', 'danger')
+        return redirect(url_for('listings.index'))
+
+    # Image files may be shared with other listings; remember them and
+    # delete whichever are unreferenced once the rows are gone
+    released_images = [(image.filename, image.variants) for image in prop.images]
+
+    # Delete associated favorites if Favorite table exists
+    favorited_by = []
+    try:
+        favorited_by = [user_id for (user_id,) in
+                        db.session.query(Favorite.user_id).filter(Favorite.property_id == prop_id)]
+        Favorite.query.filter_by(property_id=prop_id).delete()
+    except Exception as e:
+        log.error("Error deleting favorites: %s", e)
+    PropertyViewDaily.query.filter_by(property_id=prop_id).delete()
+
+    # The PropertyImage records will be automatically deleted due to cascade='all, delete-orphan'
+    unindex_property(prop.id)
+    unindex_location(prop.id)
+    remove_similar(prop.id)
+    db.session.delete(prop)
+    db.session.commit()
+    invalidate_property(prop_id)
+    invalidate_favorites(*favorited_by)
+    release_files(released_images)
+    flash('Property deleted.', 'info')
+    return redirect(url_for('listings.owner_dashboard'))
+
+# -------------------------------------------------------
+# Search
+# -------------------------------------------------------
+@bp.route('/search')
+@read_only
+def search():
+    return render_listing_page('search', 'search_results.html', '_search_result_card.html', rank=True)
+
+@bp.route('/search/facets')
+@read_only
+def search_facets():
+    """JSON counts per property type and a rent histogram for the current search filters."""
+    area, error = parse_area(request.args)
+    if error:
+        return jsonify({'error': error}), 400
+    return jsonify(cached_facets(request.args.get('q', ''), request.args.get('min_rent'),
+                                 request.args.get('max_rent'), request.args.get('type'), area))
@@ -0,0 +1,120 @@
+from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+
+from message_events import get_broker, user_channel, format_sse
+from messaging import (thread_query, thread_page, newer_messages, serialize_message, messages_since, message_event,
+                       owner_inbox, serialize_conversation, mark_read)
+from models import db, Property
+
+bp = Blueprint('messages', __name__)
+
+# -------------------------------------------------------
+# Owner Inbox
+# -------------------------------------------------------
+@bp.route('/owner/inbox')
+@login_required
+def owner_inbox_view():
+    """Every conversation on the owner's listings with message and unread counts; ?format=json for the API."""
+    if not current_user.is_owner:
+        flash('Access denied: not an owner account.', 'warning')
+        return redirect(url_for('listings.index'))
+    inbox = owner_inbox(current_user.id)
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'conversations': [serialize_conversation(row) for row in inbox.conversations],
+            'properties': {str(prop_id): totals for prop_id, totals in inbox.by_property.items()},
+            'message_count': inbox.message_count,
+            'unread_count': inbox.unread_count,
+        })
+    return render_template('inbox.html', inbox=inbox)
+
+# -------------------------------------------------------
+# Message Threads
+# -------------------------------------------------------
+@bp.route('/property/<int:prop_id>/messages')
+@login_required
+def property_messages(prop_id):
+    """JSON page of one message thread: ?before=<cursor> loads older messages, ?after=<id> polls for newer ones."""
+    prop = Property.query.get_or_404(prop_id)
+    tenant_id = request.args.get('tenant', current_user.id, type=int)
+    query = thread_query(current_user, prop, tenant_id)
+    if query is None:
+        return jsonify({'error': 'Not authorized to read this conversation'}), 403
+
+    per_page = current_app.config['MESSAGES_PER_PAGE']
+    after = request.args.get('after', type=int)
+    if after is not None:
+        messages = newer_messages(query, after, per_page)
+        next_cursor = None
+        shown = (messages[0].id, messages[-1].id) if messages else None
+    else:
+        page = thread_page(query, request.args.get('before'), per_page)
+        messages, next_cursor = page.items, page.next_cursor
+        shown = (messages[-1].id, messages[0].id) if messages else None
+    response = jsonify({
+        'messages': [serialize_message(m) for m in messages],
+        'html': render_template('_messages.html', messages=messages),
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+    })
+    # Newer messages polled in and older pages loaded are read once shown;
+    # only after rendering, so they still come flagged as new
+    if shown and current_user.id == prop.owner_id:
+        if mark_read(current_user.id, prop.id, {tenant_id: shown}):
+            db.session.commit()
+    return response
+
+@bp.route('/messages/stream')
+@login_required
+def message_stream():
+    """Server-Sent Events stream of new messages in the current user's conversations.
+
+    Resumes after the Last-Event-ID the browser sends on reconnect (or
+    ?after=<message id>, the newest one the page already shows); without
+    either it starts from now. The stream holds no database connection
+    while idle.
+    """
+    last_id = request.headers.get('Last-Event-ID', type=int) or request.args.get('after', 0, type=int)
+    # Subscribe before reading the backlog so nothing sent in between is lost
+    subscription = get_broker().subscribe(user_channel(current_user.id))
+    backlog = [message_event(m, current_user.id) for m in messages_since(current_user.id, last_id)] if last_id else []
+    keepalive = current_app.config['MESSAGE_STREAM_KEEPALIVE']
+
+    def stream():
+        sent = last_id
+        try:
+            yield 'retry: 5000\n\n'
+            for event in backlog:
+                sent = event['id']
+                yield format_sse(event)
+            while True:
+                event = subscription.get(timeout=keepalive)
+                if event is None:
+                    yield ': keepalive\n\n'
+                elif event['id'] > sent:
+                    sent = event['id']
+                    yield format_sse(event)
+        finally:
+            subscription.close()
+
+    return current_app.response_class(stream(), mimetype='text/event-stream',
+                                      headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@bp.route('/messages/poll')
+@login_required
+def message_poll():
+    """Long-poll fallback for message_stream(): waits up to MESSAGE_POLL_TIMEOUT for messages after ?after=<id>.
+
+    Messages already stored after that id are returned straight away.
+    """
+    after = request.args.get('after', 0, type=int)
+    subscription = get_broker().subscribe(user_channel(current_user.id))
+    try:
+        events = [message_event(m, current_user.id) for m in messages_since(current_user.id, after)] if after else []
+        if not events:
+            db.session.close()  # don't hold a connection while waiting
+            event = subscription.get(timeout=current_app.config['MESSAGE_POLL_TIMEOUT'])
+            events = [event] if event and event['id'] > after else []
+    finally:
+        subscription.close()
+    return jsonify({'messages': events, 'last_id': events[-1]['id'] if events else after})
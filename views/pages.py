@@ -0,0 +1,37 @@
+from flask import Blueprint, current_app, redirect, render_template, url_for
+from flask_login import current_user
+
+from instrumentation import metrics_response
+
+bp = Blueprint('pages', __name__)
+
+# -------------------------------------------------------
+# ✅ Redirect '/' to login or home depending on user status
+# -------------------------------------------------------
+@bp.route('/')
+def home_redirect():
+    if current_user.is_authenticated:
+        return redirect(url_for('listings.index'))
+    return redirect(url_for('auth.login'))
+
+# -------------------------------------------------------
+# NEW ROUTES FOR ADDITIONAL PAGES
+# -------------------------------------------------------
+
+@bp.route('/about')
+def about():
+    return render_template('about.html')
+
+@bp.route('/contact')
+def contact():
+    return render_template('contact.html')
+
+# -------------------------------------------------------
+# Metrics
+# -------------------------------------------------------
+@bp.route('/metrics')
+def metrics():
+    """Prometheus metrics for every worker (see instrumentation.py)."""
+    if not current_app.config['METRICS_ENABLED']:
+        return 'Not Found', 404
+    return metrics_response()
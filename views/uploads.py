@@ -0,0 +1,18 @@
+from flask import Blueprint, url_for
+
+from upload_storage import send_upload
+
+bp = Blueprint('uploads', __name__)
+
+
+@bp.app_context_processor
+def inject_image_helpers():
+    """Build srcset attributes for responsive image variants"""
+    def image_srcset(image, fmt):
+        return ', '.join(f"{url_for('uploads.uploaded_file', filename=name)} {width}w"
+                         for name, width in image.srcset_entries(fmt))
+    return dict(image_srcset=image_srcset)
+
+@bp.route('/uploads/<filename>')
+def uploaded_file(filename):
+    return send_upload(filename)
@@ -0,0 +1,6 @@
+"""WSGI entry point: `gunicorn -c gunicorn.conf.py wsgi:app` (see gunicorn.conf.py)."""
+from app import create_app
+from assets import precompile_templates
+
+app = create_app(commands=False)
+precompile_templates(app)